@@ -1,21 +1,37 @@
+import argparse
+import struct
 import tkinter as tk
-from tkinter import ttk
-import random
-from collections import deque
+from tkinter import filedialog, ttk
 import time
+from collections import deque
+
+from maze_engine import (GENERATORS, MAZE_SUFFIX, SEED_MAX, SEED_MIN, MazeCache, field_levels,
+                         load_maze, save_maze, solve)
+from maze_metrics import FrontierSampler, MetricsLog, RunMetrics
+from maze_viewport import MazeViewport
 
 class MazeSolver:
     def __init__(self, root):
         self.root = root
-        self.root.title("Maze Solver - BFS & DFS Visualizer")
-        self.root.geometry("1000x700")
+        self.root.title("Maze Solver - BFS, DFS & A* Visualizer")
+        self.root.geometry("1100x720")
         self.root.configure(bg="#1a1a2e")
         
         # Maze settings
         self.rows = 20
         self.cols = 30
+        self.rows_var = tk.StringVar(value=str(self.rows))
+        self.cols_var = tk.StringVar(value=str(self.cols))
         self.cell_size = 25
-        self.maze = []
+        self.max_cell_size = 25
+        self.min_cell_size = 6  # below this, switch to the scrolling viewport
+        self.view_width = 750
+        self.view_height = 500
+        self.viewport = None
+        self.maze = None
+        self.generator = tk.StringVar(value="backtracker")
+        self.seed_var = tk.StringVar(value="")  # empty: a new random seed each time
+        self.maze_cache = MazeCache(capacity=8)
         self.start = (0, 0)
         self.end = (self.rows-1, self.cols-1)
         
@@ -27,11 +43,46 @@ class MazeSolver:
         self.end_color = "#ff0055"
         self.visited_bfs_color = "#4fc3f7"
         self.visited_dfs_color = "#ba68c8"
+        self.visited_astar_color = "#81c784"
+        self.visited_bidir_color = "#ffb74d"
         self.solution_color = "#ffd700"
         
-        # Animation state
+        # Distance heat map, from light yellow (near the start) to deep orange
+        self.show_heat = tk.BooleanVar(value=False)
+        self.heat_palette = [
+            "#%02x%02x%02x" % (255 - 25 * i // 31, 245 - 164 * i // 31, 157 - 157 * i // 31)
+            for i in range(32)
+        ]
+        
+        # Solver name and visited color per algorithm
+        self.solvers = {
+            'bfs': ("BFS (Breadth-First Search)", self.visited_bfs_color),
+            'dfs': ("DFS (Depth-First Search)", self.visited_dfs_color),
+            'astar': ("A* (Manhattan heuristic)", self.visited_astar_color),
+            'bidirectional': ("Bidirectional BFS", self.visited_bidir_color),
+        }
+        
+        # Animation state: searches run to completion up front, then their
+        # trace is replayed at ``cells_per_second``
         self.is_solving = False
-        self.animation_speed = 50  # milliseconds
+        self.cells_per_second = 316
+        self.instant_results = tk.BooleanVar(value=False)
+        self.replay_id = None
+        self.replay_result = None
+        self.replay_samples = None
+        self.frame_cell_cap = 256  # cells painted per frame, adapted to frame_ms
+        
+        # Metrics of every solve; detailed metrics also trace memory and
+        # sample the frontier, which slows the search down
+        self.metrics = MetricsLog()
+        self.detailed_metrics = False
+        
+        # Canvas state: one item per cell, color changes batched per frame
+        self.cell_items = [[]]
+        self.pending_cells = {}
+        self.flush_id = None
+        self.frame_ms = 16
+        self.frame_times = deque(maxlen=1000)
         
         self.setup_ui()
         self.generate_maze()
@@ -62,15 +113,27 @@ class MazeSolver:
         )
         self.info_label.pack()
         
-        # Canvas for maze
+        # Canvas for maze, with scrollbars shown only in viewport mode
+        canvas_frame = tk.Frame(self.root, bg=self.bg_color)
+        canvas_frame.pack(pady=10)
+        
         self.canvas = tk.Canvas(
-            self.root,
-            width=self.cols * self.cell_size,
-            height=self.rows * self.cell_size,
+            canvas_frame,
+            width=self.view_width,
+            height=self.view_height,
             bg="#0f0f1e",
             highlightthickness=0
         )
-        self.canvas.pack(pady=10)
+        self.canvas.grid(row=0, column=0)
+        self.canvas.bind("<Button-3>", lambda event: self.move_endpoint(event, 'end'))
+        self.canvas.bind("<Shift-Button-3>", lambda event: self.move_endpoint(event, 'start'))
+        
+        self.xscrollbar = tk.Scrollbar(canvas_frame, orient=tk.HORIZONTAL)
+        self.xscrollbar.grid(row=1, column=0, sticky="ew")
+        self.xscrollbar.grid_remove()
+        self.yscrollbar = tk.Scrollbar(canvas_frame, orient=tk.VERTICAL)
+        self.yscrollbar.grid(row=0, column=1, sticky="ns")
+        self.yscrollbar.grid_remove()
         
         # Control panel
         control_frame = tk.Frame(self.root, bg=self.bg_color)
@@ -119,6 +182,34 @@ class MazeSolver:
         )
         self.dfs_btn.grid(row=0, column=2, padx=5)
         
+        self.astar_btn = tk.Button(
+            control_frame,
+            text="Solve with A*",
+            font=("Arial", 11, "bold"),
+            bg="#388e3c",
+            fg="#eaeaea",
+            activebackground="#2e7d32",
+            cursor="hand2",
+            padx=15,
+            pady=8,
+            command=lambda: self.solve_maze('astar')
+        )
+        self.astar_btn.grid(row=0, column=3, padx=5)
+        
+        self.bidir_btn = tk.Button(
+            control_frame,
+            text="Bidirectional BFS",
+            font=("Arial", 11, "bold"),
+            bg="#f57c00",
+            fg="#eaeaea",
+            activebackground="#ef6c00",
+            cursor="hand2",
+            padx=15,
+            pady=8,
+            command=lambda: self.solve_maze('bidirectional')
+        )
+        self.bidir_btn.grid(row=0, column=4, padx=5)
+        
         self.clear_btn = tk.Button(
             control_frame,
             text="Clear Solution",
@@ -131,15 +222,15 @@ class MazeSolver:
             pady=8,
             command=self.clear_solution
         )
-        self.clear_btn.grid(row=0, column=3, padx=5)
+        self.clear_btn.grid(row=0, column=5, padx=5)
         
         # Speed control
         speed_frame = tk.Frame(control_frame, bg=self.bg_color)
-        speed_frame.grid(row=1, column=0, columnspan=4, pady=10)
+        speed_frame.grid(row=1, column=0, columnspan=6, pady=10)
         
         tk.Label(
             speed_frame,
-            text="Animation Speed:",
+            text="Replay Speed:",
             font=("Arial", 10),
             bg=self.bg_color,
             fg="#eaeaea"
@@ -156,9 +247,122 @@ class MazeSolver:
             troughcolor="#0f3460",
             command=self.update_speed
         )
-        self.speed_scale.set(50)
         self.speed_scale.pack(side=tk.LEFT)
         
+        self.speed_label = tk.Label(
+            speed_frame,
+            font=("Arial", 10),
+            width=14,
+            bg=self.bg_color,
+            fg="#eaeaea"
+        )
+        self.speed_label.pack(side=tk.LEFT, padx=5)
+        self.speed_scale.set(50)
+        
+        tk.Checkbutton(
+            speed_frame,
+            text="Instant results",
+            variable=self.instant_results,
+            font=("Arial", 10),
+            bg=self.bg_color,
+            fg="#eaeaea",
+            selectcolor="#16213e",
+            activebackground=self.bg_color
+        ).pack(side=tk.LEFT, padx=10)
+        
+        tk.Checkbutton(
+            speed_frame,
+            text="Distance heat map",
+            variable=self.show_heat,
+            command=self.toggle_heat,
+            font=("Arial", 10),
+            bg=self.bg_color,
+            fg="#eaeaea",
+            selectcolor="#16213e",
+            activebackground=self.bg_color
+        ).pack(side=tk.LEFT, padx=(0, 10))
+        
+        self.skip_btn = tk.Button(
+            speed_frame,
+            text="Skip to Result",
+            font=("Arial", 10, "bold"),
+            bg="#16213e",
+            fg="#eaeaea",
+            activebackground="#0f3460",
+            cursor="hand2",
+            padx=10,
+            command=self.skip_to_result
+        )
+        self.skip_btn.pack(side=tk.LEFT, padx=5)
+        
+        # Maze options
+        maze_frame = tk.Frame(control_frame, bg=self.bg_color)
+        maze_frame.grid(row=2, column=0, columnspan=6)
+        
+        tk.Label(
+            maze_frame,
+            text="Generator:",
+            font=("Arial", 10),
+            bg=self.bg_color,
+            fg="#eaeaea"
+        ).pack(side=tk.LEFT, padx=5)
+        
+        ttk.Combobox(
+            maze_frame,
+            textvariable=self.generator,
+            values=list(GENERATORS),
+            state="readonly",
+            width=12
+        ).pack(side=tk.LEFT, padx=(0, 15))
+        
+        for text, variable in (("Rows:", self.rows_var), ("Cols:", self.cols_var)):
+            tk.Label(
+                maze_frame,
+                text=text,
+                font=("Arial", 10),
+                bg=self.bg_color,
+                fg="#eaeaea"
+            ).pack(side=tk.LEFT, padx=5)
+            
+            tk.Spinbox(
+                maze_frame,
+                from_=2,
+                to=4000,
+                textvariable=variable,
+                width=6,
+                font=("Arial", 10)
+            ).pack(side=tk.LEFT)
+        
+        tk.Label(
+            maze_frame,
+            text="Seed:",
+            font=("Arial", 10),
+            bg=self.bg_color,
+            fg="#eaeaea"
+        ).pack(side=tk.LEFT, padx=5)
+        
+        tk.Entry(
+            maze_frame,
+            textvariable=self.seed_var,
+            width=11,
+            font=("Arial", 10)
+        ).pack(side=tk.LEFT)
+        
+        for text, command in (("Save Maze...", self.export_maze),
+                              ("Load Maze...", self.import_maze),
+                              ("Export Metrics...", self.export_metrics)):
+            tk.Button(
+                maze_frame,
+                text=text,
+                font=("Arial", 10, "bold"),
+                bg="#16213e",
+                fg="#eaeaea",
+                activebackground="#0f3460",
+                cursor="hand2",
+                padx=10,
+                command=command
+            ).pack(side=tk.LEFT, padx=(15, 0))
+        
         # Legend
         legend_frame = tk.Frame(self.root, bg=self.bg_color)
         legend_frame.pack(pady=5)
@@ -170,6 +374,8 @@ class MazeSolver:
             ("Path", self.path_color),
             ("BFS Visited", self.visited_bfs_color),
             ("DFS Visited", self.visited_dfs_color),
+            ("A* Visited", self.visited_astar_color),
+            ("Bi-BFS Visited", self.visited_bidir_color),
             ("Solution", self.solution_color)
         ]
         
@@ -187,215 +393,437 @@ class MazeSolver:
                 bg=self.bg_color,
                 fg="#eaeaea"
             ).pack(side=tk.LEFT)
+        
+        tk.Label(
+            legend_frame,
+            text="Right-click a cell to move the end, Shift+right-click to move the start",
+            font=("Arial", 9),
+            bg=self.bg_color,
+            fg="#eaeaea"
+        ).grid(row=1, column=0, columnspan=len(legends), pady=(5, 0))
     
     def update_speed(self, val):
-        """Update animation speed."""
-        self.animation_speed = 101 - int(val)
+        """Map the slider (1-100) to 1-100000 cells per second, logarithmically."""
+        self.cells_per_second = max(1, round(10 ** (int(val) / 20)))
+        self.speed_label.config(text=f"{self.cells_per_second} cells/s")
     
     def generate_maze(self):
-        """Generate a random maze using DFS."""
-        # Initialize maze with all walls
-        self.maze = [[1 for _ in range(self.cols)] for _ in range(self.rows)]
-        
-        # DFS maze generation
-        stack = [(0, 0)]
-        self.maze[0][0] = 0
-        
-        directions = [(0, 2), (2, 0), (0, -2), (-2, 0)]
-        
-        while stack:
-            current = stack[-1]
-            row, col = current
-            
-            # Find unvisited neighbors
-            neighbors = []
-            for dr, dc in directions:
-                new_row, new_col = row + dr, col + dc
-                if (0 <= new_row < self.rows and 0 <= new_col < self.cols 
-                    and self.maze[new_row][new_col] == 1):
-                    neighbors.append((new_row, new_col, dr, dc))
-            
-            if neighbors:
-                # Choose random neighbor
-                new_row, new_col, dr, dc = random.choice(neighbors)
-                # Remove wall between current and neighbor
-                self.maze[row + dr//2][col + dc//2] = 0
-                self.maze[new_row][new_col] = 0
-                stack.append((new_row, new_col))
-            else:
-                stack.pop()
-        
-        # Ensure start and end are paths
-        self.maze[0][0] = 0
-        self.maze[self.rows-1][self.cols-1] = 0
+        """Generate a maze with the selected generator, size and seed (random if empty).
+
+        Returns False, keeping the current maze, if the seed is out of range.
+        """
+        try:
+            self.rows = max(2, min(4000, int(self.rows_var.get())))
+            self.cols = max(2, min(4000, int(self.cols_var.get())))
+        except ValueError:
+            pass
+        self.rows_var.set(str(self.rows))
+        self.cols_var.set(str(self.cols))
+        try:
+            seed = int(self.seed_var.get())
+        except ValueError:
+            seed = None
+        # Maze files store the seed in 64 bits, so a larger one couldn't be saved
+        if seed is not None and not SEED_MIN <= seed <= SEED_MAX:
+            self.info_label.config(text=f"❌ Seed must be between {SEED_MIN} and {SEED_MAX}")
+            return False
+        self.maze = self.maze_cache.get(self.rows, self.cols, seed, self.generator.get())
+        self.start = self.maze.start
+        self.end = self.maze.end
+        return True
     
     def generate_and_draw(self):
         """Generate new maze and draw it."""
-        if not self.is_solving:
-            self.generate_maze()
+        if not self.is_solving and self.generate_maze():
             self.draw_maze()
-            self.info_label.config(text="New maze generated! Choose an algorithm to solve.")
+            self.info_label.config(
+                text=f"New maze generated (seed {self.maze.seed})! Choose an algorithm to solve."
+            )
+    
+    def export_maze(self):
+        """Save the current maze to a .maze file."""
+        if self.is_solving:
+            return
+        path = filedialog.asksaveasfilename(
+            defaultextension=MAZE_SUFFIX,
+            filetypes=[("Maze files", f"*{MAZE_SUFFIX}")]
+        )
+        if not path:
+            return
+        try:
+            save_maze(self.maze, path)
+        except (OSError, ValueError, struct.error) as e:
+            self.info_label.config(text=f"❌ Could not save maze: {e}")
+            return
+        self.info_label.config(text=f"Maze saved to {path}")
+    
+    def import_maze(self):
+        """Load a maze from a .maze file and draw it."""
+        if self.is_solving:
+            return
+        path = filedialog.askopenfilename(filetypes=[("Maze files", f"*{MAZE_SUFFIX}")])
+        if not path:
+            return
+        try:
+            maze = load_maze(path).with_backend('python')
+        except (OSError, ValueError) as e:
+            self.info_label.config(text=f"❌ Could not load maze: {e}")
+            return
+        
+        self.maze = maze
+        self.rows, self.cols = maze.rows, maze.cols
+        self.rows_var.set(str(self.rows))
+        self.cols_var.set(str(self.cols))
+        self.start, self.end = maze.start, maze.end
+        if maze.generator in GENERATORS:
+            self.generator.set(maze.generator)
+        self.draw_maze()
+        self.info_label.config(text=f"Loaded {self.rows}x{self.cols} maze from {path}")
+    
+    def export_metrics(self):
+        """Write the metrics of every solve so far to a JSON or CSV file."""
+        path = filedialog.asksaveasfilename(
+            defaultextension=".json",
+            filetypes=[("JSON", "*.json"), ("CSV", "*.csv")]
+        )
+        if not path:
+            return
+        try:
+            self.metrics.write(path)
+        except OSError as e:
+            self.info_label.config(text=f"❌ Could not export metrics: {e}")
+            return
+        self.info_label.config(text=f"Metrics of {len(self.metrics)} runs saved to {path}")
+    
+    def cell_color(self, row, col):
+        """Base color of a cell before any search has touched it."""
+        if (row, col) == self.start:
+            return self.start_color
+        if (row, col) == self.end:
+            return self.end_color
+        if self.maze[row, col] == 1:
+            return self.wall_color
+        return self.path_color
     
     def draw_maze(self):
-        """Draw the maze on canvas."""
-        self.canvas.delete("all")
-        
-        for row in range(self.rows):
-            for col in range(self.cols):
-                x1 = col * self.cell_size
-                y1 = row * self.cell_size
-                x2 = x1 + self.cell_size
-                y2 = y1 + self.cell_size
-                
-                if (row, col) == self.start:
-                    color = self.start_color
-                elif (row, col) == self.end:
-                    color = self.end_color
-                elif self.maze[row][col] == 1:
-                    color = self.wall_color
-                else:
-                    color = self.path_color
-                
-                self.canvas.create_rectangle(
-                    x1, y1, x2, y2,
-                    fill=color,
-                    outline="#0f0f1e",
-                    tags=f"cell_{row}_{col}"
-                )
+        """Draw the maze on canvas.
+        
+        One rectangle is created per cell and its id kept in ``cell_items``;
+        later redraws only recolor the existing items.  Mazes too large for
+        that are drawn through a MazeViewport instead.
+        """
+        self.cancel_pending_cells()
+        
+        cell_size = min(self.max_cell_size,
+                        self.view_width // self.cols,
+                        self.view_height // self.rows)
+        if cell_size < self.min_cell_size:
+            if self.viewport is None:
+                self.canvas.delete("all")
+                self.cell_items = [[]]
+                self.viewport = MazeViewport(self.canvas, self.xscrollbar, self.yscrollbar, {
+                    'wall': self.wall_color,
+                    'path': self.path_color,
+                    'start': self.start_color,
+                    'end': self.end_color,
+                    'solution': self.solution_color,
+                })
+                self.xscrollbar.grid()
+                self.yscrollbar.grid()
+            self.viewport.set_maze(self.maze)
+            return
+        
+        if self.viewport is not None:
+            self.viewport.destroy()
+            self.viewport = None
+            self.xscrollbar.grid_remove()
+            self.yscrollbar.grid_remove()
+        if cell_size != self.cell_size:
+            self.cell_size = cell_size
+            self.cell_items = [[]]
+        
+        if len(self.cell_items) != self.rows or len(self.cell_items[0]) != self.cols:
+            self.canvas.delete("all")
+            self.cell_items = []
+            for row in range(self.rows):
+                item_row = []
+                for col in range(self.cols):
+                    x1 = col * self.cell_size
+                    y1 = row * self.cell_size
+                    x2 = x1 + self.cell_size
+                    y2 = y1 + self.cell_size
+                    
+                    item_row.append(self.canvas.create_rectangle(
+                        x1, y1, x2, y2,
+                        fill=self.cell_color(row, col),
+                        outline="#0f0f1e"
+                    ))
+                self.cell_items.append(item_row)
+        else:
+            for row in range(self.rows):
+                for col in range(self.cols):
+                    self.canvas.itemconfig(self.cell_items[row][col], fill=self.cell_color(row, col))
     
     def draw_cell(self, row, col, color):
-        """Update a cell's color."""
+        """Queue a cell color change; queued changes are applied once per frame."""
         if (row, col) != self.start and (row, col) != self.end:
-            x1 = col * self.cell_size
-            y1 = row * self.cell_size
-            x2 = x1 + self.cell_size
-            y2 = y1 + self.cell_size
-            
-            self.canvas.create_rectangle(
-                x1, y1, x2, y2,
-                fill=color,
-                outline="#0f0f1e",
-                tags=f"cell_{row}_{col}"
-            )
-            self.canvas.update()
+            self.pending_cells[(row, col)] = color
+            if self.flush_id is None:
+                self.flush_id = self.root.after(self.frame_ms, self.flush_cells)
+    
+    def flush_cells(self):
+        """Apply all queued cell colors and repaint once; return the time taken."""
+        if self.flush_id is not None:
+            self.root.after_cancel(self.flush_id)
+            self.flush_id = None
+        began = time.perf_counter()
+        if self.viewport is not None:
+            self.viewport.paint_cells(self.pending_cells.items())
+        else:
+            for (row, col), color in self.pending_cells.items():
+                self.canvas.itemconfig(self.cell_items[row][col], fill=color)
+        self.pending_cells.clear()
+        self.canvas.update_idletasks()
+        elapsed = time.perf_counter() - began
+        self.frame_times.append(elapsed)
+        return elapsed
+    
+    def cancel_pending_cells(self):
+        """Drop queued cell colors, e.g. before the maze is redrawn."""
+        self.pending_cells.clear()
+        if self.flush_id is not None:
+            self.root.after_cancel(self.flush_id)
+            self.flush_id = None
     
     def solve_maze(self, algorithm):
         """Solve maze with selected algorithm."""
         if self.is_solving:
             return
         
-        self.is_solving = True
         self.clear_solution()
+        self.is_solving = True
         
-        if algorithm == 'bfs':
-            self.info_label.config(text="Solving with BFS (Breadth-First Search)...")
-            self.root.after(100, self.bfs_solve)
+        name, visited_color = self.solvers[algorithm]
+        self.info_label.config(text=f"Solving with {name}...")
+        self.replay_result = None
+        self.root.after(100, lambda: self.run_search(algorithm, visited_color))
+    
+    def run_search(self, algorithm, visited_color):
+        """Run the whole search, then start replaying it."""
+        sampler = None
+        if self.detailed_metrics:
+            sampler = FrontierSampler(every=max(1, self.rows * self.cols // 1000))
+        result = solve(self.maze, algorithm, hook=sampler, trace_memory=self.detailed_metrics)
+        self.replay_samples = sampler.samples if sampler is not None else None
+        self.start_replay(result, visited_color)
+    
+    def start_replay(self, result, visited_color):
+        """Replay a finished search: visited cells first, then the solution path."""
+        self.replay_result = result
+        self.replay_color = visited_color
+        self.replay_pos = 0
+        self.replay_draw_time = 0.0
+        self.replay_frames = 0
+        self.replay_total = len(result.order) + (len(result.path) if result.solved else 0)
+        self.replay_budget = 0.0
+        self.replay_last = time.perf_counter()
+        
+        if self.instant_results.get():
+            self.skip_to_result()
         else:
-            self.info_label.config(text="Solving with DFS (Depth-First Search)...")
-            self.root.after(100, self.dfs_solve)
+            self.replay_id = self.root.after(self.frame_ms, self.replay_frame)
     
-    def bfs_solve(self):
-        """Solve maze using BFS."""
-        queue = deque([(self.start, [self.start])])
-        visited = {self.start}
-        
-        directions = [(0, 1), (1, 0), (0, -1), (-1, 0)]
-        steps = 0
-        
-        def bfs_step():
-            nonlocal steps
-            
-            if not queue:
-                self.info_label.config(text="❌ No solution found!")
-                self.is_solving = False
-                return
-            
-            current, path = queue.popleft()
-            row, col = current
-            
-            # Visualize exploration
-            if current != self.start and current != self.end:
-                self.draw_cell(row, col, self.visited_bfs_color)
-            
-            if current == self.end:
-                # Draw solution path
-                self.root.after(300, lambda: self.draw_solution(path, steps))
-                return
-            
-            for dr, dc in directions:
-                new_row, new_col = row + dr, col + dc
-                new_pos = (new_row, new_col)
-                
-                if (0 <= new_row < self.rows and 0 <= new_col < self.cols 
-                    and self.maze[new_row][new_col] == 0 and new_pos not in visited):
-                    visited.add(new_pos)
-                    queue.append((new_pos, path + [new_pos]))
-            
-            steps += 1
-            self.root.after(self.animation_speed, bfs_step)
-        
-        bfs_step()
+    def paint_trace(self, count):
+        """Queue the next ``count`` cells of the replayed trace."""
+        result = self.replay_result
+        order, path = result.order, result.path
+        visited = len(order)
+        end = min(self.replay_pos + count, self.replay_total)
+        
+        for pos in range(self.replay_pos, end):
+            if pos < visited:
+                row, col = divmod(order[pos], self.cols)
+                self.draw_cell(row, col, self.replay_color)
+            else:
+                row, col = path[pos - visited]
+                self.draw_cell(row, col, self.solution_color)
+        self.replay_pos = end
     
-    def dfs_solve(self):
-        """Solve maze using DFS."""
-        stack = [(self.start, [self.start])]
-        visited = {self.start}
-        
-        directions = [(0, 1), (1, 0), (0, -1), (-1, 0)]
-        steps = 0
-        
-        def dfs_step():
-            nonlocal steps
-            
-            if not stack:
-                self.info_label.config(text="❌ No solution found!")
-                self.is_solving = False
-                return
-            
-            current, path = stack.pop()
-            row, col = current
-            
-            # Visualize exploration
-            if current != self.start and current != self.end:
-                self.draw_cell(row, col, self.visited_dfs_color)
-            
-            if current == self.end:
-                # Draw solution path
-                self.root.after(300, lambda: self.draw_solution(path, steps))
-                return
-            
-            for dr, dc in directions:
-                new_row, new_col = row + dr, col + dc
-                new_pos = (new_row, new_col)
-                
-                if (0 <= new_row < self.rows and 0 <= new_col < self.cols 
-                    and self.maze[new_row][new_col] == 0 and new_pos not in visited):
-                    visited.add(new_pos)
-                    stack.append((new_pos, path + [new_pos]))
-            
-            steps += 1
-            self.root.after(self.animation_speed, dfs_step)
-        
-        dfs_step()
+    def replay_frame(self):
+        """Paint the cells due this frame, adapting the per-frame cap to frame_ms."""
+        now = time.perf_counter()
+        # Never bank more than one frame's worth, so a stall doesn't cause a burst
+        self.replay_budget = min(
+            self.replay_budget + (now - self.replay_last) * self.cells_per_second,
+            self.frame_cell_cap
+        )
+        self.replay_last = now
+        
+        count = int(self.replay_budget)
+        if count:
+            self.replay_budget -= count
+            self.paint_trace(count)
+            frame_time = self.flush_cells()
+            self.replay_draw_time += frame_time
+            self.replay_frames += 1
+            frame_time *= 1000
+            if frame_time > self.frame_ms:
+                self.frame_cell_cap = max(1, int(self.frame_cell_cap * 0.7))
+            elif frame_time < self.frame_ms / 2:
+                self.frame_cell_cap = min(100000, int(self.frame_cell_cap * 1.25) + 1)
+        
+        if self.replay_pos >= self.replay_total:
+            self.finish_replay()
+        else:
+            self.replay_id = self.root.after(self.frame_ms, self.replay_frame)
+    
+    def skip_to_result(self):
+        """Paint the rest of the current replay at once."""
+        if not self.is_solving or self.replay_result is None:
+            return
+        if self.replay_id is not None:
+            self.root.after_cancel(self.replay_id)
+        self.paint_trace(self.replay_total - self.replay_pos)
+        self.replay_draw_time += self.flush_cells()
+        self.replay_frames += 1
+        self.finish_replay()
     
-    def draw_solution(self, path, steps):
-        """Draw the solution path."""
-        for i, (row, col) in enumerate(path):
-            if (row, col) != self.start and (row, col) != self.end:
-                self.root.after(i * 30, lambda r=row, c=col: self.draw_cell(r, c, self.solution_color))
-        
-        self.root.after(len(path) * 30 + 100, lambda: self.info_label.config(
-            text=f"✅ Solution found! Path length: {len(path)} | Steps explored: {steps}"
+    def finish_replay(self):
+        """Report the search statistics once the whole trace is painted."""
+        self.replay_id = None
+        result = self.replay_result
+        if result.solved and self.viewport is not None:
+            self.viewport.show_path(result.path)
+        run = self.metrics.add(RunMetrics(
+            self.maze, result,
+            draw_seconds=self.replay_draw_time,
+            frames=self.replay_frames,
+            canvas_items=len(self.canvas.find_all()),
+            frontier_samples=self.replay_samples
         ))
+        memory = f" | Peak memory: {run.peak_memory / 1024:,.0f} KiB" if run.peak_memory is not None else ""
+        if result.solved:
+            self.info_label.config(
+                text=f"✅ Solution found! Path length: {len(result.path)} | Steps explored: {result.steps} | "
+                     f"Peak frontier: {result.peak_frontier} | Search: {run.search_ms:.1f} ms | "
+                     f"Draw: {run.draw_ms:.1f} ms{memory}"
+            )
+        else:
+            self.info_label.config(text="❌ No solution found!")
         self.is_solving = False
     
+    def move_endpoint(self, event, endpoint):
+        """Move the start or end to the clicked open cell and show the new shortest path."""
+        if self.is_solving:
+            return
+        if self.viewport is not None:
+            cell = self.viewport.cell_at(event.x, event.y)
+        else:
+            row = int(self.canvas.canvasy(event.y) // self.cell_size)
+            col = int(self.canvas.canvasx(event.x) // self.cell_size)
+            cell = (row, col) if 0 <= row < self.rows and 0 <= col < self.cols else None
+        if cell is None or self.maze[cell] == 1 or cell in (self.start, self.end):
+            return
+        if endpoint == 'start':
+            self.start = self.maze.start = cell
+        else:
+            self.end = self.maze.end = cell
+        self.show_distances()
+    
+    def show_distances(self):
+        """Draw the shortest path, and the heat map if enabled, from the start's distance field.
+        
+        The field is computed once per start cell and maze, so moving the end
+        only walks the new path.
+        """
+        began = time.perf_counter()
+        path = self.maze.shortest_path(self.start, self.end)
+        elapsed = time.perf_counter() - began
+        
+        self.draw_maze()
+        if self.show_heat.get():
+            self.paint_heat()
+        if path:
+            for row, col in path:
+                self.draw_cell(row, col, self.solution_color)
+        self.flush_cells()
+        if path and self.viewport is not None:
+            self.viewport.show_path(path)
+        
+        if path:
+            self.info_label.config(
+                text=f"✅ Shortest path: {len(path)} | From distance field in {elapsed * 1000:.1f} ms"
+            )
+        else:
+            self.info_label.config(text="❌ The end can't be reached from the start!")
+    
+    def paint_heat(self):
+        """Color every reachable cell by its distance from the start."""
+        levels = field_levels(self.maze.distances(self.start), len(self.heat_palette))
+        if self.viewport is not None:
+            self.viewport.paint_levels(levels, self.heat_palette)
+            return
+        for index, level in enumerate(levels):
+            if level:
+                row, col = divmod(index, self.cols)
+                self.draw_cell(row, col, self.heat_palette[level - 1])
+    
+    def toggle_heat(self):
+        """Show or hide the distance heat map."""
+        if self.is_solving:
+            return
+        if self.show_heat.get():
+            self.show_distances()
+        else:
+            self.clear_solution()
+    
     def clear_solution(self):
         """Clear the solution and redraw maze."""
         if not self.is_solving:
             self.draw_maze()
             self.info_label.config(text="Cleared! Choose an algorithm to solve.")
 
+def measure_canvas(app, runs):
+    """Solve repeatedly and print canvas item count and frame times per run."""
+    app.speed_scale.set(100)
+    
+    def start_run(run):
+        if run == runs:
+            app.root.destroy()
+            return
+        app.frame_times.clear()
+        app.solve_maze('bfs')
+        app.root.after(50, lambda: wait_for_run(run))
+    
+    def wait_for_run(run):
+        text = app.info_label.cget("text")
+        if app.is_solving or app.flush_id is not None or not text.startswith(("✅", "❌")):
+            app.root.after(50, lambda: wait_for_run(run))
+            return
+        frames = sorted(app.frame_times)
+        mean = sum(frames) / len(frames) * 1000 if frames else 0.0
+        worst = frames[-1] * 1000 if frames else 0.0
+        print(f"run {run + 1}: canvas items {len(app.canvas.find_all())}, "
+              f"frames {len(frames)}, mean {mean:.2f} ms, max {worst:.2f} ms")
+        start_run(run + 1)
+    
+    app.root.after(100, lambda: start_run(0))
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maze Solver - BFS & DFS Visualizer")
+    parser.add_argument("--measure", type=int, metavar="RUNS",
+                        help="solve RUNS times and print canvas item count and frame times")
+    parser.add_argument("--metrics", metavar="FILE",
+                        help="on exit, write solver metrics to FILE (CSV if it ends in .csv, else JSON)")
+    parser.add_argument("--detailed-metrics", action="store_true",
+                        help="also trace peak memory and sample the frontier (slows searches down)")
+    args = parser.parse_args()
+    
     root = tk.Tk()
     app = MazeSolver(root)
+    app.detailed_metrics = args.detailed_metrics
+    if args.measure:
+        measure_canvas(app, args.measure)
     root.mainloop()
+    if args.metrics:
+        app.metrics.write(args.metrics)
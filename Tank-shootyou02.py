@@ -1,280 +1,246 @@
+import argparse
+import os
 import pygame
+import random
 import sys
 
+import frame_profiler
+import menu_screens
+import text_cache
+from tank_core import (BOTS, DOWN, FIRE, HEIGHT, MISSILE_FIRE, PROJECTILE_SIZES, TICK_RATE, UP, WIDTH,
+                       TankGame, player_input)
+from tank_render import (BLACK, BLUE, GRAY, PROJECTILE_COLORS, RED, TEXT_SIZE, TITLE_SIZE, WHITE,
+                         YELLOW, DirtyRects, FullRedraw, HudText)
+from tank_replay import Recorder, Recording, ReplayError, seed_arg
+
 # Initialize Pygame
 pygame.init()
 
-# Constants
-WIDTH, HEIGHT = 800, 600
-PLAYER_WIDTH, PLAYER_HEIGHT = 50, 50
-BULLET_WIDTH, BULLET_HEIGHT = 10, 5
-MISSILE_WIDTH, MISSILE_HEIGHT = 30, 15
-PLAYER_SPEED = 5
-BULLET_SPEED = 10
-MISSILE_SPEED = 7
-OBSTACLE_WIDTH, OBSTACLE_HEIGHT = 15, 50  # Reduced size of obstacles
-OBSTACLE_SPEED = 3
-FPS = 60
-MAX_MISSILES = 3
-
-# Colors
-WHITE = (255, 255, 255)
-BLACK = (0, 0, 0)
-RED = (255, 0, 0)
-BLUE = (0, 0, 255)
-YELLOW = (255, 255, 0)
-GRAY = (128, 128, 128)
-GREEN = (0, 255, 0)
+# Constants (the game rules and sizes live in tank_core)
+FPS = 60  # default display rate
+TICK = 1 / TICK_RATE
+MAX_FRAME_TIME = 0.25  # longer hitches are not caught up, so a slow frame can't snowball
 
 # Set up the display
 screen = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption("2-Player Shooting Game with Multiple Obstacles and Guns")
 
-# Fonts
-font = pygame.font.Font(None, 74)
-small_font = pygame.font.Font(None, 36)
-
-# Initialize variables
-player1 = pygame.Rect(50, HEIGHT // 2 - PLAYER_HEIGHT // 2, PLAYER_WIDTH, PLAYER_HEIGHT)
-player2 = pygame.Rect(WIDTH - 50 - PLAYER_WIDTH, HEIGHT // 2 - PLAYER_HEIGHT // 2, PLAYER_WIDTH, PLAYER_HEIGHT)
-player1_score = 0
-player2_score = 0
-bullets = []
-missiles = []
-WINNING_SCORE = None
+# Fonts, from the shared registry; menu text goes through its text cache
+font = text_cache.font(TITLE_SIZE)
+small_font = text_cache.font(TEXT_SIZE)
 
-# Obstacle list
-obstacles = [pygame.Rect(WIDTH // 3, HEIGHT // 4, OBSTACLE_WIDTH, OBSTACLE_HEIGHT),
-             pygame.Rect(WIDTH // 2, HEIGHT // 2, OBSTACLE_WIDTH, OBSTACLE_HEIGHT),
-             pygame.Rect(WIDTH * 2 // 3, HEIGHT * 3 // 4, OBSTACLE_WIDTH, OBSTACLE_HEIGHT)]
-obstacle_directions = [1, -1, 1]  # Directions for each obstacle (up or down)
+INSTRUCTION_LINES = [
+    "Player 1: Use W/S to move, F to fire bullets, R for missiles.",
+    "Player 2: Use Arrow Keys to move, / to fire bullets, M for missiles.",
+    "Hit each other with bullets or missiles to score.",
+    "Each player has 3 missiles, use them wisely.",
+    "Obstacles not effects Missiles .",
+    "Avoid obstacles that move up and down.",
+    "Press Enter to start the game!"
+]
 
-# Gun states
-player1_missiles = MAX_MISSILES
-player2_missiles = MAX_MISSILES
-
-# Reset game
-def reset_game():
-    global player1_score, player2_score, bullets, missiles, player1_missiles, player2_missiles
-    player1_score, player2_score = 0, 0
-    bullets.clear()
-    missiles.clear()
-    player1_missiles = MAX_MISSILES
-    player2_missiles = MAX_MISSILES
+# Where a vertically moving rect is drawn, ``lag`` ticks (0-1) back towards old_y
+def interpolate(rect, old_y, lag):
+    return rect.move(0, round((old_y - rect.y) * lag))
 
 # Winning screen
 def display_winning_screen(winner):
-    while True:
-        screen.fill(BLACK)
-        winner_text = font.render(f"{winner} Wins!", True, YELLOW)
-        restart_text = small_font.render("Press ESC to Restart or Q to Quit", True, WHITE)
-
-        screen.blit(winner_text, (WIDTH // 2 - winner_text.get_width() // 2, HEIGHT // 3))
-        screen.blit(restart_text, (WIDTH // 2 - restart_text.get_width() // 2, HEIGHT // 2))
-
-        pygame.display.flip()
-
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
-                    return "restart"
-                if event.key == pygame.K_q:
-                    pygame.quit()
-                    sys.exit()
+    result = menu_screens.run_screen(menu_screens.TextScreen(
+        [(f"{winner} Wins!", TITLE_SIZE, YELLOW, HEIGHT // 3),
+         ("Press ESC to Restart or Q to Quit", TEXT_SIZE, WHITE, HEIGHT // 2)],
+        {pygame.K_ESCAPE: "restart", pygame.K_q: "quit"}), screen, clock)
+    if result == "quit":
+        pygame.quit()
+        sys.exit()
+    return result
 
 # Setup screen for winning score
 def setup_winning_score():
-    input_text = ""
-    while True:
-        screen.fill(BLACK)
-
-        title_text = font.render("Set Winning Score", True, WHITE)
-        screen.blit(title_text, (WIDTH // 2 - title_text.get_width() // 2, HEIGHT // 3))
-
-        input_surface = font.render(input_text, True, YELLOW)
-        screen.blit(input_surface, (WIDTH // 2 - input_surface.get_width() // 2, HEIGHT // 2))
-
-        instruction_text = small_font.render("Press ENTER to confirm", True, WHITE)
-        screen.blit(instruction_text, (WIDTH // 2 - instruction_text.get_width() // 2, HEIGHT // 2 + 50))
-
-        pygame.display.flip()
-
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_RETURN and input_text.isdigit():
-                    return int(input_text)
-                elif event.key == pygame.K_BACKSPACE:
-                    input_text = input_text[:-1]
-                elif event.unicode.isdigit():
-                    input_text += event.unicode
+    return menu_screens.run_screen(menu_screens.NumberInputScreen(
+        [("Set Winning Score", TITLE_SIZE, WHITE, HEIGHT // 3),
+         ("Press ENTER to confirm", TEXT_SIZE, WHITE, HEIGHT // 2 + 50)],
+        (TITLE_SIZE, YELLOW, HEIGHT // 2)), screen, clock)
 
 # Instructions screen
 def display_instructions():
-    while True:
-        screen.fill(BLACK)
-
-        title_text = font.render("Instructions", True, WHITE)
-        screen.blit(title_text, (WIDTH // 2 - title_text.get_width() // 2, HEIGHT // 6))
-
-        instruction_lines = [
-            "Player 1: Use W/S to move, F to fire bullets, R for missiles.",
-            "Player 2: Use Arrow Keys to move, / to fire bullets, M for missiles.",
-            "Hit each other with bullets or missiles to score.",
-            "Each player has 3 missiles, use them wisely.",
-            "Obstacles not effects Missiles .",
-            "Avoid obstacles that move up and down.",
-            "Press Enter to start the game!"
-        ]
-
-        for i, line in enumerate(instruction_lines):
-            text = small_font.render(line, True, WHITE)
-            screen.blit(text, (WIDTH // 2 - text.get_width() // 2, HEIGHT // 3 + i * 40))
-
-        pygame.display.flip()
-
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_RETURN:
-                    return  # Start the game after pressing Enter
+    items = [("Instructions", TITLE_SIZE, WHITE, HEIGHT // 6)]
+    items += [(line, TEXT_SIZE, WHITE, HEIGHT // 3 + i * 40) for i, line in enumerate(INSTRUCTION_LINES)]
+    # Start the game after pressing Enter
+    menu_screens.run_screen(menu_screens.TextScreen(items, {pygame.K_RETURN: "start"}), screen, clock)
+
+# Keys of each player: (up, down, fire, missile); fire keys act on key press
+PLAYER_KEYS = {1: (pygame.K_w, pygame.K_s, pygame.K_f, pygame.K_r),
+               2: (pygame.K_UP, pygame.K_DOWN, pygame.K_SLASH, pygame.K_m)}
+FIRE_KEYS = [key for keys in PLAYER_KEYS.values() for key in keys[2:]]
+
+# One tick's input bits from the held keys and the fire keys pressed since the last tick
+def keyboard_input(keys, fire_keys, player):
+    up, down, bullet, missile = PLAYER_KEYS[player]
+    bits = 0
+    if keys[up]:
+        bits |= UP
+    if keys[down]:
+        bits |= DOWN
+    if bullet in fire_keys:
+        bits |= FIRE
+    if missile in fire_keys:
+        bits |= MISSILE_FIRE
+    return player_input(player, bits)
+
+parser = argparse.ArgumentParser(description="2-player shooting game")
+parser.add_argument("--dirty-rects", action="store_true",
+                    help="update only the screen regions that changed (for slow displays)")
+parser.add_argument("--fps", type=int, default=FPS,
+                    help=f"display frame rate; the game itself always runs at {TICK_RATE} ticks/s")
+parser.add_argument("--bot", type=int, choices=(1, 2), action="append", default=[],
+                    help="let a bot play this player (repeat for both)")
+parser.add_argument("--bot-kind", choices=sorted(BOTS), default="chase", help="bot used by --bot")
+parser.add_argument("--seed", type=seed_arg, default=None, help="seed for the bots (recorded with --record)")
+parser.add_argument("--record", metavar="FILE",
+                    help="record every tick's inputs to FILE (later matches go to FILE-2, FILE-3, ...)")
+parser.add_argument("--replay", metavar="FILE", help="watch a recorded match instead of playing")
+parser.add_argument("--replay-speed", type=float, default=1.0,
+                    help="replay this many times faster than real time")
+frame_profiler.add_arguments(parser)
+args = parser.parse_args()
+
+# Recording file of the n-th match of this session
+def record_path(n):
+    if n == 1:
+        return args.record
+    root, ext = os.path.splitext(args.record)
+    return f"{root}-{n}{ext}"
 
 # Main game loop
 clock = pygame.time.Clock()
 running = True
-
-# Prompt for winning score
-WINNING_SCORE = setup_winning_score()
-
-# Display instructions screen after setting winning score
-display_instructions()
+renderer = DirtyRects(screen, BLACK) if args.dirty_rects else FullRedraw(screen, BLACK)
+seed = args.seed if args.seed is not None else random.randrange(2 ** 32)
+bots = [BOTS[args.bot_kind](player, f"{seed}:{player}") for player in args.bot]
+humans = [player for player in (1, 2) if player not in args.bot]
+profiler = frame_profiler.from_args(args, args.fps)
+
+# HUD text, rendered again only when its value changes
+score_hud = HudText(font, WHITE)
+missile_hud1 = HudText(small_font, RED)
+missile_hud2 = HudText(small_font, BLUE)
+
+replay = None
+if args.replay:
+    # Replays skip the menus and feed the recorded inputs instead of the keyboard
+    recording = Recording(args.replay)
+    game = recording.new_game()
+    replay = recording.inputs()
+else:
+    # Prompt for winning score
+    game = TankGame(winning_score=setup_winning_score())
+
+    # Display instructions screen after setting winning score
+    display_instructions()
+player1, player2, obstacles, projectiles = game.player1, game.player2, game.obstacles, game.projectiles
+if profiler.enabled:
+    game.profiler = profiler
+match = 1
+recorder = Recorder(record_path(match), game, seed) if args.record else None
+
+# Fixed-timestep loop: frame time is banked in ``accumulator`` and spent in
+# whole ticks, so the game plays the same at any frame rate; drawing then
+# interpolates between the last two ticks.  Key presses wait for the next tick.
+accumulator = 0.0
+pending_fire = []
+previous_y = [player1.y, player2.y] + [obstacle.y for obstacle in obstacles]
+clock.tick()
 
 while running:
-    screen.fill(BLACK)
-
+    profiler.begin_frame()
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
             running = False
-        if event.type == pygame.KEYDOWN:
-            # Player 1 fires bullets (f key)
-            if event.key == pygame.K_f:
-                bullet_rect = pygame.Rect(player1.right, player1.centery - BULLET_HEIGHT // 2, BULLET_WIDTH, BULLET_HEIGHT)
-                bullets.append({'rect': bullet_rect, 'direction': 1, 'owner': 1})
-            # Player 1 fires missiles (r key)
-            if event.key == pygame.K_r and player1_missiles > 0:
-                missile_rect = pygame.Rect(player1.right, player1.centery - MISSILE_HEIGHT // 2, MISSILE_WIDTH, MISSILE_HEIGHT)
-                missiles.append({'rect': missile_rect, 'direction': 1, 'owner': 1})
-                player1_missiles -= 1
+        if event.type == pygame.KEYDOWN and event.key in FIRE_KEYS:
+            pending_fire.append(event.key)
+        profiler.handle_event(event)
 
-            # Player 2 fires bullets (slash key)
-            if event.key == pygame.K_SLASH:
-                bullet_rect = pygame.Rect(player2.left - BULLET_WIDTH, player2.centery - BULLET_HEIGHT // 2, BULLET_WIDTH, BULLET_HEIGHT)
-                bullets.append({'rect': bullet_rect, 'direction': -1, 'owner': 2})
-            # Player 2 fires missiles (m key)
-            if event.key == pygame.K_m and player2_missiles > 0:
-                missile_rect = pygame.Rect(player2.left - MISSILE_WIDTH, player2.centery - MISSILE_HEIGHT // 2, MISSILE_WIDTH, MISSILE_HEIGHT)
-                missiles.append({'rect': missile_rect, 'direction': -1, 'owner': 2})
-                player2_missiles -= 1
-
-    # Player movement
     keys = pygame.key.get_pressed()
-    # Player 1 movement (W, S)
-    if keys[pygame.K_w] and player1.top > 0:
-        player1.y -= PLAYER_SPEED
-    if keys[pygame.K_s] and player1.bottom < HEIGHT:
-        player1.y += PLAYER_SPEED
-    # Player 2 movement (UP, DOWN)
-    if keys[pygame.K_UP] and player2.top > 0:
-        player2.y -= PLAYER_SPEED
-    if keys[pygame.K_DOWN] and player2.bottom < HEIGHT:
-        player2.y += PLAYER_SPEED
-
-    # Move bullets
-    for bullet in bullets[:]:
-        bullet['rect'].x += bullet['direction'] * BULLET_SPEED
-
-        # Check if bullet collides with any obstacle
-        for obstacle in obstacles:
-            if bullet['rect'].colliderect(obstacle):
-                bullets.remove(bullet)
-                break  # Stop checking other obstacles if the bullet hits one
-
-        # Check collision with players
-        if bullet['owner'] == 1 and player2.colliderect(bullet['rect']):
-            player1_score += 1
-            bullets.remove(bullet)
-        elif bullet['owner'] == 2 and player1.colliderect(bullet['rect']):
-            player2_score += 1
-            bullets.remove(bullet)
-
-        # Remove bullets that go off screen
-        if bullet['rect'].x < 0 or bullet['rect'].x > WIDTH:
-            bullets.remove(bullet)
-
-    # Move missiles and check collision
-    for missile in missiles[:]:
-        missile['rect'].x += missile['direction'] * MISSILE_SPEED
-
-        # Check missile hit
-        if missile['owner'] == 1 and player2.colliderect(missile['rect']):
-            player1_score += WINNING_SCORE // 3
-            missiles.remove(missile)
-        elif missile['owner'] == 2 and player1.colliderect(missile['rect']):
-            player2_score += WINNING_SCORE // 3
-            missiles.remove(missile)
-
-        # Remove missiles that go off screen
-        if missile['rect'].x < 0 or missile['rect'].x > WIDTH:
-            missiles.remove(missile)
-
-    # Move obstacles
-    for i, obstacle in enumerate(obstacles):
-        obstacle.y += obstacle_directions[i] * OBSTACLE_SPEED
-        if obstacle.top <= 0 or obstacle.bottom >= HEIGHT:
-            obstacle_directions[i] *= -1
+    profiler.lap("events")
+    frame_time = min(clock.tick(args.fps) / 1000, MAX_FRAME_TIME)
+    profiler.lap("wait")
+    accumulator += frame_time * args.replay_speed if replay else frame_time
+    while accumulator >= TICK:
+        if replay:
+            inputs = next(replay, None)
+            if inputs is None:
+                running = False
+                break
+        else:
+            inputs = 0
+            for player in humans:
+                inputs |= keyboard_input(keys, pending_fire, player)
+            for bot in bots:
+                inputs |= bot(game)
+        if recorder:
+            recorder.record(inputs)
+        previous_y = [player1.y, player2.y] + [obstacle.y for obstacle in obstacles]
+        game.step(inputs)
+        pending_fire.clear()
+        accumulator -= TICK
+    profiler.lap("simulation")
 
     # Check for winning condition
-    if player1_score >= WINNING_SCORE:
-        result = display_winning_screen("Player 1")
-        if result == "restart":
-            WINNING_SCORE = setup_winning_score()
-            reset_game()
-    if player2_score >= WINNING_SCORE:
-        result = display_winning_screen("Player 2")
+    winner = game.winner()
+    if winner is not None and not replay:
+        if recorder:
+            recorder.close(game)
+        result = display_winning_screen(f"Player {winner}")
         if result == "restart":
-            WINNING_SCORE = setup_winning_score()
-            reset_game()
-
-    # Drawing
-    pygame.draw.rect(screen, RED, player1)
-    pygame.draw.rect(screen, BLUE, player2)
-
-    for bullet in bullets:
-        pygame.draw.rect(screen, YELLOW, bullet['rect'])
-
-    for missile in missiles:
-        pygame.draw.rect(screen, GREEN, missile['rect'])
-
-    for obstacle in obstacles:
-        pygame.draw.rect(screen, GRAY, obstacle)
-
-    score_text = font.render(f"{player1_score} - {player2_score}", True, WHITE)
-    screen.blit(score_text, (WIDTH // 2 - score_text.get_width() // 2, 20))
-
-    missile_text1 = small_font.render(f"Missiles: {player1_missiles}", True, RED)
-    missile_text2 = small_font.render(f"Missiles: {player2_missiles}", True, BLUE)
-    screen.blit(missile_text1, (20, 20))
-    screen.blit(missile_text2, (WIDTH - missile_text2.get_width() - 20, 20))
-
-    pygame.display.flip()
-    clock.tick(FPS)
-
+            game.winning_score = setup_winning_score()
+            game.reset()
+            if recorder:
+                match += 1
+                recorder = Recorder(record_path(match), game, seed)
+            renderer.invalidate()
+            clock.tick()
+            profiler.begin_frame()
+
+    # Drawing, between the previous tick and the latest one; every drawn rect
+    # is kept for the dirty-rect renderer
+    renderer.begin()
+    lag = 1 - accumulator / TICK
+    drawn = [pygame.draw.rect(screen, RED, interpolate(player1, previous_y[0], lag)),
+             pygame.draw.rect(screen, BLUE, interpolate(player2, previous_y[1], lag))]
+
+    # A projectile was dx behind one tick ago
+    for i, x, y, owner, kind in projectiles.live():
+        x -= round(projectiles.dx[i] * lag)
+        drawn.append(pygame.draw.rect(screen, PROJECTILE_COLORS[kind], (x, y, *PROJECTILE_SIZES[kind])))
+
+    for obstacle, old_y in zip(obstacles, previous_y[2:]):
+        drawn.append(pygame.draw.rect(screen, GRAY, interpolate(obstacle, old_y, lag)))
+
+    score_text = score_hud.render(f"{game.player1_score} - {game.player2_score}")
+    drawn.append(screen.blit(score_text, (WIDTH // 2 - score_text.get_width() // 2, 20)))
+
+    missile_text1 = missile_hud1.render(f"Missiles: {game.player1_missiles}")
+    missile_text2 = missile_hud2.render(f"Missiles: {game.player2_missiles}")
+    drawn.append(screen.blit(missile_text1, (20, 20)))
+    drawn.append(screen.blit(missile_text2, (WIDTH - missile_text2.get_width() - 20, 20)))
+    profiler.lap("draw")
+
+    overlay = profiler.draw(screen)
+    if overlay:
+        drawn.append(overlay)
+    renderer.end(drawn)
+    profiler.lap("flip")
+    profiler.end_frame()
+
+if recorder:
+    recorder.close(game)
+if replay:
+    try:
+        if recording.end is None:
+            print(f"{args.replay}: no end state recorded, not verified")
+        elif game.tick == recording.ticks:
+            recording.verify(game)
+            print(f"{args.replay}: end state verified")
+    except ReplayError as exc:
+        print(exc)
 pygame.quit()
-
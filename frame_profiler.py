@@ -0,0 +1,227 @@
+"""Per-frame timing for the pygame games: an overlay and Chrome trace export.
+
+A game loop calls ``begin_frame()`` at the top of each frame and
+``lap(name)`` after each phase of it (events, simulation, collision,
+draw, flip, wait): the time since the previous lap is charged to ``name``.
+A phase may be lapped several times in a frame, e.g. once per simulation
+tick; its times add up.  ``end_frame()`` closes the frame.
+
+The overlay (``draw(screen)``, toggled with F3) shows the last few seconds
+of frame times as stacked bars, one colour per phase, against the frame
+budget, plus p50/p95/p99/max frame time and the average of each phase.
+With a trace path, every lap is also kept as a Chrome trace event and the
+trace is written at exit; open it in chrome://tracing or Perfetto.
+
+Profiling is opt-in: ``from_args`` returns a NullProfiler, whose methods
+do nothing, unless ``--profile`` or ``--trace FILE`` was given, so an
+unprofiled game only pays for a few empty method calls per frame.
+"""
+import atexit
+import json
+import time
+from collections import deque
+
+import pygame
+
+HISTORY = 240  # frames kept for the graph and percentiles
+TRACE_FRAMES = 36000  # frames kept for the trace, the latest 10 minutes at 60 FPS
+TEXT_EVERY = 15  # frames between overlay text updates
+TOGGLE_KEY = pygame.K_F3
+
+PHASE_COLORS = {
+    'events': (80, 160, 255),
+    'simulation': (80, 220, 120),
+    'collision': (240, 200, 60),
+    'draw': (240, 120, 60),
+    'flip': (200, 80, 220),
+    'wait': (70, 70, 70),
+    'overlay': (255, 255, 255),
+}
+OTHER_COLOR = (150, 150, 150)
+
+GRAPH_WIDTH, GRAPH_HEIGHT = HISTORY, 80
+MS_PER_PIXEL = 0.5
+
+
+class NullProfiler:
+    """Stands in for FrameProfiler when profiling is off."""
+
+    enabled = False
+
+    def begin_frame(self):
+        pass
+
+    def lap(self, name):
+        pass
+
+    def end_frame(self):
+        pass
+
+    def handle_event(self, event):
+        pass
+
+    def draw(self, screen):
+        return None
+
+
+class FrameProfiler:
+    """Times the phases of each frame; see the module docstring."""
+
+    enabled = True
+
+    def __init__(self, fps=60, overlay=True, trace_path=None):
+        self.budget = 1000 / fps
+        self.overlay = overlay
+        self.trace_path = trace_path
+        self.frames = deque(maxlen=HISTORY)  # (total ms, {phase: ms})
+        self.trace = deque(maxlen=TRACE_FRAMES)  # (start us, [(phase, start us, dur us)])
+        self.origin = time.perf_counter()
+        self.start = self.last = self.origin
+        self.phases = {}
+        self.events = []
+        self.frame_count = 0
+        self.font = None
+        self.rows = []
+        self.graph = None
+        self.graph_frame = 0  # frame_count when the graph was last brought up to date
+        if trace_path:
+            atexit.register(self.write_trace)
+
+    def begin_frame(self):
+        self.start = self.last = time.perf_counter()
+        self.phases = {}
+        self.events = []
+
+    def lap(self, name):
+        now = time.perf_counter()
+        elapsed = now - self.last
+        self.phases[name] = self.phases.get(name, 0.0) + elapsed * 1000
+        if self.trace_path:
+            self.events.append((name, (self.last - self.origin) * 1e6, elapsed * 1e6))
+        self.last = now
+
+    def end_frame(self):
+        total = (time.perf_counter() - self.start) * 1000
+        self.frames.append((total, self.phases))
+        if self.trace_path:
+            self.trace.append(((self.start - self.origin) * 1e6, total * 1000, self.events))
+        self.frame_count += 1
+
+    def handle_event(self, event):
+        """Toggle the overlay on F3."""
+        if event.type == pygame.KEYDOWN and event.key == TOGGLE_KEY:
+            self.overlay = not self.overlay
+
+    def percentiles(self):
+        """(p50, p95, p99, max) frame time in ms over the recent frames."""
+        totals = sorted(total for total, _ in self.frames)
+        if not totals:
+            return 0.0, 0.0, 0.0, 0.0
+        last = len(totals) - 1
+        return (totals[last * 50 // 100], totals[last * 95 // 100], totals[last * 99 // 100],
+                totals[last])
+
+    def _update_text(self):
+        """Render the percentiles and phase averages, wrapped to the graph's width."""
+        if self.font is None:
+            self.font = pygame.font.Font(None, 20)
+        p50, p95, p99, worst = self.percentiles()
+        sums = {}
+        for _, phases in self.frames:
+            for name, ms in phases.items():
+                sums[name] = sums.get(name, 0.0) + ms
+        count = max(len(self.frames), 1)
+        render = self.font.render
+        self.rows = [[render(f"p50 {p50:.1f} p95 {p95:.1f} p99 {p99:.1f} max {worst:.1f} ms",
+                             True, (255, 255, 255))]]
+        width = 0
+        for name, ms in sums.items():
+            surface = render(f"{name} {ms / count:.2f}", True, PHASE_COLORS.get(name, OTHER_COLOR))
+            if width and width + surface.get_width() > GRAPH_WIDTH:
+                width = 0
+            if not width:
+                self.rows.append([])
+            self.rows[-1].append(surface)
+            width += surface.get_width() + 8
+
+    def _update_graph(self):
+        """Scroll the graph left and add a stacked bar for each frame since the last draw."""
+        new = min(self.frame_count - self.graph_frame, len(self.frames))
+        if self.graph is None or new >= GRAPH_WIDTH:
+            self.graph = pygame.Surface((GRAPH_WIDTH, GRAPH_HEIGHT))
+            new = len(self.frames)
+        else:
+            self.graph.scroll(-new, 0)
+            self.graph.fill((0, 0, 0), (GRAPH_WIDTH - new, 0, new, GRAPH_HEIGHT))
+        self.graph_frame = self.frame_count
+
+        frames = list(self.frames)[len(self.frames) - new:]
+        for x, (_, phases) in enumerate(frames, GRAPH_WIDTH - len(frames)):
+            y = GRAPH_HEIGHT
+            for name, ms in phases.items():
+                height = min(round(ms / MS_PER_PIXEL), y)
+                if height > 0:
+                    y -= height
+                    self.graph.fill(PHASE_COLORS.get(name, OTHER_COLOR), (x, y, 1, height))
+
+    def draw(self, screen):
+        """Draw the overlay in the bottom-left corner; return its rect (None when hidden).
+
+        The time spent drawing it is lapped as 'overlay'.
+        """
+        if not self.overlay:
+            return None
+        if self.frame_count % TEXT_EVERY == 0 or not self.rows:
+            self._update_text()
+        line_height = self.font.get_linesize()
+        width = max(GRAPH_WIDTH, self.rows[0][0].get_width())
+        panel = pygame.Rect(0, 0, width + 8, GRAPH_HEIGHT + 8 + line_height * len(self.rows))
+        panel.bottomleft = screen.get_rect().bottomleft
+        screen.fill((0, 0, 0), panel)
+
+        self._update_graph()
+        screen.blit(self.graph, (panel.left + 4, panel.top + 4))
+        base = panel.top + 4 + GRAPH_HEIGHT
+        budget_y = base - round(self.budget / MS_PER_PIXEL)
+        if budget_y > panel.top:
+            pygame.draw.line(screen, (255, 0, 0), (panel.left + 4, budget_y),
+                             (panel.left + 4 + GRAPH_WIDTH, budget_y))
+
+        y = base + 2
+        for row in self.rows:
+            x = panel.left + 4
+            for surface in row:
+                screen.blit(surface, (x, y))
+                x += surface.get_width() + 8
+            y += line_height
+        self.lap("overlay")
+        return panel
+
+    def write_trace(self, path=None):
+        """Write the recorded frames as Chrome trace JSON."""
+        path = path or self.trace_path
+        if not path:
+            return
+        events = []
+        for start, duration, laps in self.trace:
+            events.append({"name": "frame", "ph": "X", "ts": round(start, 1),
+                           "dur": round(duration, 1), "pid": 1, "tid": 1})
+            events += [{"name": name, "ph": "X", "ts": round(begin, 1), "dur": round(dur, 1),
+                        "pid": 1, "tid": 1} for name, begin, dur in laps]
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+def add_arguments(parser):
+    """Add --profile and --trace to a game's argument parser."""
+    parser.add_argument("--profile", action="store_true",
+                        help="show a frame-time overlay (F3 toggles it)")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="write per-frame phase timings to FILE as Chrome trace JSON on exit")
+
+
+def from_args(args, fps=60):
+    """A FrameProfiler if profiling was asked for, else a NullProfiler."""
+    if not args.profile and not args.trace:
+        return NullProfiler()
+    return FrameProfiler(fps, overlay=args.profile, trace_path=args.trace)
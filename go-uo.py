@@ -1,6 +1,11 @@
+import argparse
 import pygame
 import random
 
+import frame_profiler
+import menu_screens
+import text_cache
+
 # Initialize Pygame
 pygame.init()
 
@@ -31,7 +36,8 @@ helicopter_color = (255, 255, 0)  # Yellow helicopter
 # Score and high score
 score = 0
 high_score = 0
-font = pygame.font.SysFont("Arial", 24)
+FONT, FONT_SIZE = "Arial", 24
+text_cache.fonts.preload((FONT_SIZE, FONT))
 
 # Helicopter properties
 helicopter_x = WIDTH // 2
@@ -56,31 +62,39 @@ create_platforms()
 
 # Function to display the score
 def display_score():
-    score_text = font.render(f"Score: {score}", True, WHITE)
+    score_text = text_cache.render(f"Score: {score}", FONT_SIZE, WHITE, FONT)
     screen.blit(score_text, (10, 10))
 
 # Function to display the instructions
 def display_instructions():
-    instructions_text = font.render("Press SPACE to Start the Game", True, WHITE)
+    instructions_text = text_cache.render("Press SPACE to Start the Game", FONT_SIZE, WHITE, FONT)
     screen.blit(instructions_text, (WIDTH // 2 - instructions_text.get_width() // 2, HEIGHT // 3))
 
-    instructions_text2 = font.render("Use LEFT/RIGHT Arrow keys to move.", True, WHITE)
+    instructions_text2 = text_cache.render("Use LEFT/RIGHT Arrow keys to move.", FONT_SIZE, WHITE, FONT)
     screen.blit(instructions_text2, (WIDTH // 2 - instructions_text2.get_width() // 2, HEIGHT // 2))
 
-    instructions_text3 = font.render("Press SPACE to Jump.", True, WHITE)
+    instructions_text3 = text_cache.render("Press SPACE to Jump.", FONT_SIZE, WHITE, FONT)
     screen.blit(instructions_text3, (WIDTH // 2 - instructions_text3.get_width() // 2, HEIGHT // 2 + 30))
 
+parser = argparse.ArgumentParser(description="Helicopter Adventure")
+frame_profiler.add_arguments(parser)
+args = parser.parse_args()
+profiler = frame_profiler.from_args(args, FPS)
+
 # Game loop
 clock = pygame.time.Clock()
 running = True
 game_started = False
 
 while running:
+    profiler.begin_frame()
     if not game_started:
         # Show instructions screen
         screen.fill(BLACK)
         display_instructions()
+        profiler.lap("draw")
         pygame.display.flip()
+        profiler.lap("flip")
 
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
@@ -90,6 +104,8 @@ while running:
                     game_started = True  # Start the game
                 if event.key == pygame.K_q:
                     running = False  # Quit the game
+            profiler.handle_event(event)
+        profiler.lap("events")
 
     else:
         # Main game loop
@@ -106,6 +122,8 @@ while running:
                 if event.key == pygame.K_SPACE and not is_jumping:
                     is_jumping = True
                     helicopter_velocity_y = JUMP_STRENGTH
+            profiler.handle_event(event)
+        profiler.lap("events")
 
         # Helicopter movement
         if is_jumping:
@@ -138,6 +156,7 @@ while running:
                 platform.y = random.randint(-100, -20)
                 platform.x = random.randint(100, WIDTH - 100)
                 score += 1  # Increase score when platform passes
+        profiler.lap("simulation")
 
         # Platform collision detection
         game_over = False
@@ -145,37 +164,26 @@ while running:
             if platform.colliderect(pygame.Rect(helicopter_x, helicopter_y, HELI_WIDTH, HELI_HEIGHT)):
                 game_over = True
                 break
+        profiler.lap("collision")
 
         if game_over:
             if score > high_score:
                 high_score = score  # Update high score if the current score is higher
             # Display Game Over screen
-            game_over_text = font.render("Game Over", True, WHITE)
-            score_text = font.render(f"Score: {score}", True, WHITE)
-            high_score_text = font.render(f"High Score: {high_score}", True, WHITE)
-            
-            screen.fill(BLACK)
-            screen.blit(game_over_text, (WIDTH // 2 - game_over_text.get_width() // 2, HEIGHT // 3))
-            screen.blit(score_text, (WIDTH // 2 - score_text.get_width() // 2, HEIGHT // 2))
-            screen.blit(high_score_text, (WIDTH // 2 - high_score_text.get_width() // 2, HEIGHT // 2 + 40))
-            pygame.display.flip()
-
-            # Wait for key press to restart or quit
-            waiting_for_key = True
-            while waiting_for_key:
-                for event in pygame.event.get():
-                    if event.type == pygame.QUIT:
-                        running = False
-                        waiting_for_key = False
-                    if event.type == pygame.KEYDOWN:
-                        if event.key == pygame.K_ESCAPE:
-                            game_started = False  # Restart the game
-                            score = 0  # Reset the score
-                            create_platforms()  # Create new platforms
-                            waiting_for_key = False
-                        if event.key == pygame.K_q:
-                            running = False  # Quit the game
-                            waiting_for_key = False
+            # Display Game Over screen and wait for key press to restart or quit
+            result = menu_screens.run_screen(menu_screens.TextScreen(
+                [("Game Over", FONT_SIZE, WHITE, HEIGHT // 3),
+                 (f"Score: {score}", FONT_SIZE, WHITE, HEIGHT // 2),
+                 (f"High Score: {high_score}", FONT_SIZE, WHITE, HEIGHT // 2 + 40)],
+                {pygame.K_ESCAPE: "restart", pygame.K_q: "quit"},
+                on_quit="quit", font=FONT), screen, clock)
+            if result == "quit":
+                running = False  # Quit the game
+            else:
+                game_started = False  # Restart the game
+                score = 0  # Reset the score
+                create_platforms()  # Create new platforms
+            profiler.begin_frame()
 
         # Draw everything
         screen.fill(BLACK)
@@ -189,11 +197,16 @@ while running:
 
         # Display the score
         display_score()
+        profiler.lap("draw")
 
+        profiler.draw(screen)
         pygame.display.flip()
+        profiler.lap("flip")
 
     # Frame rate
     clock.tick(FPS)
+    profiler.lap("wait")
+    profiler.end_frame()
 
 # Quit Pygame
 pygame.quit()
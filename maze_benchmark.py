@@ -0,0 +1,417 @@
+"""Benchmarks for the maze engine.
+
+By default, compares the path-copying solvers with the parent-pointer
+search core.  The path-copying DFS needs memory proportional to visited
+cells times path length, so the legacy solvers only run on grids up to
+--legacy-limit cells.  On a larger grid their time and peak memory are
+extrapolated from two smaller grids of the same shape, wall ratio and
+seed, and marked as estimates.
+
+With --generators, measures generation throughput (cells per second) for
+every registered generator instead.
+
+With --suite, runs a size sweep (20x30 up to 2000x2000) of seeded mazes,
+timing generation, mask building and the BFS and DFS solvers, and reports
+throughput, peak memory and how time scales with maze size.  Results are
+saved as JSON per commit in --results-dir and compared with the latest
+run of another commit with the same generator, seed and sizes; the run
+exits with status 1 if anything got slower (or bigger) by more than
+--tolerance.  A --baseline file of a different generator, seed or sizes is
+refused.
+
+Usage: python maze_benchmark.py [--rows 1000] [--cols 1000] [--legacy-limit N]
+       python maze_benchmark.py --generators [--rows 1000] [--cols 1000] [--repeat 3]
+       python maze_benchmark.py --suite [--sizes 20x30,100x150] [--baseline FILE]
+                                [--tolerance 0.25] [--no-compare]
+"""
+import argparse
+import glob
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from collections import deque
+
+from maze_engine import GENERATORS, Maze, generate_maze, np, solve
+
+DIRECTIONS = [(0, 1), (1, 0), (0, -1), (-1, 0)]
+
+SUITE_SIZES = [(20, 30), (50, 75), (100, 150), (250, 375), (500, 750),
+               (1000, 1000), (2000, 2000)]
+SUITE_OPERATIONS = ('generate', 'masks', 'bfs', 'dfs')
+
+# Time each operation in loops of at least this many seconds, so small
+# mazes are not swamped by timer noise
+MIN_LOOP_SECONDS = 0.2
+
+
+def legacy_solve(maze, start, end, algorithm='bfs'):
+    """The original solver loop: every frontier entry carries its own path."""
+    rows, cols = len(maze), len(maze[0])
+    frontier = deque([(start, [start])])
+    visited = {start}
+    order = []
+    steps = 0
+
+    while frontier:
+        current, path = frontier.pop() if algorithm == 'dfs' else frontier.popleft()
+        order.append(current)
+        if current == end:
+            return order, path, steps
+        row, col = current
+        for dr, dc in DIRECTIONS:
+            new_row, new_col = row + dr, col + dc
+            new_pos = (new_row, new_col)
+            if (0 <= new_row < rows and 0 <= new_col < cols
+                    and maze[new_row][new_col] == 0 and new_pos not in visited):
+                visited.add(new_pos)
+                frontier.append((new_pos, path + [new_pos]))
+        steps += 1
+
+    return order, None, steps
+
+
+def random_grid(rows, cols, wall_ratio, seed):
+    """Build a grid with scattered walls and open corners at start and end."""
+    rng = random.Random(seed)
+    maze = [[1 if rng.random() < wall_ratio else 0 for _ in range(cols)]
+            for _ in range(rows)]
+    for row, col in ((0, 0), (0, 1), (1, 0),
+                     (rows - 1, cols - 1), (rows - 1, cols - 2), (rows - 2, cols - 1)):
+        maze[row][col] = 0
+    return maze
+
+
+def measure(func, *args):
+    """Return (result, seconds, peak bytes); memory is traced in a second run."""
+    began = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - began
+
+    tracemalloc.start()
+    func(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def extrapolate_legacy(rows, cols, limit, wall_ratio, seed, algorithm):
+    """Estimate the path-copying solver's (seconds, peak bytes) on a grid too big to run.
+
+    The solver runs on grids of limit/4 and limit cells with the same shape,
+    and each measure is extended to rows x cols along the power law through
+    those two points.  Returns the estimates and the two sizes used.
+    """
+    scale = math.sqrt(limit / (rows * cols))
+    sizes = [(max(2, round(rows * scale * factor)), max(2, round(cols * scale * factor)))
+             for factor in (0.5, 1.0)]
+    samples = []
+    for small_rows, small_cols in sizes:
+        grid = random_grid(small_rows, small_cols, wall_ratio, seed)
+        _, elapsed, peak = measure(legacy_solve, grid, (0, 0),
+                                   (small_rows - 1, small_cols - 1), algorithm)
+        samples.append((small_rows * small_cols, elapsed, peak))
+    (cells1, time1, peak1), (cells2, time2, peak2) = samples
+    span = math.log(cells2 / cells1)
+    estimates = []
+    for small, large in ((time1, time2), (peak1, peak2)):
+        exponent = math.log(large / small) / span if small > 0 and large > 0 else 1.0
+        estimates.append(large * (rows * cols / cells2) ** exponent)
+    return estimates[0], estimates[1], sizes
+
+
+def benchmark_generators(rows, cols, repeat, seed):
+    """Print the best-of-``repeat`` generation throughput of each generator."""
+    print(f"Generating {rows}x{cols} mazes, best of {repeat}")
+    for name in GENERATORS:
+        best = float("inf")
+        for run in range(repeat):
+            rng = random.Random(seed + run)
+            began = time.perf_counter()
+            generate_maze(rows, cols, rng, generator=name)
+            best = min(best, time.perf_counter() - began)
+        print(f"  {name:<12} {best:7.2f}s  {rows * cols / best:12,.0f} cells/s")
+
+
+def best_time(func, repeat):
+    """Best per-call time of ``func()`` over ``repeat`` timing loops."""
+    number = 1
+    while True:
+        began = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - began
+        if elapsed >= MIN_LOOP_SECONDS or number >= 1 << 16:
+            break
+        number *= 2
+    best = elapsed / number
+    for _ in range(repeat - 1):
+        began = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, (time.perf_counter() - began) / number)
+    return best
+
+
+def peak_memory(func):
+    """Peak bytes allocated during one call of ``func()``."""
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def suite_operations(rows, cols, generator, seed):
+    """Name -> zero-argument callable for each of SUITE_OPERATIONS."""
+    maze = generate_maze(rows, cols, generator=generator, seed=seed)
+    maze.open_masks()
+
+    def build_masks():
+        maze._masks = None
+        maze.open_masks()
+
+    return {
+        'generate': lambda: generate_maze(rows, cols, generator=generator, seed=seed),
+        'masks': build_masks,
+        'bfs': lambda: solve(maze, 'bfs'),
+        'dfs': lambda: solve(maze, 'dfs'),
+    }
+
+
+def run_suite(sizes, generator, repeat, seed, memory=True):
+    """Time every operation at every size; return a list of result dicts."""
+    results = []
+    previous = {}
+    print(f"{'size':>11} {'operation':<9} {'best ms':>10} {'Mcells/s':>9} "
+          f"{'peak MiB':>9} {'scaling':>8}")
+    for rows, cols in sizes:
+        cells = rows * cols
+        for name, func in suite_operations(rows, cols, generator, seed).items():
+            seconds = best_time(func, repeat)
+            peak = peak_memory(func) if memory else None
+            # Exponent of time against cells since the previous size: 1.0 is linear
+            scaling = None
+            if name in previous:
+                last_cells, last_seconds = previous[name]
+                scaling = math.log(seconds / last_seconds) / math.log(cells / last_cells)
+            previous[name] = (cells, seconds)
+            results.append({
+                "rows": rows, "cols": cols, "operation": name, "seconds": seconds,
+                "cells_per_second": cells / seconds, "peak_bytes": peak, "scaling": scaling,
+            })
+            print(f"{rows:>5}x{cols:<5} {name:<9} {seconds * 1000:10.3f} "
+                  f"{cells / seconds / 1e6:9.2f} "
+                  f"{peak / 2**20 if peak is not None else float('nan'):9.2f} "
+                  f"{scaling if scaling is not None else float('nan'):8.2f}")
+    return results
+
+
+def git_commit():
+    """Short hash of HEAD, with '-dirty' for uncommitted changes, or 'unknown'."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=here,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=here,
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return commit + "-dirty" if dirty else commit
+
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.node(),
+        "numpy": np.__version__ if np is not None else None,
+    }
+
+
+def suite_config(run):
+    """(generator, seed, sizes) of a suite run; only runs with equal configs compare."""
+    sizes = run.get("sizes") or {(r["rows"], r["cols"]) for r in run["results"]}
+    return run.get("generator"), run.get("seed"), sorted(tuple(size) for size in sizes)
+
+
+def latest_results(results_dir, exclude_commit, config):
+    """The most recent saved run of a different commit with the same config, or None."""
+    runs = []
+    for path in glob.glob(os.path.join(results_dir, "*.json")):
+        with open(path) as f:
+            run = json.load(f)
+        if run.get("commit") != exclude_commit and suite_config(run) == config:
+            runs.append(run)
+    return max(runs, key=lambda run: run["timestamp"]) if runs else None
+
+
+def check_baseline(run, baseline):
+    """Raise ValueError unless ``baseline`` ran the same generator, seed and sizes."""
+    generator, seed, sizes = suite_config(run)
+    old_generator, old_seed, old_sizes = suite_config(baseline)
+    if (generator, seed) != (old_generator, old_seed):
+        raise ValueError(f"baseline {baseline.get('commit')} used {old_generator} mazes "
+                         f"with seed {old_seed}, not {generator} with seed {seed}")
+    if sizes != old_sizes:
+        raise ValueError(f"baseline {baseline.get('commit')} used different sizes")
+
+
+def compare(run, baseline, tolerance):
+    """Print changes against ``baseline``; return the list of regressions.
+
+    Raises ValueError if the baseline is of a different suite config.
+    """
+    check_baseline(run, baseline)
+    print(f"Compared with {baseline['commit']} ({baseline['environment']['machine']}):")
+    if baseline["environment"] != run["environment"]:
+        print("  warning: the baseline was recorded in a different environment")
+    old = {(r["rows"], r["cols"], r["operation"]): r for r in baseline["results"]}
+    regressions = []
+    for result in run["results"]:
+        key = (result["rows"], result["cols"], result["operation"])
+        before = old.get(key)
+        if before is None:
+            continue
+        label = f"{key[0]}x{key[1]} {key[2]}"
+        checks = [("time", result["seconds"], before["seconds"])]
+        if result["peak_bytes"] is not None and before["peak_bytes"]:
+            checks.append(("memory", result["peak_bytes"], before["peak_bytes"]))
+        for what, now, then in checks:
+            change = now / then - 1
+            if change > tolerance:
+                regressions.append(f"{label} {what} {change:+.0%}")
+                print(f"  REGRESSION {label} {what}: {change:+.0%}")
+            elif abs(change) > tolerance:
+                print(f"  improved   {label} {what}: {change:+.0%}")
+    if not regressions:
+        print(f"  no regressions beyond {tolerance:.0%}")
+    return regressions
+
+
+def parse_sizes(text):
+    sizes = []
+    for size in text.split(","):
+        rows, cols = size.lower().split("x")
+        sizes.append((int(rows), int(cols)))
+    return sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--cols", type=int, default=1000)
+    parser.add_argument("--walls", type=float, default=0.2, help="wall ratio")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--legacy-limit", type=int, default=40_000,
+                        help="largest grid (in cells) to run the path-copying solvers on")
+    parser.add_argument("--generators", action="store_true",
+                        help="benchmark generation throughput instead of the solvers")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="runs per generator, or timing loops per suite operation")
+    parser.add_argument("--suite", action="store_true",
+                        help="run the size sweep, save the results and check for regressions")
+    parser.add_argument("--sizes", type=parse_sizes,
+                        default=SUITE_SIZES, help="suite sizes, e.g. 20x30,500x750")
+    parser.add_argument("--generator", choices=tuple(GENERATORS), default="backtracker",
+                        help="generator used by the suite")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="skip the (slow) peak memory runs in the suite")
+    parser.add_argument("--results-dir", default="benchmark_results",
+                        help="where suite results are saved, one JSON file per commit")
+    parser.add_argument("--baseline", help="suite results file to compare with "
+                                           "(default: the latest run of another commit with the "
+                                           "same generator, seed and sizes)")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="slowdown that counts as a regression, as a fraction")
+    parser.add_argument("--no-compare", action="store_true",
+                        help="save the suite results without checking for regressions")
+    args = parser.parse_args()
+
+    if args.suite:
+        return benchmark_suite(args)
+    if args.generators:
+        benchmark_generators(args.rows, args.cols, args.repeat, args.seed)
+        return
+
+    grid = random_grid(args.rows, args.cols, args.walls, args.seed)
+    maze = Maze.from_rows(grid)
+    start, end = maze.start, maze.end
+    print(f"Grid {args.rows}x{args.cols}, wall ratio {args.walls}, seed {args.seed}")
+
+    for algorithm in ("bfs", "dfs"):
+        result, elapsed, peak = measure(solve, maze, algorithm)
+        order, path = result.order, result.path
+        length = len(path) if path else 0
+        print(f"  {algorithm} parent-pointer: {elapsed:7.2f}s  peak {peak / 2**20:8.1f} MiB  "
+              f"visited {len(order)}  path {length}")
+
+        if args.rows * args.cols > args.legacy_limit:
+            elapsed, peak, sizes = extrapolate_legacy(args.rows, args.cols, args.legacy_limit,
+                                                      args.walls, args.seed, algorithm)
+            measured = " and ".join(f"{r}x{c}" for r, c in sizes)
+            print(f"  {algorithm} path-copy:   {'~%.2fs' % elapsed:>10}  "
+                  f"peak {'~%.1f' % (peak / 2**20):>8} MiB  "
+                  f"(estimated from {measured}; grid larger than --legacy-limit)")
+            continue
+        (legacy_order, legacy_path, _), elapsed, peak = measure(
+            legacy_solve, grid, start, end, algorithm)
+        print(f"  {algorithm} path-copy:      {elapsed:7.2f}s  peak {peak / 2**20:8.1f} MiB  "
+              f"visited {len(legacy_order)}")
+        cols = args.cols
+        assert [r * cols + c for r, c in legacy_order] == order.tolist(), \
+            "visit order differs from the legacy solver"
+        assert legacy_path == path, "solution path differs from the legacy solver"
+
+
+def benchmark_suite(args):
+    commit = git_commit()
+    print(f"Benchmark suite at {commit}: {args.generator} mazes, seed {args.seed}, "
+          f"best of {args.repeat}")
+    run = {
+        "commit": commit,
+        "timestamp": time.time(),
+        "environment": environment(),
+        "generator": args.generator,
+        "seed": args.seed,
+        "sizes": [list(size) for size in args.sizes],
+    }
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        # Refuse a mismatched baseline before spending minutes on the sweep
+        try:
+            check_baseline(run, baseline)
+        except ValueError as error:
+            print(f"error: {error}", file=sys.stderr)
+            return 2
+    elif os.path.isdir(args.results_dir):
+        baseline = latest_results(args.results_dir, commit, suite_config(run))
+    run["results"] = run_suite(args.sizes, args.generator, args.repeat, args.seed,
+                               not args.no_memory)
+
+    os.makedirs(args.results_dir, exist_ok=True)
+    path = os.path.join(args.results_dir, f"{commit}.json")
+    with open(path, "w") as f:
+        json.dump(run, f, indent=1)
+    print(f"Results saved to {path}")
+
+    if args.no_compare or baseline is None:
+        return 0
+    regressions = compare(run, baseline, args.tolerance)
+    if regressions:
+        print(f"FAILED: {len(regressions)} regression(s) against {baseline['commit']}",
+              file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,1227 @@
+"""Headless maze engine: grid, generators and solvers.
+
+Generators: recursive backtracker, Kruskal, Prim, Wilson and Eller (which
+can also stream rows of an unbounded maze).  Solvers: BFS, DFS, A* and
+bidirectional BFS.
+
+Nothing here touches Tk, so mazes can be generated and solved in bulk
+without opening a window.  The Tk visualizer drives the same objects.
+
+Solvers keep a flat parent array indexed by ``row * cols + col`` instead of
+copying the whole path into every frontier entry, and rebuild the path once
+the goal is reached.
+
+Cells can live in a bytearray (the default) or, when NumPy is installed, in
+a ``uint8`` array; see BACKENDS.  Either way the solvers walk precomputed
+open-direction bitmasks, so their inner loop has no bounds checks.
+
+Mazes can be saved to a compact binary format (see save_maze) and loaded
+back through mmap.  Generation is deterministic for a given seed, and
+MazeCache keeps generated mazes in memory and, optionally, on disk.
+
+Usage: python maze_engine.py [--count 1000] [--rows 20] [--cols 30]
+                             [--generator backtracker] [--algorithm bfs]
+                             [--backend python] [--seed N] [--output FILE]
+                             [--metrics FILE] [--trace-memory]
+                             [--cache-dir DIR] [--save-dir DIR | --load-dir DIR]
+"""
+import argparse
+import heapq
+import json
+import mmap
+import os
+import random
+import struct
+import sys
+import time
+import tracemalloc
+from array import array
+from collections import OrderedDict, deque
+
+from maze_metrics import MetricsLog, RunMetrics
+
+try:
+    import numpy as np
+except ImportError:  # the numpy backend is optional
+    np = None
+
+# Neighbor order shared by every solver: right, down, left, up
+DIRECTIONS = [(0, 1), (1, 0), (0, -1), (-1, 0)]
+
+# Bit set in a cell's open mask when the neighbor in that direction is a path
+RIGHT, DOWN, LEFT, UP = 1, 2, 4, 8
+
+ALGORITHMS = ('bfs', 'dfs', 'astar', 'bidirectional')
+BACKENDS = ('python', 'numpy')
+
+# Distance fields kept per maze, most recently used sources first
+FIELD_CACHE_SIZE = 4
+
+
+class Maze:
+    """A rows x cols grid of path (0) and wall (1) cells stored flat."""
+
+    def __init__(self, rows, cols, cells=None, start=(0, 0), end=None,
+                 generator=None, seed=None):
+        self.rows = rows
+        self.cols = cols
+        self.cells = cells if cells is not None else bytearray(b'\x01') * (rows * cols)
+        self.start = start
+        self.end = end if end is not None else (rows - 1, cols - 1)
+        self.generator = generator
+        self.seed = seed
+        self._masks = None
+        self._fields = OrderedDict()
+
+    def __getitem__(self, pos):
+        row, col = pos
+        return self.cells[row * self.cols + col]
+
+    def __setitem__(self, pos, value):
+        row, col = pos
+        self.cells[row * self.cols + col] = value
+        self._masks = None
+        self._fields.clear()
+
+    @property
+    def backend(self):
+        if isinstance(self.cells, (bytes, bytearray)):
+            return 'python'
+        if isinstance(self.cells, BitGrid):
+            return 'packed'
+        return 'numpy'
+
+    def with_backend(self, backend):
+        """Return this maze with its cells stored by ``backend``.
+
+        Converting a bytearray to NumPy shares the buffer instead of copying.
+        Packed (loaded) mazes are read-only until converted.
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend {backend!r}, expected one of {BACKENDS}")
+        if backend == self.backend:
+            return self
+        if backend == 'numpy':
+            if np is None:
+                raise RuntimeError("The numpy backend requires NumPy to be installed")
+            if self.backend == 'packed':
+                cells = self.cells.to_numpy()
+            else:
+                cells = np.frombuffer(self.cells, dtype=np.uint8)
+        elif self.backend == 'packed':
+            cells = bytearray(self.cells.unpack())
+        else:
+            cells = bytearray(self.cells.tobytes())
+        maze = Maze(self.rows, self.cols, cells, self.start, self.end, self.generator, self.seed)
+        maze._masks = self._masks
+        return maze
+
+    def open_masks(self):
+        """Per-cell bitmask of open neighbors (RIGHT/DOWN/LEFT/UP), cached.
+
+        Out-of-bounds neighbors are never open, which lets the solvers skip
+        bounds checks entirely.
+        """
+        if self._masks is None:
+            cells = self.cells
+            if self.backend == 'packed':
+                cells = cells.to_numpy() if np is not None else cells.unpack()
+            if np is not None and not isinstance(cells, (bytes, bytearray)):
+                self._masks = _numpy_masks(cells, self.rows, self.cols)
+            else:
+                self._masks = _python_masks(cells, self.rows, self.cols)
+        return self._masks
+
+    def copy(self):
+        """Return a copy of this maze with its own editable cells."""
+        if self.backend == 'numpy':
+            cells = self.cells.copy()
+        elif self.backend == 'packed':
+            cells = bytearray(self.cells.unpack())
+        else:
+            cells = bytearray(self.cells)
+        maze = Maze(self.rows, self.cols, cells, self.start, self.end, self.generator, self.seed)
+        maze._masks = self._masks
+        return maze
+
+    def distances(self, source=None):
+        """Distance field from ``source`` (default: start), cached until the maze changes.
+
+        See distance_field; the last FIELD_CACHE_SIZE sources are kept.
+        """
+        source = source or self.start
+        field = self._fields.get(source)
+        if field is None:
+            field = self._fields[source] = distance_field(self, source)
+            if len(self._fields) > FIELD_CACHE_SIZE:
+                self._fields.popitem(last=False)
+        else:
+            self._fields.move_to_end(source)
+        return field
+
+    def shortest_path(self, source=None, target=None):
+        """A shortest path from ``source`` to ``target`` read off a cached distance field."""
+        return field_path(self, self.distances(source), target or self.end)
+
+    @classmethod
+    def from_rows(cls, grid, start=(0, 0), end=None):
+        """Build a maze from a list of lists of 0/1 cells."""
+        cells = bytearray()
+        for row in grid:
+            cells.extend(row)
+        return cls(len(grid), len(grid[0]), cells, start, end)
+
+    def to_rows(self):
+        """Return the maze as a list of lists of 0/1 cells."""
+        cols = self.cols
+        return [list(self.cells[r * cols:(r + 1) * cols]) for r in range(self.rows)]
+
+
+# Maps a wall byte to 0 and a path byte to 1
+_OPEN_TABLE = bytes([1] + [0] * 255)
+
+# Maps cell bytes to the ASCII digits '0'/'1', and those digits back to 0/1
+_BIT_CHAR_TABLE = b'0' + b'1' * 255
+_BIT_VALUE_TABLE = bytes(1 if i == ord('1') else 0 for i in range(256))
+
+
+class BitGrid:
+    """Read-only cells packed 8 per byte, most significant bit first.
+
+    ``data`` can be any buffer; a loaded maze file keeps its packed bytes
+    as they are, without unpacking them to one byte per cell.
+    """
+
+    def __init__(self, data, size):
+        self.data = data
+        self.size = size
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.unpack()[index]
+        if index < 0:
+            index += self.size
+        return (self.data[index >> 3] >> (7 - (index & 7))) & 1
+
+    def unpack(self):
+        """Return the cells as bytes of 0/1."""
+        if np is not None:
+            return self.to_numpy().tobytes()
+        bits = format(int.from_bytes(self.data, 'big'), f'0{8 * len(self.data)}b')
+        return bits[:self.size].encode().translate(_BIT_VALUE_TABLE)
+
+    def to_numpy(self):
+        """Return the cells as a NumPy uint8 array of 0/1."""
+        return np.unpackbits(np.frombuffer(self.data, dtype=np.uint8), count=self.size)
+
+
+def pack_cells(cells):
+    """Pack 0/1 cells 8 per byte, most significant bit first."""
+    if isinstance(cells, BitGrid):
+        return bytes(cells.data)
+    if np is not None:
+        if isinstance(cells, (bytes, bytearray)):
+            cells = np.frombuffer(cells, dtype=np.uint8)
+        return np.packbits(cells != 0).tobytes()
+    bits = bytes(cells).translate(_BIT_CHAR_TABLE)
+    bits += b'0' * (-len(bits) % 8)
+    return int(bits, 2).to_bytes(len(bits) // 8, 'big')
+
+
+def _python_masks(cells, rows, cols):
+    # Treat the grid as one big integer with a 0/1 byte per cell, so each
+    # direction is a single shift instead of a Python-level loop over cells.
+    size = rows * cols
+    is_open = int.from_bytes(bytes(cells).translate(_OPEN_TABLE), 'big')
+    not_last_col = int.from_bytes((b'\x01' * (cols - 1) + b'\x00') * rows, 'big')
+    not_first_col = int.from_bytes((b'\x00' + b'\x01' * (cols - 1)) * rows, 'big')
+    everything = (1 << (8 * size)) - 1
+
+    right = (is_open << 8) & not_last_col
+    down = (is_open << (8 * cols)) & everything
+    left = (is_open >> 8) & not_first_col
+    up = is_open >> (8 * cols)
+    masks = right * RIGHT | down * DOWN | left * LEFT | up * UP
+    return masks.to_bytes(size, 'big')
+
+
+def _numpy_masks(cells, rows, cols):
+    is_open = cells.reshape(rows, cols) == 0
+    masks = np.zeros((rows, cols), dtype=np.uint8)
+    masks[:, :-1] |= is_open[:, 1:] * np.uint8(RIGHT)
+    masks[:-1, :] |= is_open[1:, :] * np.uint8(DOWN)
+    masks[:, 1:] |= is_open[:, :-1] * np.uint8(LEFT)
+    masks[1:, :] |= is_open[:-1, :] * np.uint8(UP)
+    # Indexing bytes is much faster than indexing an ndarray from Python
+    return masks.tobytes()
+
+
+# Generators carve passages between "lattice" cells at even (row, col)
+# coordinates; the wall between two lattice cells is their midpoint.
+
+def _open_lattice(cells, rows, cols):
+    """Open every lattice cell up front (for generators that work on walls)."""
+    lat_cols = (cols + 1) // 2
+    for row in range(0, rows, 2):
+        cells[row * cols:row * cols + cols:2] = bytes(lat_cols)
+
+
+def _lattice_neighbors(cell, lat_rows, lat_cols):
+    """Lattice neighbors of lattice cell ``cell``: right, down, left, up."""
+    row, col = divmod(cell, lat_cols)
+    result = []
+    if col + 1 < lat_cols:
+        result.append(cell + 1)
+    if row + 1 < lat_rows:
+        result.append(cell + lat_cols)
+    if col > 0:
+        result.append(cell - 1)
+    if row > 0:
+        result.append(cell - lat_cols)
+    return result
+
+
+def _carve_between(cells, cols, lat_cols, a, b):
+    """Open the wall between lattice cells ``a`` and ``b``."""
+    row_a, col_a = divmod(a, lat_cols)
+    row_b, col_b = divmod(b, lat_cols)
+    cells[(row_a + row_b) * cols + col_a + col_b] = 0
+
+
+def carve_backtracker(cells, rows, cols, rng):
+    """Recursive backtracker (iterative DFS): long, winding corridors."""
+    stack = [0]
+    cells[0] = 0
+    down = 2 * cols
+    choose = rng.random
+
+    while stack:
+        current = stack[-1]
+        row, col = divmod(current, cols)
+
+        # Find unvisited neighbors: right, down, left, up
+        neighbors = []
+        if col + 2 < cols and cells[current + 2]:
+            neighbors.append(current + 2)
+        if row + 2 < rows and cells[current + down]:
+            neighbors.append(current + down)
+        if col >= 2 and cells[current - 2]:
+            neighbors.append(current - 2)
+        if row >= 2 and cells[current - down]:
+            neighbors.append(current - down)
+
+        if neighbors:
+            new_cell = neighbors[int(choose() * len(neighbors))]
+            cells[(current + new_cell) >> 1] = 0
+            cells[new_cell] = 0
+            stack.append(new_cell)
+        else:
+            stack.pop()
+
+
+def carve_kruskal(cells, rows, cols, rng):
+    """Randomized Kruskal: shuffled walls joined with union-find."""
+    lat_rows, lat_cols = (rows + 1) // 2, (cols + 1) // 2
+    _open_lattice(cells, rows, cols)
+
+    # Wall ids: 2 * cell is the wall to the right, 2 * cell + 1 the one below
+    walls = []
+    for cell in range(lat_rows * lat_cols):
+        row, col = divmod(cell, lat_cols)
+        if col + 1 < lat_cols:
+            walls.append(2 * cell)
+        if row + 1 < lat_rows:
+            walls.append(2 * cell + 1)
+    rng.shuffle(walls)
+
+    parent = array('i', range(lat_rows * lat_cols))
+    for wall in walls:
+        cell = wall >> 1
+        a, b = cell, (cell + lat_cols if wall & 1 else cell + 1)
+
+        # Find both roots with path halving
+        while parent[a] != a:
+            parent[a] = parent[parent[a]]
+            a = parent[a]
+        while parent[b] != b:
+            parent[b] = parent[parent[b]]
+            b = parent[b]
+        if a != b:
+            parent[a] = b
+            row, col = divmod(cell, lat_cols)
+            if wall & 1:
+                cells[(2 * row + 1) * cols + 2 * col] = 0
+            else:
+                cells[2 * row * cols + 2 * col + 1] = 0
+
+
+def carve_prim(cells, rows, cols, rng):
+    """Randomized Prim: grow from one cell through a random frontier edge."""
+    lat_rows, lat_cols = (rows + 1) // 2, (cols + 1) // 2
+    _open_lattice(cells, rows, cols)
+    choose = rng.random
+
+    in_maze = bytearray(lat_rows * lat_cols)
+    in_maze[0] = 1
+    edges = [(0, b) for b in _lattice_neighbors(0, lat_rows, lat_cols)]
+
+    while edges:
+        # Swap-remove a random edge in O(1)
+        i = int(choose() * len(edges))
+        edges[i], edges[-1] = edges[-1], edges[i]
+        a, b = edges.pop()
+        if in_maze[b]:
+            continue
+        in_maze[b] = 1
+        _carve_between(cells, cols, lat_cols, a, b)
+        for c in _lattice_neighbors(b, lat_rows, lat_cols):
+            if not in_maze[c]:
+                edges.append((b, c))
+
+
+def carve_wilson(cells, rows, cols, rng):
+    """Wilson's algorithm: loop-erased random walks, a uniform spanning tree."""
+    lat_rows, lat_cols = (rows + 1) // 2, (cols + 1) // 2
+    _open_lattice(cells, rows, cols)
+    choose = rng.random
+    size = lat_rows * lat_cols
+
+    in_maze = bytearray(size)
+    in_maze[int(choose() * size)] = 1
+    # next_cell[c] is the step the latest walk took out of c, so revisiting a
+    # cell overwrites it and erases the loop
+    next_cell = array('i', [-1]) * size
+
+    for cell in range(size):
+        current = cell
+        while not in_maze[current]:
+            neighbors = _lattice_neighbors(current, lat_rows, lat_cols)
+            next_cell[current] = neighbors[int(choose() * len(neighbors))]
+            current = next_cell[current]
+
+        current = cell
+        while not in_maze[current]:
+            in_maze[current] = 1
+            _carve_between(cells, cols, lat_cols, current, next_cell[current])
+            current = next_cell[current]
+
+
+def eller_rows(cols, rng=random, lattice_rows=None):
+    """Yield the grid rows of an Eller's-algorithm maze one bytearray at a time.
+
+    Only the current row's set labels are kept, so memory is O(cols).  With
+    ``lattice_rows=None`` rows are streamed forever; otherwise the maze is
+    closed off after that many lattice rows (2 * lattice_rows - 1 grid rows).
+    """
+    lat_cols = (cols + 1) // 2
+    choose = rng.random
+    labels = list(range(lat_cols))
+    next_label = lat_cols
+    row = 0
+
+    while lattice_rows is None or row < lattice_rows:
+        last = lattice_rows is not None and row == lattice_rows - 1
+        cell_row = bytearray(b'\x01') * cols
+        cell_row[0::2] = bytes(lat_cols)
+
+        members = {}
+        for col, label in enumerate(labels):
+            members.setdefault(label, []).append(col)
+
+        # Randomly join neighbors in different sets; the last row joins all
+        for col in range(lat_cols - 1):
+            a, b = labels[col], labels[col + 1]
+            if a != b and (last or choose() < 0.5):
+                cell_row[2 * col + 1] = 0
+                if len(members[a]) < len(members[b]):
+                    a, b = b, a
+                for member in members[b]:
+                    labels[member] = a
+                members[a].extend(members.pop(b))
+        yield cell_row
+        if last:
+            return
+
+        # Every set carries on downwards through at least one cell
+        wall_row = bytearray(b'\x01') * cols
+        new_labels = [-1] * lat_cols
+        for label, set_cols in members.items():
+            forced = set_cols[int(choose() * len(set_cols))]
+            for col in set_cols:
+                if col == forced or choose() < 0.5:
+                    wall_row[2 * col] = 0
+                    new_labels[col] = label
+        for col in range(lat_cols):
+            if new_labels[col] == -1:
+                new_labels[col] = next_label
+                next_label += 1
+        labels = new_labels
+        yield wall_row
+        row += 1
+
+
+def carve_eller(cells, rows, cols, rng):
+    """Eller's algorithm, row by row; see eller_rows for unbounded streaming."""
+    for row, grid_row in enumerate(eller_rows(cols, rng, (rows + 1) // 2)):
+        cells[row * cols:(row + 1) * cols] = grid_row
+
+
+GENERATORS = {
+    'backtracker': carve_backtracker,
+    'kruskal': carve_kruskal,
+    'prim': carve_prim,
+    'wilson': carve_wilson,
+    'eller': carve_eller,
+}
+
+
+def new_seed():
+    """A fresh random seed for generate_maze."""
+    return random.randrange(2 ** 32)
+
+
+def generate_maze(rows, cols, rng=None, backend='python', generator='backtracker', seed=None):
+    """Generate a random maze with one of the GENERATORS.
+
+    Unless an ``rng`` is passed, the maze gets its own ``random.Random(seed)``,
+    so the same seed, size and generator always give the same maze.  A new
+    seed is drawn when ``seed`` is None; either way it is kept on the maze.
+    """
+    if generator not in GENERATORS:
+        raise ValueError(f"Unknown generator {generator!r}, expected one of {tuple(GENERATORS)}")
+    if rng is None:
+        if seed is None:
+            seed = new_seed()
+        rng = random.Random(seed)
+    maze = Maze(rows, cols, generator=generator, seed=seed)
+    GENERATORS[generator](maze.cells, rows, cols, rng)
+    open_end(maze)
+    return maze.with_backend(backend)
+
+
+def open_end(maze):
+    """Open the start and end cells and link the end to the carved lattice.
+
+    With an even number of rows or columns the bottom-right cell sits off the
+    lattice, so it is joined to the nearest lattice cell by a short corridor.
+    """
+    maze[maze.start] = 0
+    end_row, end_col = maze.end
+    row, col = end_row // 2 * 2, end_col // 2 * 2
+    while row < end_row:
+        row += 1
+        maze[row, col] = 0
+    while col < end_col:
+        col += 1
+        maze[row, col] = 0
+
+
+class Search:
+    """Base class for step-wise solvers over a maze's open masks.
+
+    Subclasses implement ``_expand``, which expands one node and returns its
+    flat index (or -1 once the search is over).  ``start`` and ``end``
+    default to the maze's own.
+    """
+
+    def __init__(self, maze, start=None, end=None):
+        start = start or maze.start
+        end = end or maze.end
+        self.masks = maze.open_masks()
+        self.rows = rows = maze.rows
+        self.cols = cols = maze.cols
+        self.start = start[0] * cols + start[1]
+        self.end = end[0] * cols + end[1]
+
+        # parent[i] == -1 means "not visited yet"
+        self.parent = array('i', [-1]) * (rows * cols)
+        self.parent[self.start] = self.start
+
+        self.steps = 0
+        self.peak_frontier = 1
+        self.found = False
+        self.done = False
+
+    def _expand(self):
+        raise NotImplementedError
+
+    def frontier_size(self):
+        """Number of cells waiting to be expanded."""
+        raise NotImplementedError
+
+    def neighbors(self, current):
+        """Flat indices of the open neighbors of ``current``, in DIRECTIONS order."""
+        mask = self.masks[current]
+        cols = self.cols
+        result = []
+        if mask & RIGHT:
+            result.append(current + 1)
+        if mask & DOWN:
+            result.append(current + cols)
+        if mask & LEFT:
+            result.append(current - 1)
+        if mask & UP:
+            result.append(current - cols)
+        return result
+
+    def step(self):
+        """Expand one node and return its (row, col), or None when finished."""
+        current = self._expand()
+        if current < 0:
+            return None
+        return divmod(current, self.cols)
+
+    def run(self, hook=None):
+        """Search to completion and return the visit order as flat indices.
+
+        ``hook(search, current)``, if given, is called after every expansion,
+        e.g. to sample counters; it slows the search down.
+        """
+        order = array('i')
+        expand = self._expand
+        current = expand()
+        if hook is None:
+            while current >= 0:
+                order.append(current)
+                current = expand()
+            return order
+        while current >= 0:
+            order.append(current)
+            hook(self, current)
+            current = expand()
+        return order
+
+    def path(self):
+        """Rebuild the solution path from the parent array."""
+        if not self.found:
+            return None
+        path = []
+        current = self.end
+        while current != self.start:
+            path.append(divmod(current, self.cols))
+            current = self.parent[current]
+        path.append(divmod(self.start, self.cols))
+        path.reverse()
+        return path
+
+
+class FrontierSearch(Search):
+    """Step-wise BFS (queue) or DFS (stack).
+
+    Cells are marked visited when they are pushed, so the visit order is the
+    same as the original path-copying solvers.
+    """
+
+    def __init__(self, maze, start=None, end=None, depth_first=False):
+        super().__init__(maze, start, end)
+        self.depth_first = depth_first
+        self.frontier = deque([self.start])
+
+    def frontier_size(self):
+        return len(self.frontier)
+
+    def _expand(self):
+        """Expand one node and return its flat index, or -1 when finished."""
+        if self.done:
+            return -1
+        frontier = self.frontier
+        if not frontier:
+            self.done = True
+            return -1
+
+        current = frontier.pop() if self.depth_first else frontier.popleft()
+        if current == self.end:
+            self.found = True
+            self.done = True
+            return current
+
+        parent = self.parent
+        mask = self.masks[current]
+
+        # Same order as DIRECTIONS; the mask already excludes walls and edges
+        if mask & RIGHT:
+            nxt = current + 1
+            if parent[nxt] == -1:
+                parent[nxt] = current
+                frontier.append(nxt)
+        if mask & DOWN:
+            nxt = current + self.cols
+            if parent[nxt] == -1:
+                parent[nxt] = current
+                frontier.append(nxt)
+        if mask & LEFT:
+            nxt = current - 1
+            if parent[nxt] == -1:
+                parent[nxt] = current
+                frontier.append(nxt)
+        if mask & UP:
+            nxt = current - self.cols
+            if parent[nxt] == -1:
+                parent[nxt] = current
+                frontier.append(nxt)
+
+        if len(frontier) > self.peak_frontier:
+            self.peak_frontier = len(frontier)
+        self.steps += 1
+        return current
+
+
+class AStarSearch(Search):
+    """A* with a Manhattan-distance heuristic on a binary heap.
+
+    Stale heap entries are skipped when popped instead of being updated in
+    place.  Ties on f prefer the entry closer to the goal.
+    """
+
+    def __init__(self, maze, start=None, end=None):
+        super().__init__(maze, start, end)
+        self.end_row, self.end_col = divmod(self.end, self.cols)
+        self.cost = array('i', [-1]) * (self.rows * self.cols)
+        self.cost[self.start] = 0
+        self.closed = bytearray(self.rows * self.cols)
+        h = self.heuristic(self.start)
+        self.heap = [(h, h, self.start)]
+
+    def frontier_size(self):
+        return len(self.heap)
+
+    def heuristic(self, cell):
+        row, col = divmod(cell, self.cols)
+        return abs(row - self.end_row) + abs(col - self.end_col)
+
+    def _expand(self):
+        """Expand one node and return its flat index, or -1 when finished."""
+        if self.done:
+            return -1
+        heap = self.heap
+        closed = self.closed
+        while heap:
+            current = heapq.heappop(heap)[2]
+            if not closed[current]:
+                break
+        else:
+            self.done = True
+            return -1
+
+        closed[current] = 1
+        if current == self.end:
+            self.found = True
+            self.done = True
+            return current
+
+        parent = self.parent
+        cost = self.cost
+        g = cost[current] + 1
+        for nxt in self.neighbors(current):
+            if not closed[nxt] and (cost[nxt] == -1 or g < cost[nxt]):
+                parent[nxt] = current
+                cost[nxt] = g
+                h = self.heuristic(nxt)
+                heapq.heappush(heap, (g + h, h, nxt))
+
+        if len(heap) > self.peak_frontier:
+            self.peak_frontier = len(heap)
+        self.steps += 1
+        return current
+
+
+class BidirectionalSearch(Search):
+    """Breadth-first search from both ends that meets in the middle.
+
+    Whole layers are expanded at a time, always on the side with the smaller
+    frontier.  Once the two searches touch, the current layer is finished so
+    the shortest of the meeting points found in it is used.
+    """
+
+    def __init__(self, maze, start=None, end=None):
+        super().__init__(maze, start, end)
+        size = self.rows * self.cols
+        self.parent_back = array('i', [-1]) * size
+        self.parent_back[self.end] = self.end
+        self.dist = (array('i', [-1]) * size, array('i', [-1]) * size)
+        self.dist[0][self.start] = 0
+        self.dist[1][self.end] = 0
+        self.frontiers = (deque([self.start]), deque([self.end]))
+        self.peak_frontier = 2
+        self.side = 0
+        self.layer_left = 1
+        self.meet = self.start if self.start == self.end else -1
+        self.best = 0 if self.meet >= 0 else None
+
+    def frontier_size(self):
+        return len(self.frontiers[0]) + len(self.frontiers[1])
+
+    def _expand(self):
+        """Expand one node and return its flat index, or -1 when finished."""
+        if self.done:
+            return -1
+        if self.layer_left == 0:
+            forward, backward = self.frontiers
+            if self.meet >= 0 or not forward or not backward:
+                self.found = self.meet >= 0
+                self.done = True
+                return -1
+            self.side = 0 if len(forward) <= len(backward) else 1
+            self.layer_left = len(self.frontiers[self.side])
+
+        side = self.side
+        frontier = self.frontiers[side]
+        dist, other_dist = self.dist[side], self.dist[1 - side]
+        parent = self.parent if side == 0 else self.parent_back
+
+        current = frontier.popleft()
+        self.layer_left -= 1
+        depth = dist[current] + 1
+        for nxt in self.neighbors(current):
+            if dist[nxt] == -1:
+                dist[nxt] = depth
+                parent[nxt] = current
+                frontier.append(nxt)
+                if other_dist[nxt] != -1:
+                    total = depth + other_dist[nxt]
+                    if self.best is None or total < self.best:
+                        self.best = total
+                        self.meet = nxt
+
+        waiting = len(self.frontiers[0]) + len(self.frontiers[1])
+        if waiting > self.peak_frontier:
+            self.peak_frontier = waiting
+        self.steps += 1
+        return current
+
+    def path(self):
+        """Join the two half paths at the meeting cell."""
+        if not self.found:
+            return None
+        path = []
+        current = self.meet
+        while current != self.start:
+            path.append(divmod(current, self.cols))
+            current = self.parent[current]
+        path.append(divmod(self.start, self.cols))
+        path.reverse()
+        current = self.meet
+        while current != self.end:
+            current = self.parent_back[current]
+            path.append(divmod(current, self.cols))
+        return path
+
+
+def distance_field(maze, source=None):
+    """BFS distance from ``source`` to every cell, as a flat array('i').
+
+    Unreachable cells (and walls) hold -1.  With the field in hand, a
+    shortest path to any target is a walk downhill; see field_path.
+    """
+    row, col = source or maze.start
+    cols = maze.cols
+    masks = maze.open_masks()
+    field = array('i', [-1]) * (maze.rows * cols)
+    start = row * cols + col
+    field[start] = 0
+
+    # Expand one BFS layer at a time so entries don't need to carry distances
+    layer = [start]
+    distance = 0
+    while layer:
+        distance += 1
+        next_layer = []
+        for current in layer:
+            mask = masks[current]
+            if mask & RIGHT and field[current + 1] < 0:
+                field[current + 1] = distance
+                next_layer.append(current + 1)
+            if mask & DOWN and field[current + cols] < 0:
+                field[current + cols] = distance
+                next_layer.append(current + cols)
+            if mask & LEFT and field[current - 1] < 0:
+                field[current - 1] = distance
+                next_layer.append(current - 1)
+            if mask & UP and field[current - cols] < 0:
+                field[current - cols] = distance
+                next_layer.append(current - cols)
+        layer = next_layer
+    return field
+
+
+def field_path(maze, field, target):
+    """Shortest path from the field's source to ``target``, or None if unreachable.
+
+    Steps from ``target`` to any neighbor one closer to the source, so the
+    cost is O(path length).
+    """
+    cols = maze.cols
+    masks = maze.open_masks()
+    current = target[0] * cols + target[1]
+    distance = field[current]
+    if distance < 0:
+        return None
+    path = [current]
+    while distance:
+        distance -= 1
+        mask = masks[current]
+        if mask & RIGHT and field[current + 1] == distance:
+            current += 1
+        elif mask & DOWN and field[current + cols] == distance:
+            current += cols
+        elif mask & LEFT and field[current - 1] == distance:
+            current -= 1
+        else:
+            current -= cols
+        path.append(current)
+    path.reverse()
+    return [divmod(cell, cols) for cell in path]
+
+
+def field_levels(field, levels):
+    """Bucket a distance field into bytes of 1..levels (0 where unreachable).
+
+    Used to color heat maps from a palette of ``levels`` colors.
+    """
+    if np is not None:
+        distances = np.frombuffer(field, dtype=np.int32)
+        farthest = max(1, int(distances.max()))
+        buckets = distances.astype(np.int64) * levels // (farthest + 1) + 1
+        return np.where(distances < 0, 0, buckets).astype(np.uint8).tobytes()
+    farthest = max(1, max(field))
+    return bytes(0 if d < 0 else d * levels // (farthest + 1) + 1 for d in field)
+
+
+class SolveResult:
+    """Outcome of one solver run."""
+
+    def __init__(self, algorithm, order, path, steps, peak_frontier, elapsed,
+                 peak_memory=None):
+        self.algorithm = algorithm
+        self.order = order          # visit order as flat indices
+        self.path = path            # list of (row, col), or None
+        self.steps = steps
+        self.peak_frontier = peak_frontier
+        self.elapsed = elapsed      # seconds
+        self.peak_memory = peak_memory  # bytes allocated at peak, if traced
+
+    @property
+    def solved(self):
+        return self.path is not None
+
+    @property
+    def nodes_expanded(self):
+        return len(self.order)
+
+
+def make_search(maze, algorithm='bfs', start=None, end=None):
+    """Create a step-wise search over ``maze`` with the named algorithm."""
+    if algorithm == 'astar':
+        return AStarSearch(maze, start, end)
+    if algorithm == 'bidirectional':
+        return BidirectionalSearch(maze, start, end)
+    if algorithm in ('bfs', 'dfs'):
+        return FrontierSearch(maze, start, end, depth_first=(algorithm == 'dfs'))
+    raise ValueError(f"Unknown algorithm {algorithm!r}, expected one of {ALGORITHMS}")
+
+
+def solve(maze, algorithm='bfs', start=None, end=None, hook=None, trace_memory=False):
+    """Search ``maze`` to completion and return a SolveResult.
+
+    ``hook`` is passed to Search.run.  With ``trace_memory``, the peak memory
+    allocated by the search is measured with tracemalloc, which makes the
+    search several times slower (and ``elapsed`` with it).
+    """
+    if trace_memory:
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+        else:
+            tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+    began = time.perf_counter()
+    search = make_search(maze, algorithm, start, end)
+    order = search.run(hook)
+    path = search.path()
+    elapsed = time.perf_counter() - began
+    peak_memory = None
+    if trace_memory:
+        peak_memory = tracemalloc.get_traced_memory()[1] - baseline
+        if not tracing:
+            tracemalloc.stop()
+    return SolveResult(algorithm, order, path, search.steps, search.peak_frontier,
+                       elapsed, peak_memory)
+
+
+def solve_many(mazes, algorithm='bfs', trace_memory=False):
+    """Solve every maze in ``mazes`` and return the list of SolveResults."""
+    return [solve(maze, algorithm, trace_memory=trace_memory) for maze in mazes]
+
+
+# Maze files: a fixed little-endian header followed by the bit-packed wall
+# grid (1 = wall), row-major, most significant bit first.
+#
+#   magic "MAZE", version, flags, reserved, rows, cols,
+#   start row/col, end row/col, seed, generator name (NUL padded)
+MAZE_MAGIC = b'MAZE'
+MAZE_VERSION = 1
+MAZE_SUFFIX = '.maze'
+_HEADER = struct.Struct('<4sBBH6Iq16s')
+_HAS_SEED = 1
+SEED_MIN, SEED_MAX = -2 ** 63, 2 ** 63 - 1  # the header's signed 64-bit seed
+
+
+def check_seed(seed):
+    """Raise ValueError unless ``seed`` (None or an int) fits a maze file's header."""
+    if seed is not None and not SEED_MIN <= seed <= SEED_MAX:
+        raise ValueError(f"maze seed {seed} can't be saved: it must be between "
+                         f"{SEED_MIN} and {SEED_MAX}")
+
+
+def save_maze(maze, path):
+    """Write ``maze`` to ``path`` in the binary maze format.
+
+    Raises ValueError, before anything is written, if the maze's seed
+    doesn't fit the header.
+    """
+    check_seed(maze.seed)
+    flags = _HAS_SEED if maze.seed is not None else 0
+    header = _HEADER.pack(
+        MAZE_MAGIC, MAZE_VERSION, flags, 0, maze.rows, maze.cols,
+        maze.start[0], maze.start[1], maze.end[0], maze.end[1],
+        maze.seed if maze.seed is not None else 0,
+        (maze.generator or '').encode('ascii'),
+    )
+    with open(path, 'wb') as f:
+        f.write(header)
+        f.write(pack_cells(maze.cells))
+
+
+def _unpack_header(data, path):
+    """Unpack and check the header at the start of ``data``."""
+    if len(data) < _HEADER.size:
+        raise ValueError(f"{path} is too short to be a maze file")
+    header = _HEADER.unpack_from(data)
+    magic, version = header[:2]
+    if magic != MAZE_MAGIC:
+        raise ValueError(f"{path} is not a maze file")
+    if version != MAZE_VERSION:
+        raise ValueError(f"{path} has unsupported maze format version {version}")
+    return header
+
+
+def read_maze_header(path):
+    """Return ``(rows, cols, start, end)`` of a maze file without reading its grid."""
+    with open(path, 'rb') as f:
+        (_, _, _, _, rows, cols, start_row, start_col,
+         end_row, end_col, _, _) = _unpack_header(f.read(_HEADER.size), path)
+    return rows, cols, (start_row, start_col), (end_row, end_col)
+
+
+def load_maze(path):
+    """Read a maze file through mmap, copying out only its packed wall grid.
+
+    The map is closed before returning, so loading thousands of mazes does
+    not hold thousands of mappings and file descriptors open.  The returned
+    maze has packed, read-only cells; call ``with_backend('python')`` for an
+    editable copy.
+    """
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        (_, _, flags, _, rows, cols, start_row, start_col,
+         end_row, end_col, seed, generator) = _unpack_header(mapped, path)
+        size = rows * cols
+        packed = (size + 7) // 8
+        if len(mapped) < _HEADER.size + packed:
+            raise ValueError(f"{path} is truncated")
+        data = mapped[_HEADER.size:_HEADER.size + packed]
+
+    return Maze(rows, cols, BitGrid(data, size), (start_row, start_col), (end_row, end_col),
+                generator.rstrip(b'\x00').decode('ascii') or None,
+                seed if flags & _HAS_SEED else None)
+
+
+def maze_paths(directory):
+    """The maze files in ``directory``, in name order."""
+    return [os.path.join(directory, name) for name in sorted(os.listdir(directory))
+            if name.endswith(MAZE_SUFFIX)]
+
+
+def iter_maze_dir(directory):
+    """Lazily load every maze file in ``directory``, in name order."""
+    for path in maze_paths(directory):
+        yield load_maze(path)
+
+
+class MazeCache:
+    """LRU cache of generated mazes keyed by (seed, rows, cols, generator).
+
+    Up to ``capacity`` mazes are kept in memory.  With ``directory`` set,
+    every generated maze is also saved there as a maze file and read back on
+    a memory miss, so the cache outlives the process.
+    """
+
+    def __init__(self, capacity=64, directory=None):
+        self.capacity = capacity
+        self.directory = directory
+        self.mazes = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def __len__(self):
+        return len(self.mazes)
+
+    def path(self, seed, rows, cols, generator):
+        return os.path.join(self.directory, f"{generator}-{rows}x{cols}-{seed}{MAZE_SUFFIX}")
+
+    def get(self, rows, cols, seed=None, generator='backtracker', backend='python'):
+        """Return a copy of the maze for these parameters, generating it on a miss.
+
+        A new seed is drawn when ``seed`` is None; read it back from the
+        returned maze's ``seed`` to ask for the same maze again.
+        """
+        if seed is None:
+            seed = new_seed()
+        key = (seed, rows, cols, generator)
+        maze = self.mazes.get(key)
+        if maze is not None:
+            self.mazes.move_to_end(key)
+            self.hits += 1
+        else:
+            maze = self.load(*key)
+            if maze is not None:
+                self.disk_hits += 1
+            else:
+                self.misses += 1
+                maze = generate_maze(rows, cols, generator=generator, seed=seed)
+                self.store(maze)
+            self.mazes[key] = maze
+            if len(self.mazes) > self.capacity:
+                self.mazes.popitem(last=False)
+        return maze.copy().with_backend(backend)
+
+    def load(self, seed, rows, cols, generator):
+        if not self.directory:
+            return None
+        try:
+            return load_maze(self.path(seed, rows, cols, generator)).with_backend('python')
+        except (OSError, ValueError):
+            return None
+
+    def store(self, maze):
+        if not self.directory:
+            return
+        path = self.path(maze.seed, maze.rows, maze.cols, maze.generator)
+        # Write under a temporary name so other processes never see half a file
+        partial = f"{path}.{os.getpid()}.tmp"
+        save_maze(maze, partial)
+        os.replace(partial, path)
+
+    def clear(self):
+        """Drop the in-memory mazes (files in ``directory`` are kept)."""
+        self.mazes.clear()
+
+
+def maze_record(maze, result):
+    """Level data for one maze as a JSON-serialisable dict."""
+    cols = maze.cols
+    return {
+        "rows": maze.rows,
+        "cols": cols,
+        "start": list(maze.start),
+        "end": list(maze.end),
+        "grid": ["".join(map(str, maze.cells[r * cols:(r + 1) * cols])) for r in range(maze.rows)],
+        "path_length": len(result.path) if result.solved else None,
+        "steps": result.steps,
+    }
+
+
+def summarize(algorithm, results, elapsed):
+    """One line of per-algorithm batch statistics."""
+    solved = [r for r in results if r.solved]
+    count = len(results) or 1
+    avg_path = sum(len(r.path) for r in solved) / len(solved) if solved else 0.0
+    return (f"  {algorithm:<13} solved {len(solved)}/{len(results)}  "
+            f"avg path {avg_path:8.1f}  "
+            f"avg expanded {sum(r.nodes_expanded for r in results) / count:10.1f}  "
+            f"avg peak frontier {sum(r.peak_frontier for r in results) / count:8.1f}  "
+            + (f"max peak memory {max(r.peak_memory for r in results) / 1024:8.1f} KiB  "
+               if results and results[0].peak_memory is not None else "")
+            + f"time {elapsed:.2f}s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate and solve mazes without a window.")
+    parser.add_argument("--count", type=int, default=1000, help="number of mazes")
+    parser.add_argument("--rows", type=int, default=20)
+    parser.add_argument("--cols", type=int, default=30)
+    parser.add_argument("--generator", choices=tuple(GENERATORS), default="backtracker")
+    parser.add_argument("--algorithm", choices=ALGORITHMS + ('all',), default="bfs",
+                        help="solver to use, or 'all' to compare every solver")
+    parser.add_argument("--backend", choices=BACKENDS, default="python")
+    parser.add_argument("--seed", type=int, default=None, help="seed for the whole batch")
+    parser.add_argument("--output", help="write level data as JSON lines to this file")
+    parser.add_argument("--metrics", help="write per-run solver metrics to this file "
+                                          "(CSV if it ends in .csv, JSON otherwise)")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="measure peak memory per search (much slower)")
+    parser.add_argument("--save-dir", help="also save each generated maze as a .maze file here")
+    parser.add_argument("--cache-dir", help="reuse mazes generated with the same seed, "
+                                            "size and generator from this directory")
+    parser.add_argument("--load-dir", help="solve the .maze files in this directory "
+                                           "instead of generating mazes")
+    args = parser.parse_args(argv)
+
+    began = time.perf_counter()
+    if args.load_dir:
+        mazes = list(iter_maze_dir(args.load_dir))
+        print(f"{len(mazes)} mazes loaded from {args.load_dir} "
+              f"in {time.perf_counter() - began:.2f}s")
+    else:
+        # One seed per maze, so any maze of the batch can be reproduced alone
+        rng = random.Random(args.seed)
+        seeds = [rng.randrange(2 ** 32) for _ in range(args.count)]
+        if args.cache_dir:
+            cache = MazeCache(args.count, args.cache_dir)
+            mazes = [cache.get(args.rows, args.cols, seed, args.generator, args.backend)
+                     for seed in seeds]
+        else:
+            cache = None
+            mazes = [generate_maze(args.rows, args.cols, backend=args.backend,
+                                   generator=args.generator, seed=seed)
+                     for seed in seeds]
+        print(f"{args.count} {args.generator} mazes {args.rows}x{args.cols}: "
+              f"generated in {time.perf_counter() - began:.2f}s")
+        if cache is not None:
+            print(f"  cache: {cache.disk_hits} loaded from {args.cache_dir}, "
+                  f"{cache.misses} generated")
+        if args.save_dir:
+            os.makedirs(args.save_dir, exist_ok=True)
+            width = len(str(len(mazes)))
+            for i, maze in enumerate(mazes):
+                save_maze(maze, os.path.join(args.save_dir, f"maze_{i:0{width}d}{MAZE_SUFFIX}"))
+
+    algorithms = ALGORITHMS if args.algorithm == 'all' else (args.algorithm,)
+    first_results = None
+    metrics = MetricsLog()
+    for algorithm in algorithms:
+        began = time.perf_counter()
+        results = solve_many(mazes, algorithm, args.trace_memory)
+        print(summarize(algorithm, results, time.perf_counter() - began))
+        if first_results is None:
+            first_results = results
+        for maze, result in zip(mazes, results):
+            metrics.add(RunMetrics(maze, result))
+
+    if args.metrics:
+        metrics.write(args.metrics)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            for maze, result in zip(mazes, first_results):
+                f.write(json.dumps(maze_record(maze, result)) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
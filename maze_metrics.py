@@ -0,0 +1,96 @@
+"""Per-run solver metrics with JSON and CSV export.
+
+A RunMetrics record describes one solver run: the maze, the search counters
+from its SolveResult (nodes expanded, steps, peak frontier, search time and,
+when traced, peak memory) and, for runs shown in the visualizer, the time
+spent drawing, the number of frames and the canvas item count.  MetricsLog
+collects records and writes them out, so runs can be compared over time.
+
+FrontierSampler is a solver hook (see maze_engine.Search.run) that records
+the frontier size as the search goes.
+"""
+import csv
+import json
+import time
+from array import array
+
+# Columns written to CSV, in order; JSON records also carry frontier_samples
+FIELDS = (
+    'timestamp', 'algorithm', 'generator', 'seed', 'rows', 'cols',
+    'solved', 'path_length', 'nodes_expanded', 'steps', 'peak_frontier',
+    'peak_memory', 'search_ms', 'draw_ms', 'frames', 'canvas_items',
+)
+
+
+class FrontierSampler:
+    """Solver hook recording the frontier size every ``every`` expansions."""
+
+    def __init__(self, every=1):
+        self.every = every
+        self.samples = array('i')
+
+    def __call__(self, search, current):
+        if search.steps % self.every == 0:
+            self.samples.append(search.frontier_size())
+
+
+class RunMetrics:
+    """Metrics of one solver run; drawing fields stay None for headless runs."""
+
+    def __init__(self, maze, result, draw_seconds=None, frames=None,
+                 canvas_items=None, frontier_samples=None):
+        self.timestamp = time.time()
+        self.algorithm = result.algorithm
+        self.generator = maze.generator
+        self.seed = maze.seed
+        self.rows = maze.rows
+        self.cols = maze.cols
+        self.solved = result.solved
+        self.path_length = len(result.path) if result.solved else None
+        self.nodes_expanded = result.nodes_expanded
+        self.steps = result.steps
+        self.peak_frontier = result.peak_frontier
+        self.peak_memory = result.peak_memory
+        self.search_ms = result.elapsed * 1000
+        self.draw_ms = draw_seconds * 1000 if draw_seconds is not None else None
+        self.frames = frames
+        self.canvas_items = canvas_items
+        self.frontier_samples = list(frontier_samples) if frontier_samples is not None else None
+
+    def to_dict(self):
+        record = {field: getattr(self, field) for field in FIELDS}
+        if self.frontier_samples is not None:
+            record['frontier_samples'] = self.frontier_samples
+        return record
+
+
+class MetricsLog:
+    """An ordered collection of RunMetrics."""
+
+    def __init__(self):
+        self.runs = []
+
+    def __len__(self):
+        return len(self.runs)
+
+    def add(self, run):
+        self.runs.append(run)
+        return run
+
+    def write_json(self, path):
+        with open(path, 'w') as f:
+            json.dump([run.to_dict() for run in self.runs], f, indent=1)
+
+    def write_csv(self, path):
+        with open(path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, FIELDS, extrasaction='ignore')
+            writer.writeheader()
+            for run in self.runs:
+                writer.writerow(run.to_dict())
+
+    def write(self, path):
+        """Write CSV if ``path`` ends in .csv, JSON otherwise."""
+        if path.lower().endswith('.csv'):
+            self.write_csv(path)
+        else:
+            self.write_json(path)
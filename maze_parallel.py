@@ -0,0 +1,302 @@
+"""Solve a corpus of mazes across processes.
+
+The wall grids of every maze are laid out back to back in one
+shared-memory block, so worker processes read them in place instead of
+receiving pickled grids.  Each worker is handed a range of maze indices,
+solves them with the engine's solvers and sends back only per-algorithm
+totals, which the parent merges.
+
+Generated corpora are also generated in the workers, straight into the
+shared block.  Maze ``i`` of a batch uses its own RNG seeded from the batch
+seed and ``i``, so the corpus does not depend on the number of workers.
+
+Usage: python maze_parallel.py [--count 10000] [--rows 20] [--cols 30]
+                               [--generator backtracker] [--algorithm all]
+                               [--workers N] [--seed N] [--load-dir DIR]
+                               [--scaling]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from maze_engine import (ALGORITHMS, GENERATORS, Maze, generate_maze, load_maze,
+                         maze_paths, np, read_maze_header, solve)
+
+# Tasks per worker; more than one evens out mazes that take longer to solve
+CHUNKS_PER_WORKER = 4
+
+
+class BatchStats:
+    """Running per-algorithm totals that can be merged across workers."""
+
+    def __init__(self, algorithm):
+        self.algorithm = algorithm
+        self.mazes = 0
+        self.solved = 0
+        self.path_total = 0
+        self.expanded_total = 0
+        self.frontier_total = 0
+        self.seconds = 0.0      # summed solve time, not wall time
+
+    def add(self, result):
+        self.mazes += 1
+        if result.solved:
+            self.solved += 1
+            self.path_total += len(result.path)
+        self.expanded_total += result.nodes_expanded
+        self.frontier_total += result.peak_frontier
+        self.seconds += result.elapsed
+
+    def merge(self, other):
+        self.mazes += other.mazes
+        self.solved += other.solved
+        self.path_total += other.path_total
+        self.expanded_total += other.expanded_total
+        self.frontier_total += other.frontier_total
+        self.seconds += other.seconds
+
+    def summary(self):
+        count = self.mazes or 1
+        avg_path = self.path_total / self.solved if self.solved else 0.0
+        return (f"  {self.algorithm:<13} solved {self.solved}/{self.mazes}  "
+                f"avg path {avg_path:8.1f}  "
+                f"avg expanded {self.expanded_total / count:10.1f}  "
+                f"avg peak frontier {self.frontier_total / count:8.1f}  "
+                f"solve time {self.seconds:.2f}s")
+
+
+class SharedMazes:
+    """Wall grids of a maze corpus in one shared-memory block.
+
+    ``layout`` holds ``(offset, rows, cols, start, end)`` for each maze.  The
+    process that creates the block must call ``unlink`` when done.
+    """
+
+    def __init__(self, layout, name=None):
+        self.layout = layout
+        if name is None:
+            size = sum(rows * cols for _, rows, cols, _, _ in layout)
+            self.shm = shared_memory.SharedMemory(create=True, size=max(1, size))
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+
+    @classmethod
+    def allocate(cls, count, rows, cols):
+        """Room for ``count`` rows x cols mazes with the default start and end."""
+        size = rows * cols
+        return cls([(i * size, rows, cols, (0, 0), (rows - 1, cols - 1))
+                    for i in range(count)])
+
+    @classmethod
+    def from_mazes(cls, mazes):
+        """Copy the cells of ``mazes`` into a new shared block."""
+        layout = []
+        offset = 0
+        for maze in mazes:
+            layout.append((offset, maze.rows, maze.cols, maze.start, maze.end))
+            offset += maze.rows * maze.cols
+        shared = cls(layout)
+        for maze, (offset, rows, cols, _, _) in zip(mazes, layout):
+            shared.write(offset, maze)
+        return shared
+
+    @classmethod
+    def from_dir(cls, directory):
+        """Copy the maze files in ``directory`` into a new shared block.
+
+        The block is sized from the files' headers, then each maze is loaded,
+        copied in and dropped, so only one is in memory at a time.
+        """
+        paths = maze_paths(directory)
+        layout = []
+        offset = 0
+        for path in paths:
+            rows, cols, start, end = read_maze_header(path)
+            layout.append((offset, rows, cols, start, end))
+            offset += rows * cols
+        shared = cls(layout)
+        try:
+            for path, (offset, _, _, _, _) in zip(paths, layout):
+                shared.write(offset, load_maze(path))
+        except BaseException:
+            shared.unlink()
+            raise
+        return shared
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def __len__(self):
+        return len(self.layout)
+
+    def write(self, offset, maze):
+        cells = maze.with_backend('python').cells
+        self.shm.buf[offset:offset + len(cells)] = cells
+
+    def maze(self, index):
+        """Maze ``index`` backed by the shared block where possible."""
+        offset, rows, cols, start, end = self.layout[index]
+        size = rows * cols
+        if np is not None:
+            # A NumPy view reads the shared block without copying it
+            cells = np.frombuffer(self.shm.buf, dtype=np.uint8, count=size, offset=offset)
+        else:
+            cells = bytes(self.shm.buf[offset:offset + size])
+        return Maze(rows, cols, cells, start, end)
+
+    def close(self):
+        self.shm.close()
+
+    def unlink(self):
+        self.shm.close()
+        self.shm.unlink()
+
+
+# Set in each worker process by _attach
+_shared = None
+
+
+def _attach(name, layout):
+    global _shared
+    _shared = SharedMazes(layout, name)
+
+
+def _ready():
+    return os.getpid()
+
+
+def _generate_chunk(begin, stop, generator, seed):
+    for index in range(begin, stop):
+        offset, rows, cols, _, _ = _shared.layout[index]
+        rng = random.Random(f"{seed}:{index}")
+        _shared.write(offset, generate_maze(rows, cols, rng, generator=generator))
+
+
+def _solve_chunk(begin, stop, algorithms):
+    stats = {algorithm: BatchStats(algorithm) for algorithm in algorithms}
+    for index in range(begin, stop):
+        maze = _shared.maze(index)
+        for algorithm in algorithms:
+            stats[algorithm].add(solve(maze, algorithm))
+    return stats
+
+
+def _chunks(count, workers):
+    size = max(1, -(-count // (workers * CHUNKS_PER_WORKER)))
+    return [(begin, min(count, begin + size)) for begin in range(0, count, size)]
+
+
+def start_pool(shared, workers):
+    """A pool of ``workers`` processes, all started and attached to ``shared``."""
+    pool = ProcessPoolExecutor(workers, initializer=_attach,
+                               initargs=(shared.name, shared.layout))
+    for future in [pool.submit(_ready) for _ in range(workers)]:
+        future.result()
+    return pool
+
+
+def generate_batch(shared, generator, seed, workers=None, pool=None):
+    """Generate every maze of ``shared`` into the block across processes."""
+    workers = workers or os.cpu_count() or 1
+    if pool is None:
+        with start_pool(shared, workers) as pool:
+            return generate_batch(shared, generator, seed, workers, pool)
+    for future in [pool.submit(_generate_chunk, begin, stop, generator, seed)
+                   for begin, stop in _chunks(len(shared), workers)]:
+        future.result()
+
+
+def run_batch(shared, algorithms=('bfs',), workers=None, generator=None, seed=None, pool=None):
+    """Solve every maze in ``shared`` on a pool of ``workers`` processes.
+
+    With ``generator`` set, the mazes are first generated into the block by
+    the same pool.  ``pool`` reuses a pool from start_pool.  Returns a dict
+    of algorithm -> BatchStats.
+    """
+    workers = workers or os.cpu_count() or 1
+    if pool is None:
+        with start_pool(shared, workers) as pool:
+            return run_batch(shared, algorithms, workers, generator, seed, pool)
+    if generator is not None:
+        generate_batch(shared, generator, seed, workers, pool)
+    totals = {algorithm: BatchStats(algorithm) for algorithm in algorithms}
+    for future in [pool.submit(_solve_chunk, begin, stop, algorithms)
+                   for begin, stop in _chunks(len(shared), workers)]:
+        for algorithm, stats in future.result().items():
+            totals[algorithm].merge(stats)
+    return totals
+
+
+def solve_parallel(mazes, algorithms=('bfs',), workers=None):
+    """Solve a list of Maze objects across processes; see run_batch."""
+    shared = SharedMazes.from_mazes(mazes)
+    try:
+        return run_batch(shared, algorithms, workers)
+    finally:
+        shared.unlink()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Solve a maze corpus across processes.")
+    parser.add_argument("--count", type=int, default=10000, help="number of mazes")
+    parser.add_argument("--rows", type=int, default=20)
+    parser.add_argument("--cols", type=int, default=30)
+    parser.add_argument("--generator", choices=tuple(GENERATORS), default="backtracker")
+    parser.add_argument("--algorithm", choices=ALGORITHMS + ('all',), default="all",
+                        help="solver to use, or 'all' to compare every solver")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=None, help="seed for the whole batch")
+    parser.add_argument("--load-dir", help="solve the .maze files in this directory "
+                                           "instead of generating mazes")
+    parser.add_argument("--scaling", action="store_true",
+                        help="repeat the batch with 1, 2, 4, ... workers up to --workers")
+    args = parser.parse_args(argv)
+
+    algorithms = ALGORITHMS if args.algorithm == 'all' else (args.algorithm,)
+    seed = args.seed if args.seed is not None else random.randrange(2 ** 32)
+    if args.load_dir:
+        shared = SharedMazes.from_dir(args.load_dir)
+        generator = None
+        print(f"{len(shared)} mazes from {args.load_dir}")
+    else:
+        shared = SharedMazes.allocate(args.count, args.rows, args.cols)
+        generator = args.generator
+        print(f"{args.count} {generator} mazes {args.rows}x{args.cols}, seed {seed}")
+
+    counts = [args.workers]
+    if args.scaling:
+        counts = [1]
+        while counts[-1] * 2 < args.workers:
+            counts.append(counts[-1] * 2)
+        if counts[-1] != args.workers:
+            counts.append(args.workers)
+
+    try:
+        if generator is not None:
+            began = time.perf_counter()
+            generate_batch(shared, generator, seed, args.workers)
+            print(f"generated in {time.perf_counter() - began:.2f}s")
+        baseline = None
+        for workers in counts:
+            # Only the solve is timed: the pool is started beforehand
+            with start_pool(shared, workers) as pool:
+                began = time.perf_counter()
+                totals = run_batch(shared, algorithms, workers, pool=pool)
+                elapsed = time.perf_counter() - began
+            baseline = baseline or elapsed
+            print(f"{workers} worker(s): {elapsed:.2f}s wall, "
+                  f"{len(shared) / elapsed:,.0f} mazes/s, speedup {baseline / elapsed:.2f}x")
+            for stats in totals.values():
+                print(stats.summary())
+    finally:
+        shared.unlink()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,334 @@
+"""Scrollable, zoomable view for mazes too large for one canvas item per cell.
+
+Only the visible part of the maze is rendered.  Zoomed in, the visible
+cells are drawn with a reused pool of rectangles.  Zoomed out, the maze is
+a bitmap with one pixel per cell, and Tk's photo ``copy`` crops and scales
+just the visible region of it.  Visited and solution colors are painted into
+the same bitmap, and the solution path also gets a single line item so it
+stays visible when the view is shrunk.
+"""
+import tkinter as tk
+
+# (zoom, subsample) pairs; pixels per cell is zoom / subsample
+ZOOM_LEVELS = [(1, 8), (1, 4), (1, 2), (1, 1), (2, 1), (3, 1), (4, 1),
+               (6, 1), (8, 1), (12, 1), (16, 1), (24, 1)]
+
+# From this many pixels per cell up, draw rectangles instead of the bitmap
+TILE_MIN_PIXELS = 8
+
+# Rows of pixel data sent to Tk per PhotoImage.put call
+BITMAP_CHUNK_ROWS = 64
+
+
+class MazeViewport:
+    """Render a maze into ``canvas`` with scrolling and zoom.
+
+    ``colors`` needs 'wall', 'path', 'start', 'end' and 'solution' entries.
+    """
+
+    def __init__(self, canvas, xscrollbar, yscrollbar, colors):
+        self.canvas = canvas
+        self.xscrollbar = xscrollbar
+        self.yscrollbar = yscrollbar
+        self.colors = colors
+
+        self.maze = None
+        self.level = ZOOM_LEVELS.index((1, 1))
+
+        # Painted color per cell: 0 means "base color", otherwise palette[code]
+        self.palette = [None]
+        self.palette_codes = {}
+        self.state = bytearray()
+
+        self.bitmap = None              # one pixel per cell
+        self.view = tk.PhotoImage()     # visible crop of the bitmap
+        self.view_item = None
+        self.tile_items = []
+        self.visible_tiles = {}         # flat index -> tile item, in tile mode
+        self.path = None
+        self.path_item = None
+
+        canvas.configure(xscrollcommand=xscrollbar.set, yscrollcommand=yscrollbar.set)
+        xscrollbar.configure(command=self.xview)
+        yscrollbar.configure(command=self.yview)
+        self.bindings = [
+            ("<Configure>", canvas.bind("<Configure>", lambda event: self.refresh())),
+            ("<MouseWheel>", canvas.bind("<MouseWheel>", self.on_wheel)),
+            ("<Button-4>", canvas.bind("<Button-4>", self.on_wheel)),
+            ("<Button-5>", canvas.bind("<Button-5>", self.on_wheel)),
+            ("<ButtonPress-1>", canvas.bind("<ButtonPress-1>", self.on_press)),
+            ("<B1-Motion>", canvas.bind("<B1-Motion>", self.on_drag)),
+        ]
+
+    def destroy(self):
+        """Remove everything the viewport drew and its event bindings."""
+        for sequence, funcid in self.bindings:
+            self.canvas.unbind(sequence, funcid)
+        self.canvas.delete("all")
+        self.canvas.configure(xscrollcommand="", yscrollcommand="", scrollregion=(0, 0, 0, 0))
+        self.canvas.xview_moveto(0)
+        self.canvas.yview_moveto(0)
+        self.bitmap = None
+
+    # Maze and painting
+
+    def set_maze(self, maze):
+        """Show ``maze`` with no visited or solution cells.
+
+        A new maze is zoomed to fit; redrawing the current one keeps the view.
+        """
+        refit = maze is not self.maze
+        self.maze = maze
+        self.state = bytearray(maze.rows * maze.cols)
+        self.path = None
+        self.build_bitmap()
+        if refit:
+            self.fit()
+        else:
+            self.draw_path()
+            self.refresh()
+
+    def base_color(self, index):
+        maze = self.maze
+        cell = divmod(index, maze.cols)
+        if cell == maze.start:
+            return self.colors['start']
+        if cell == maze.end:
+            return self.colors['end']
+        return self.colors['wall'] if maze.cells[index] else self.colors['path']
+
+    def cell_color(self, index):
+        code = self.state[index]
+        return self.palette[code] if code else self.base_color(index)
+
+    def row_colors(self, row):
+        cols = self.maze.cols
+        lookup = (self.colors['path'], self.colors['wall'])
+        cells = self.maze.cells[row * cols:(row + 1) * cols]
+        state = self.state[row * cols:(row + 1) * cols]
+        if state.count(0) == cols:
+            return [lookup[c] for c in cells]
+        palette = self.palette
+        return [palette[code] if code else lookup[c] for c, code in zip(cells, state)]
+
+    def build_bitmap(self):
+        """Draw the whole maze, with any painted cells, into a one-pixel-per-cell PhotoImage."""
+        maze = self.maze
+        rows, cols = maze.rows, maze.cols
+
+        self.bitmap = tk.PhotoImage(width=cols, height=rows)
+        for top in range(0, rows, BITMAP_CHUNK_ROWS):
+            bottom = min(rows, top + BITMAP_CHUNK_ROWS)
+            data = " ".join(
+                "{" + " ".join(self.row_colors(row)) + "}"
+                for row in range(top, bottom)
+            )
+            self.bitmap.put(data, to=(0, top))
+        for row, col in (maze.start, maze.end):
+            self.bitmap.put(self.base_color(row * cols + col), to=(col, row))
+
+    def color_code(self, color):
+        code = self.palette_codes.get(color)
+        if code is None:
+            code = self.palette_codes[color] = len(self.palette)
+            self.palette.append(color)
+        return code
+
+    def paint_cells(self, cells):
+        """Recolor ``(row, col), color`` pairs in the bitmap and any visible tile."""
+        cols = self.maze.cols
+        for (row, col), color in cells:
+            code = self.color_code(color)
+            index = row * cols + col
+            self.state[index] = code
+            self.bitmap.put(color, to=(col, row))
+            item = self.visible_tiles.get(index)
+            if item is not None:
+                self.canvas.itemconfig(item, fill=color)
+        if self.view_item is not None:
+            self.draw_bitmap()
+
+    def paint_levels(self, levels, colors):
+        """Paint every cell at once: level ``k`` (1-based) gets ``colors[k - 1]``.
+
+        ``levels`` holds one byte per cell; 0 leaves the cell's base color.
+        Start and end always keep theirs.
+        """
+        table = bytearray(256)
+        for level, color in enumerate(colors, 1):
+            table[level] = self.color_code(color)
+        self.state = bytearray(bytes(levels).translate(table))
+        cols = self.maze.cols
+        for row, col in (self.maze.start, self.maze.end):
+            self.state[row * cols + col] = 0
+        self.build_bitmap()
+        self.refresh()
+
+    def show_path(self, path):
+        """Outline the solution path with a single line item."""
+        self.path = path
+        self.draw_path()
+
+    # Scrolling and zoom
+
+    def cell_at(self, x, y):
+        """The (row, col) under canvas point (x, y), or None outside the maze."""
+        scale = self.pixels_per_cell()
+        row = int(self.canvas.canvasy(y) // scale)
+        col = int(self.canvas.canvasx(x) // scale)
+        if 0 <= row < self.maze.rows and 0 <= col < self.maze.cols:
+            return row, col
+        return None
+
+    def pixels_per_cell(self):
+        zoom, subsample = ZOOM_LEVELS[self.level]
+        return zoom / subsample
+
+    def fit(self):
+        """Pick the largest zoom level at which the whole maze fits the canvas."""
+        width, height = self.canvas_size()
+        self.level = 0
+        for level, (zoom, subsample) in enumerate(ZOOM_LEVELS):
+            scale = zoom / subsample
+            if self.maze.cols * scale <= width and self.maze.rows * scale <= height:
+                self.level = level
+        self.apply_zoom(0, 0, 0, 0)
+
+    def zoom_by(self, steps, x, y):
+        """Change zoom by ``steps`` levels keeping canvas point (x, y) in place."""
+        level = max(0, min(len(ZOOM_LEVELS) - 1, self.level + steps))
+        if level == self.level:
+            return
+        old_scale = self.pixels_per_cell()
+        cell_x = self.canvas.canvasx(x) / old_scale
+        cell_y = self.canvas.canvasy(y) / old_scale
+        self.level = level
+        self.apply_zoom(cell_x, cell_y, x, y)
+
+    def apply_zoom(self, cell_x, cell_y, x, y):
+        scale = self.pixels_per_cell()
+        width = self.maze.cols * scale
+        height = self.maze.rows * scale
+        self.canvas.configure(scrollregion=(0, 0, width, height))
+        self.canvas.xview_moveto(max(0.0, (cell_x * scale - x) / width))
+        self.canvas.yview_moveto(max(0.0, (cell_y * scale - y) / height))
+        self.draw_path()
+        self.refresh()
+
+    def xview(self, *args):
+        self.canvas.xview(*args)
+        self.refresh()
+
+    def yview(self, *args):
+        self.canvas.yview(*args)
+        self.refresh()
+
+    def on_wheel(self, event):
+        if event.num == 5 or getattr(event, "delta", 0) < 0:
+            self.zoom_by(-1, event.x, event.y)
+        else:
+            self.zoom_by(1, event.x, event.y)
+
+    def on_press(self, event):
+        self.canvas.scan_mark(event.x, event.y)
+
+    def on_drag(self, event):
+        self.canvas.scan_dragto(event.x, event.y, gain=1)
+        self.refresh()
+
+    # Rendering
+
+    def canvas_size(self):
+        width = self.canvas.winfo_width()
+        height = self.canvas.winfo_height()
+        if width <= 1 or height <= 1:
+            # Not mapped yet: fall back to the requested size
+            width = int(self.canvas.cget("width"))
+            height = int(self.canvas.cget("height"))
+        return width, height
+
+    def visible_cells(self):
+        """Visible (row0, row1, col0, col1) cell range, end-exclusive."""
+        scale = self.pixels_per_cell()
+        width, height = self.canvas_size()
+        x0 = self.canvas.canvasx(0)
+        y0 = self.canvas.canvasy(0)
+        col0 = max(0, int(x0 / scale))
+        row0 = max(0, int(y0 / scale))
+        col1 = min(self.maze.cols, int((x0 + width) / scale) + 1)
+        row1 = min(self.maze.rows, int((y0 + height) / scale) + 1)
+        return row0, row1, col0, col1
+
+    def refresh(self):
+        """Redraw the visible region in tile or bitmap mode."""
+        if self.maze is None:
+            return
+        if self.pixels_per_cell() >= TILE_MIN_PIXELS:
+            if self.view_item is not None:
+                self.canvas.delete(self.view_item)
+                self.view_item = None
+            self.draw_tiles()
+        else:
+            self.hide_tiles()
+            self.draw_bitmap()
+        if self.path_item is not None:
+            self.canvas.tag_raise(self.path_item)
+
+    def draw_tiles(self):
+        row0, row1, col0, col1 = self.visible_cells()
+        scale = self.pixels_per_cell()
+        cols = self.maze.cols
+        needed = (row1 - row0) * (col1 - col0)
+        while len(self.tile_items) < needed:
+            self.tile_items.append(self.canvas.create_rectangle(0, 0, 0, 0, outline="#0f0f1e"))
+
+        self.visible_tiles = {}
+        items = iter(self.tile_items)
+        for row in range(row0, row1):
+            y1 = row * scale
+            for col in range(col0, col1):
+                item = next(items)
+                index = row * cols + col
+                x1 = col * scale
+                self.canvas.coords(item, x1, y1, x1 + scale, y1 + scale)
+                self.canvas.itemconfig(item, fill=self.cell_color(index), state="normal")
+                self.visible_tiles[index] = item
+        for item in items:
+            self.canvas.itemconfig(item, state="hidden")
+
+    def hide_tiles(self):
+        if self.visible_tiles:
+            for item in self.tile_items:
+                self.canvas.itemconfig(item, state="hidden")
+            self.visible_tiles = {}
+
+    def draw_bitmap(self):
+        row0, row1, col0, col1 = self.visible_cells()
+        zoom, subsample = ZOOM_LEVELS[self.level]
+        # Align the crop to the subsample grid so pixels don't shimmer on scroll
+        col0 -= col0 % subsample
+        row0 -= row0 % subsample
+        self.view.tk.call(self.view, "copy", self.bitmap,
+                          "-from", col0, row0, col1, row1,
+                          "-zoom", zoom, zoom, "-subsample", subsample, subsample,
+                          "-shrink")
+        scale = zoom / subsample
+        if self.view_item is None:
+            self.view_item = self.canvas.create_image(0, 0, image=self.view, anchor=tk.NW)
+            self.canvas.tag_lower(self.view_item)
+        self.canvas.coords(self.view_item, col0 * scale, row0 * scale)
+
+    def draw_path(self):
+        if self.path_item is not None:
+            self.canvas.delete(self.path_item)
+            self.path_item = None
+        if not self.path or len(self.path) < 2:
+            return
+        scale = self.pixels_per_cell()
+        points = []
+        for row, col in self.path:
+            points.append((col + 0.5) * scale)
+            points.append((row + 0.5) * scale)
+        self.path_item = self.canvas.create_line(
+            *points, fill=self.colors['solution'], width=max(1, min(3, int(scale / 3)))
+        )
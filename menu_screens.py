@@ -0,0 +1,132 @@
+"""Event-driven menu screens for the pygame games.
+
+A menu used to be a ``while True`` loop that redrew and flipped as fast as
+the CPU allowed, pinning a core while it waited for a key.  ``run_screen``
+instead blocks in ``pygame.event.wait`` (with a timeout, for screens that
+change over time) and only redraws after input that changed the screen or
+when the window needs repainting.  With the game's clock, redraws are
+capped at MENU_FPS and the clock is ticked on the way out, so the time
+spent in the menu isn't counted as one long game frame.
+
+A screen is an object with ``draw(surface)`` and ``handle(event)``:
+``handle`` returns None to keep going (setting ``dirty`` when the screen
+must be redrawn) or a result that ends the screen.  A result that is
+itself a screen is run next, so screens chain like a state machine.
+TextScreen and NumberInputScreen cover the games' menus; their text comes
+from text_cache and is rendered once.
+"""
+import sys
+
+import pygame
+
+import text_cache
+
+IDLE_TIMEOUT = 1000  # ms between update() calls while no events arrive
+MENU_FPS = 30  # at most this many redraws per second, e.g. under key repeat
+BACKGROUND = (0, 0, 0)
+
+# Events after which the window has to be painted again
+REDRAW_EVENTS = (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED, pygame.WINDOWSHOWN,
+                 pygame.WINDOWRESTORED, pygame.WINDOWSIZECHANGED)
+
+
+class TextScreen:
+    """Static lines of text, ended by one of ``keys``.
+
+    ``items`` are (text, size, color, y) tuples, centered horizontally;
+    ``keys`` maps a key to the screen's result.  Closing the window
+    returns ``on_quit``, or quits the program when it is None.
+    """
+
+    def __init__(self, items, keys, on_quit=None, font=None, background=BACKGROUND):
+        self.items = [(text_cache.render(text, size, color, font), y) for text, size, color, y in items]
+        self.keys = keys
+        self.on_quit = on_quit
+        self.background = background
+        self.dirty = False
+
+    def draw(self, surface):
+        surface.fill(self.background)
+        width = surface.get_width()
+        for text, y in self.items:
+            surface.blit(text, (width // 2 - text.get_width() // 2, y))
+
+    def update(self):
+        """Change the screen over time; return True when it needs a redraw."""
+        return False
+
+    def handle(self, event):
+        if event.type == pygame.QUIT:
+            return quit_result(self.on_quit)
+        if event.type == pygame.KEYDOWN:
+            return self.keys.get(event.key)
+        return None
+
+
+class NumberInputScreen(TextScreen):
+    """A number typed on the keyboard, shown at ``field`` (size, color, y).
+
+    ENTER returns the number once one has been typed.
+    """
+
+    def __init__(self, items, field, on_quit=None, font=None, background=BACKGROUND):
+        super().__init__(items, {}, on_quit, font, background)
+        self.field = field
+        self.font = font
+        self.text = ""
+
+    def draw(self, surface):
+        super().draw(surface)
+        size, color, y = self.field
+        text = text_cache.render(self.text, size, color, self.font)
+        surface.blit(text, (surface.get_width() // 2 - text.get_width() // 2, y))
+
+    def handle(self, event):
+        if event.type == pygame.QUIT:
+            return quit_result(self.on_quit)
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_RETURN and self.text.isdigit():
+                return int(self.text)
+            elif event.key == pygame.K_BACKSPACE:
+                self.text = self.text[:-1]
+                self.dirty = True
+            elif event.unicode.isdigit():
+                self.text += event.unicode
+                self.dirty = True
+        return None
+
+
+def quit_result(on_quit):
+    """The result of closing the window: ``on_quit``, or exit when it is None."""
+    if on_quit is None:
+        pygame.quit()
+        sys.exit()
+    return on_quit
+
+
+def run_screen(screen, surface, clock=None, timeout=IDLE_TIMEOUT):
+    """Show ``screen`` (and any screen it leads to) until one returns a result."""
+    while True:
+        screen.draw(surface)
+        pygame.display.flip()
+        result = None
+        redraw = False
+        while result is None:
+            event = pygame.event.wait(timeout)
+            if event.type == pygame.NOEVENT:
+                redraw = screen.update() or redraw
+            else:
+                result = screen.handle(event)
+                redraw = redraw or screen.dirty or event.type in REDRAW_EVENTS
+            # Events still queued go first, so typing fast costs one redraw
+            if result is None and redraw and not pygame.event.peek():
+                redraw = screen.dirty = False
+                screen.draw(surface)
+                pygame.display.flip()
+                if clock is not None:
+                    clock.tick(MENU_FPS)
+        if clock is not None:
+            clock.tick()
+        if not hasattr(result, "handle"):
+            return result
+        screen = result
@@ -1,6 +1,11 @@
+import argparse
 import pygame
 import random
 
+import frame_profiler
+import menu_screens
+import text_cache
+
 # Initialize Pygame
 pygame.init()
 
@@ -23,6 +28,10 @@ GREEN = (0, 255, 0)
 screen = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption("Table Tennis Game")
 
+# Font sizes; fonts and rendered text come from the shared text cache
+TITLE_SIZE, HEADING_SIZE, TEXT_SIZE = 74, 48, 36
+text_cache.fonts.preload(TITLE_SIZE, HEADING_SIZE, TEXT_SIZE)
+
 # Game reset function
 def reset_game():
     return {
@@ -44,41 +53,13 @@ WINNING_SCORE = None
 
 # Function to display the setup screen
 def display_setup_screen():
-    font = pygame.font.Font(None, 74)
-    small_font = pygame.font.Font(None, 36)
-    input_active = True
-    input_text = ""
-    while input_active:
-        screen.fill(BLACK)
-        title_text = font.render("Set Winning Score", True, WHITE)
-        screen.blit(title_text, (WIDTH // 2 - title_text.get_width() // 2, HEIGHT // 4))
-
-        # Render input text
-        input_surface = font.render(input_text, True, GREEN)
-        screen.blit(input_surface, (WIDTH // 2 - input_surface.get_width() // 2, HEIGHT // 2))
-
-        instruction_text = small_font.render("Press ENTER to confirm", True, WHITE)
-        screen.blit(instruction_text, (WIDTH // 2 - instruction_text.get_width() // 2, HEIGHT // 2 + 50))
-
-        pygame.display.flip()
-
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                exit()
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_RETURN and input_text.isdigit():
-                    return int(input_text)
-                elif event.key == pygame.K_BACKSPACE:
-                    input_text = input_text[:-1]
-                elif event.unicode.isdigit():
-                    input_text += event.unicode
+    return menu_screens.run_screen(menu_screens.NumberInputScreen(
+        [("Set Winning Score", TITLE_SIZE, WHITE, HEIGHT // 4),
+         ("Press ENTER to confirm", TEXT_SIZE, WHITE, HEIGHT // 2 + 50)],
+        (TITLE_SIZE, GREEN, HEIGHT // 2)), screen, clock)
 
 # Function to display the instructions page
 def display_instructions_page():
-    font = pygame.font.Font(None, 48)
-    small_font = pygame.font.Font(None, 36)
-    
     instructions = [
         "Welcome to Table Tennis!",
         "Player 1: Use W (up) and S (down) to move",
@@ -86,30 +67,15 @@ def display_instructions_page():
         "Press ENTER to start the game",
         "First to reach the set score wins!"
     ]
-    
-    while True:
-        screen.fill(BLACK)
-        
-        # Display instructions
-        y_offset = HEIGHT // 4
-        for line in instructions:
-            text = font.render(line, True, WHITE)
-            screen.blit(text, (WIDTH // 2 - text.get_width() // 2, y_offset))
-            y_offset += 50
-        
-        # Instruction to start game
-        start_text = small_font.render("Press ENTER to start", True, GREEN)
-        screen.blit(start_text, (WIDTH // 2 - start_text.get_width() // 2, HEIGHT - 100))
-        
-        pygame.display.flip()
+    items = [(line, HEADING_SIZE, WHITE, HEIGHT // 4 + 50 * i) for i, line in enumerate(instructions)]
+    items.append(("Press ENTER to start", TEXT_SIZE, GREEN, HEIGHT - 100))
+    menu_screens.run_screen(menu_screens.TextScreen(items, {pygame.K_RETURN: "start"}), screen, clock)
 
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                exit()
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_RETURN:
-                    return
+parser = argparse.ArgumentParser(description="Table tennis for two players")
+frame_profiler.add_arguments(parser)
+args = parser.parse_args()
+profiler = frame_profiler.from_args(args, FPS)
+clock = pygame.time.Clock()
 
 # Prompt for winning score
 if WINNING_SCORE is None:
@@ -120,10 +86,10 @@ display_instructions_page()
 
 while True:
     # Game loop
-    clock = pygame.time.Clock()
     running = True
 
     while running:
+        profiler.begin_frame()
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
@@ -132,6 +98,9 @@ while True:
                 if event.key == pygame.K_ESCAPE:
                     WINNING_SCORE = display_setup_screen()
                     game_state = reset_game()
+                    profiler.begin_frame()
+            profiler.handle_event(event)
+        profiler.lap("events")
 
         if not game_state["game_over"]:
             # Get keys for paddle movement
@@ -150,6 +119,7 @@ while True:
             # Ball movement
             game_state["ball_x"] += game_state["ball_dx"]
             game_state["ball_y"] += game_state["ball_dy"]
+            profiler.lap("simulation")
 
             # Ball collision with top and bottom walls
             if game_state["ball_y"] - BALL_RADIUS <= 0 or game_state["ball_y"] + BALL_RADIUS >= HEIGHT:
@@ -162,6 +132,7 @@ while True:
             if (game_state["ball_x"] + BALL_RADIUS >= WIDTH - PADDLE_WIDTH and
                     game_state["right_paddle_y"] <= game_state["ball_y"] <= game_state["right_paddle_y"] + PADDLE_HEIGHT):
                 game_state["ball_dx"] = -game_state["ball_dx"]
+            profiler.lap("collision")
 
             # Scoring
             if game_state["ball_x"] - BALL_RADIUS <= 0:  # Right player scores
@@ -182,6 +153,7 @@ while True:
             if game_state["right_score"] >= WINNING_SCORE:
                 game_state["game_over"] = True
                 game_state["winner"] = "Right Player"
+            profiler.lap("simulation")
 
         # Drawing
         screen.fill(BLACK)
@@ -194,20 +166,23 @@ while True:
             # Draw ball
             pygame.draw.circle(screen, WHITE, (game_state["ball_x"], game_state["ball_y"]), BALL_RADIUS)
             # Draw scores
-            font = pygame.font.Font(None, 74)
-            left_text = font.render(str(game_state["left_score"]), True, WHITE)
-            right_text = font.render(str(game_state["right_score"]), True, WHITE)
+            left_text = text_cache.render(str(game_state["left_score"]), TITLE_SIZE, WHITE)
+            right_text = text_cache.render(str(game_state["right_score"]), TITLE_SIZE, WHITE)
             screen.blit(left_text, (WIDTH // 4, 20))
             screen.blit(right_text, (3 * WIDTH // 4, 20))
         else:
             # Display winner
-            font = pygame.font.Font(None, 74)
-            winner_text = font.render(f"{game_state['winner']} Wins!", True, WHITE)
+            winner_text = text_cache.render(f"{game_state['winner']} Wins!", TITLE_SIZE, WHITE)
             screen.blit(winner_text, (WIDTH // 2 - winner_text.get_width() // 2, HEIGHT // 2 - winner_text.get_height() // 2))
-            restart_text = font.render("Press ESC to Restart", True, WHITE)
+            restart_text = text_cache.render("Press ESC to Restart", TITLE_SIZE, WHITE)
             screen.blit(restart_text, (WIDTH // 2 - restart_text.get_width() // 2, HEIGHT // 2 + 50))
+        profiler.lap("draw")
 
+        profiler.draw(screen)
         pygame.display.flip()
+        profiler.lap("flip")
         clock.tick(FPS)
+        profiler.lap("wait")
+        profiler.end_frame()
 
 pygame.quit()
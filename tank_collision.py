@@ -0,0 +1,49 @@
+"""Broad-phase collision for the tank game.
+
+A uniform grid (spatial hash): every registered body is listed in each grid
+cell its rect overlaps, and a query returns only the bodies that share a
+cell with the queried rect.  The exact ``colliderect`` test then runs on
+those candidates alone instead of on every obstacle and player.
+
+Projectiles only ever hit obstacles and players, never each other, so the
+game registers obstacles and players each frame and lets every projectile
+query the grid.
+"""
+from collections import defaultdict
+
+# Larger than any body in the game, so most rects overlap at most 4 cells
+CELL_SIZE = 64
+
+
+class SpatialHash:
+    """Uniform-grid broad phase over pygame rects."""
+
+    def __init__(self, cell_size=CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = defaultdict(list)
+
+    def clear(self):
+        self.cells.clear()
+
+    def insert(self, rect, body):
+        """Register ``body`` in every cell that ``rect`` overlaps."""
+        size = self.cell_size
+        for cx in range(rect.left // size, (rect.right - 1) // size + 1):
+            for cy in range(rect.top // size, (rect.bottom - 1) // size + 1):
+                self.cells[cx, cy].append(body)
+
+    def query(self, rect):
+        """Bodies sharing at least one cell with ``rect``, each listed once."""
+        size = self.cell_size
+        cells = self.cells
+        x0, x1 = rect.left // size, (rect.right - 1) // size
+        y0, y1 = rect.top // size, (rect.bottom - 1) // size
+        if x0 == x1 and y0 == y1:
+            return cells.get((x0, y0), ())
+        found = []
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                for body in cells.get((cx, cy), ()):
+                    if body not in found:
+                        found.append(body)
+        return found
@@ -0,0 +1,271 @@
+"""Game state and simulation for the 2-player tank game, without a window.
+
+TankGame holds everything a match needs (players, scores, missiles,
+obstacles, projectiles) and advances it one fixed tick at a time from a
+bitmask of player inputs, so the same match can be drawn by the pygame
+front end, driven by bots, or simulated in bulk with no display at all.
+
+Inputs: each player has four bits, UP and DOWN (held) and FIRE and MISSILE
+(pressed this tick); player 2's bits sit above player 1's.  Use
+``player_input(player, bits)`` to place them.
+
+Bots are callables taking the game and returning their player's input.
+``play_match`` runs one bot-vs-bot match to the end.
+"""
+import os
+import random
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+import pygame
+
+from tank_collision import SpatialHash
+from tank_projectiles import BULLET, MISSILE, ProjectilePool
+
+WIDTH, HEIGHT = 800, 600
+PLAYER_WIDTH, PLAYER_HEIGHT = 50, 50
+BULLET_WIDTH, BULLET_HEIGHT = 10, 5
+MISSILE_WIDTH, MISSILE_HEIGHT = 30, 15
+PLAYER_SPEED = 5  # speeds are in pixels per simulation tick
+BULLET_SPEED = 10
+MISSILE_SPEED = 7
+OBSTACLE_WIDTH, OBSTACLE_HEIGHT = 15, 50  # Reduced size of obstacles
+OBSTACLE_SPEED = 3
+MAX_MISSILES = 3
+TICK_RATE = 60  # simulation ticks per second
+
+# Per projectile kind (BULLET, MISSILE)
+PROJECTILE_SIZES = [(BULLET_WIDTH, BULLET_HEIGHT), (MISSILE_WIDTH, MISSILE_HEIGHT)]
+
+# Obstacle layouts: (x, y, initial direction) of each obstacle
+OBSTACLE_LAYOUTS = {
+    'default': [(WIDTH // 3, HEIGHT // 4, 1), (WIDTH // 2, HEIGHT // 2, -1),
+                (WIDTH * 2 // 3, HEIGHT * 3 // 4, 1)],
+    'open': [],
+    'center': [(WIDTH // 2, HEIGHT // 2, 1)],
+    'wall': [(WIDTH // 2, y, 1 if i % 2 else -1)
+             for i, y in enumerate(range(HEIGHT // 10, HEIGHT - OBSTACLE_HEIGHT, HEIGHT // 5))],
+}
+
+# Input bits of one player, shifted by player_input
+UP, DOWN, FIRE, MISSILE_FIRE = 1, 2, 4, 8
+PLAYER_BITS = 4
+
+OBSTACLE = 0  # body kind for obstacles in the collision grid; players use 1 and 2
+
+
+def player_input(player, bits):
+    """Place one player's UP/DOWN/FIRE/MISSILE_FIRE bits in a tick's input."""
+    return bits << (PLAYER_BITS * (player - 1))
+
+
+class TankGame:
+    """One match: state plus the fixed-tick step function.
+
+    The keyword arguments are the tunable rules; they default to the
+    game's own constants.
+    """
+
+    def __init__(self, winning_score=10, max_missiles=MAX_MISSILES, player_speed=PLAYER_SPEED,
+                 bullet_speed=BULLET_SPEED, missile_speed=MISSILE_SPEED,
+                 obstacle_speed=OBSTACLE_SPEED, layout='default'):
+        self.winning_score = winning_score
+        self.max_missiles = max_missiles
+        self.player_speed = player_speed
+        self.projectile_speeds = [bullet_speed, missile_speed]
+        self.obstacle_speed = obstacle_speed
+        self.layout = layout
+
+        self.player1 = pygame.Rect(50, HEIGHT // 2 - PLAYER_HEIGHT // 2, PLAYER_WIDTH, PLAYER_HEIGHT)
+        self.player2 = pygame.Rect(WIDTH - 50 - PLAYER_WIDTH, HEIGHT // 2 - PLAYER_HEIGHT // 2,
+                                   PLAYER_WIDTH, PLAYER_HEIGHT)
+        self.obstacles = [pygame.Rect(x, y, OBSTACLE_WIDTH, OBSTACLE_HEIGHT)
+                          for x, y, _ in OBSTACLE_LAYOUTS[layout]]
+        self.obstacle_directions = [direction for _, _, direction in OBSTACLE_LAYOUTS[layout]]
+        self.projectiles = ProjectilePool()
+        # Broad phase: obstacles and players are registered each tick,
+        # projectiles query it and only run colliderect on what shares a cell
+        self.collision_grid = SpatialHash()
+        self.tick = 0
+        self.profiler = None  # a frame_profiler.FrameProfiler to lap collision separately
+        self.reset()
+
+    def reset(self):
+        """Start a new match: scores, missiles and projectiles, not positions."""
+        self.player1_score = 0
+        self.player2_score = 0
+        self.player1_missiles = self.max_missiles
+        self.player2_missiles = self.max_missiles
+        self.projectiles.clear()
+        self.tick = 0
+
+    def player(self, number):
+        return self.player1 if number == 1 else self.player2
+
+    def fire(self, owner, kind):
+        """Fire a projectile from the gun side of player ``owner``."""
+        player = self.player(owner)
+        width, height = PROJECTILE_SIZES[kind]
+        direction = 1 if owner == 1 else -1
+        x = player.right if owner == 1 else player.left - width
+        self.projectiles.spawn(x, player.centery - height // 2,
+                               direction * self.projectile_speeds[kind], owner, kind)
+
+    def step(self, inputs):
+        """Advance one tick: fire, move players, projectiles and obstacles."""
+        for owner in (1, 2):
+            bits = (inputs >> (PLAYER_BITS * (owner - 1))) & ((1 << PLAYER_BITS) - 1)
+            if bits & FIRE:
+                self.fire(owner, BULLET)
+            if bits & MISSILE_FIRE:
+                if owner == 1 and self.player1_missiles > 0:
+                    self.fire(1, MISSILE)
+                    self.player1_missiles -= 1
+                elif owner == 2 and self.player2_missiles > 0:
+                    self.fire(2, MISSILE)
+                    self.player2_missiles -= 1
+
+        for owner in (1, 2):
+            bits = inputs >> (PLAYER_BITS * (owner - 1))
+            player = self.player(owner)
+            if bits & UP and player.top > 0:
+                player.y -= self.player_speed
+            if bits & DOWN and player.bottom < HEIGHT:
+                player.y += self.player_speed
+
+        # Register what projectiles can hit
+        grid = self.collision_grid
+        grid.clear()
+        for obstacle in self.obstacles:
+            grid.insert(obstacle, (OBSTACLE, obstacle))
+        grid.insert(self.player1, (1, self.player1))
+        grid.insert(self.player2, (2, self.player2))
+
+        # Move bullets and missiles, dropping those that went off screen
+        projectiles = self.projectiles
+        projectiles.step(WIDTH)
+
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.lap("simulation")
+
+        # Check projectile hits
+        rect = pygame.Rect(0, 0, 0, 0)
+        for i, x, y, owner, kind in projectiles.live():
+            rect.update(x, y, *PROJECTILE_SIZES[kind])
+            hits = [body_kind for body_kind, body in grid.query(rect) if rect.colliderect(body)]
+
+            # Obstacles block bullets before they reach a player; missiles fly through
+            if kind == BULLET and OBSTACLE in hits:
+                projectiles.kill(i)
+            elif 3 - owner in hits:
+                points = 1 if kind == BULLET else self.winning_score // 3
+                if owner == 1:
+                    self.player1_score += points
+                else:
+                    self.player2_score += points
+                projectiles.kill(i)
+        projectiles.sweep()
+        if profiler is not None:
+            profiler.lap("collision")
+
+        # Move obstacles
+        for i, obstacle in enumerate(self.obstacles):
+            obstacle.y += self.obstacle_directions[i] * self.obstacle_speed
+            if obstacle.top <= 0 or obstacle.bottom >= HEIGHT:
+                self.obstacle_directions[i] *= -1
+
+        self.tick += 1
+        if profiler is not None:
+            profiler.lap("simulation")
+
+    def winner(self):
+        """1 or 2 once a player has reached the winning score, else None."""
+        if self.player1_score >= self.winning_score:
+            return 1
+        if self.player2_score >= self.winning_score:
+            return 2
+        return None
+
+
+class ChaseBot:
+    """Tracks the opponent vertically and fires whenever roughly level.
+
+    Missiles are kept for near-perfect alignment.  ``reaction`` is the
+    number of ticks between decisions, like a human's reaction time.
+    """
+
+    def __init__(self, player, seed=None, reaction=6):
+        self.player = player
+        self.rng = random.Random(seed)
+        self.reaction = reaction
+        self.wait = 0
+        self.held = 0
+
+    def __call__(self, game):
+        if self.wait > 0:
+            self.wait -= 1
+            return player_input(self.player, self.held)
+        self.wait = self.rng.randint(self.reaction // 2, self.reaction)
+
+        me = game.player(self.player)
+        target = game.player(3 - self.player)
+        offset = target.centery - me.centery
+        bits = 0
+        if offset < -game.player_speed:
+            bits |= UP
+        elif offset > game.player_speed:
+            bits |= DOWN
+        self.held = bits
+
+        if abs(offset) < PLAYER_HEIGHT // 2:
+            bits |= FIRE
+            if abs(offset) < PLAYER_HEIGHT // 8 and self.rng.random() < 0.1:
+                bits |= MISSILE_FIRE
+        return player_input(self.player, bits)
+
+
+class RandomBot:
+    """Wanders up and down and fires at random."""
+
+    def __init__(self, player, seed=None, fire_chance=0.05):
+        self.player = player
+        self.rng = random.Random(seed)
+        self.fire_chance = fire_chance
+        self.held = 0
+        self.hold_ticks = 0
+
+    def __call__(self, game):
+        rng = self.rng
+        if self.hold_ticks <= 0:
+            self.held = rng.choice((0, UP, DOWN))
+            self.hold_ticks = rng.randint(10, 60)
+        self.hold_ticks -= 1
+        bits = self.held
+        if rng.random() < self.fire_chance:
+            bits |= FIRE
+        if rng.random() < self.fire_chance / 20:
+            bits |= MISSILE_FIRE
+        return player_input(self.player, bits)
+
+
+BOTS = {
+    'chase': ChaseBot,
+    'random': RandomBot,
+}
+
+
+def play_match(bot1='chase', bot2='chase', seed=None, max_ticks=TICK_RATE * 300, **rules):
+    """Play one bot-vs-bot match headless; return (winner or 0 for a draw, ticks).
+
+    ``rules`` are TankGame keyword arguments.  A match still undecided
+    after ``max_ticks`` is a draw.
+    """
+    rng = random.Random(seed)
+    game = TankGame(**rules)
+    players = (BOTS[bot1](1, rng.random()), BOTS[bot2](2, rng.random()))
+    while game.tick < max_ticks:
+        game.step(players[0](game) | players[1](game))
+        winner = game.winner()
+        if winner is not None:
+            return winner, game.tick
+    return 0, game.tick
@@ -0,0 +1,150 @@
+"""Play bot-vs-bot tank matches headless across processes, for balance tuning.
+
+Every match runs on tank_core's TankGame with no window.  Match ``i`` of a
+run is seeded from the run seed and ``i``, so results don't depend on the
+number of workers.  Each worker plays a range of matches and sends back
+only totals, which the parent merges.
+
+``--sweep NAME=V1,V2,...`` repeats the run once per value of one rule
+(max_missiles, player_speed, bullet_speed, missile_speed, obstacle_speed,
+winning_score or layout) and prints one line per value.
+
+Usage: python tank_matches.py [--matches 2000] [--workers N] [--seed N]
+                              [--bot1 chase] [--bot2 chase] [--max-ticks N]
+                              [--winning-score 10] [--max-missiles 3]
+                              [--player-speed 5] [--bullet-speed 10]
+                              [--missile-speed 7] [--obstacle-speed 3]
+                              [--layout default] [--sweep NAME=V1,V2]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from tank_core import (BOTS, BULLET_SPEED, MAX_MISSILES, MISSILE_SPEED, OBSTACLE_LAYOUTS,
+                       OBSTACLE_SPEED, PLAYER_SPEED, TICK_RATE, play_match)
+
+# Tasks per worker; more than one evens out workers that draw longer matches
+CHUNKS_PER_WORKER = 4
+
+RULES = ('winning_score', 'max_missiles', 'player_speed', 'bullet_speed', 'missile_speed',
+         'obstacle_speed', 'layout')
+
+
+class MatchStats:
+    """Running match totals that can be merged across workers."""
+
+    def __init__(self):
+        self.matches = 0
+        self.wins = [0, 0, 0]  # draws, player 1, player 2
+        self.ticks = 0
+
+    def add(self, winner, ticks):
+        self.matches += 1
+        self.wins[winner] += 1
+        self.ticks += ticks
+
+    def merge(self, other):
+        self.matches += other.matches
+        self.wins = [a + b for a, b in zip(self.wins, other.wins)]
+        self.ticks += other.ticks
+
+    def summary(self):
+        n = max(self.matches, 1)
+        draws, p1, p2 = (100 * wins / n for wins in self.wins)
+        length = self.ticks / n
+        return (f"P1 {p1:5.1f}%  P2 {p2:5.1f}%  draw {draws:5.1f}%  "
+                f"avg length {length:,.0f} ticks ({length / TICK_RATE:.1f}s)")
+
+
+def _play_chunk(begin, stop, seed, bot1, bot2, max_ticks, rules):
+    stats = MatchStats()
+    for index in range(begin, stop):
+        stats.add(*play_match(bot1, bot2, f"{seed}:{index}", max_ticks, **rules))
+    return stats
+
+
+def _chunks(count, workers):
+    size = max(1, -(-count // (workers * CHUNKS_PER_WORKER)))
+    return [(begin, min(count, begin + size)) for begin in range(0, count, size)]
+
+
+def run_matches(matches, rules=None, bot1='chase', bot2='chase', workers=None, seed=None,
+                max_ticks=TICK_RATE * 300):
+    """Play ``matches`` matches on a pool of ``workers`` processes; return MatchStats.
+
+    ``rules`` are TankGame keyword arguments.  Without a ``seed``, a random
+    one is picked, so each call plays different matches.
+    """
+    workers = workers or os.cpu_count() or 1
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+    rules = rules or {}
+    totals = MatchStats()
+    with ProcessPoolExecutor(workers) as pool:
+        for future in [pool.submit(_play_chunk, begin, stop, seed, bot1, bot2, max_ticks, rules)
+                       for begin, stop in _chunks(matches, workers)]:
+            totals.merge(future.result())
+    return totals
+
+
+def parse_sweep(text):
+    """'max_missiles=1,3,5' -> ('max_missiles', [1, 3, 5])."""
+    name, _, values = text.partition('=')
+    name = name.replace('-', '_')
+    if name not in RULES or not values:
+        raise argparse.ArgumentTypeError(f"expected NAME=V1,V2,... with NAME one of {', '.join(RULES)}")
+    values = values.split(',')
+    if name == 'layout':
+        unknown = [value for value in values if value not in OBSTACLE_LAYOUTS]
+        if unknown:
+            raise argparse.ArgumentTypeError(f"unknown layout(s): {', '.join(unknown)}")
+        return name, values
+    try:
+        return name, [int(value) for value in values]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"{name} values must be integers") from None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play bot-vs-bot tank matches across processes.")
+    parser.add_argument("--matches", type=int, default=2000, help="matches per configuration")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=None, help="seed for the whole run")
+    parser.add_argument("--bot1", choices=sorted(BOTS), default="chase")
+    parser.add_argument("--bot2", choices=sorted(BOTS), default="chase")
+    parser.add_argument("--max-ticks", type=int, default=TICK_RATE * 300,
+                        help="an undecided match is a draw after this many ticks")
+    parser.add_argument("--winning-score", type=int, default=10)
+    parser.add_argument("--max-missiles", type=int, default=MAX_MISSILES)
+    parser.add_argument("--player-speed", type=int, default=PLAYER_SPEED)
+    parser.add_argument("--bullet-speed", type=int, default=BULLET_SPEED)
+    parser.add_argument("--missile-speed", type=int, default=MISSILE_SPEED)
+    parser.add_argument("--obstacle-speed", type=int, default=OBSTACLE_SPEED)
+    parser.add_argument("--layout", choices=sorted(OBSTACLE_LAYOUTS), default="default")
+    parser.add_argument("--sweep", type=parse_sweep, metavar="NAME=V1,V2",
+                        help="repeat the run for each value of one rule")
+    args = parser.parse_args(argv)
+
+    seed = args.seed if args.seed is not None else random.randrange(2 ** 32)
+    rules = {name: getattr(args, name) for name in RULES}
+    name, values = args.sweep or (None, [None])
+    print(f"{args.matches} matches per run, {args.bot1} vs {args.bot2}, "
+          f"{args.workers} worker(s), seed {seed}")
+
+    for value in values:
+        if name is not None:
+            rules[name] = value
+        began = time.perf_counter()
+        stats = run_matches(args.matches, rules, args.bot1, args.bot2, args.workers, seed,
+                            args.max_ticks)
+        elapsed = time.perf_counter() - began
+        label = f"{name}={value}: " if name is not None else ""
+        print(f"{label}{stats.summary()}  [{elapsed:.2f}s, {stats.matches / elapsed * 60:,.0f} matches/min]")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
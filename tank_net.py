@@ -0,0 +1,496 @@
+"""Networked tank matches: an authoritative asyncio server and thin clients.
+
+The server runs every match's TankGame at the fixed tick rate in a single
+asyncio loop.  Clients only send their input bits and draw the snapshots
+the server sends back, so a client can never disagree with the server
+about a hit.  Two clients that join are paired into a match; a server
+process hosts as many matches as it has pairs.
+
+Messages are length-prefixed binary frames over TCP.  A snapshot is the
+match state as a list of ints (tick, scores, missiles, positions,
+projectiles), encoded as a delta against the previous snapshot: runs of
+unchanged values are skipped and changed values are sent as zigzag varint
+differences, usually one byte each.  TCP delivers in order, so the previous
+snapshot is always the client's base; a client's first snapshot is encoded
+against an empty list.  Each snapshot is encoded once per match and the
+same bytes go to both players, so server work per match stays constant.
+
+Usage: python tank_net.py server [--host 127.0.0.1] [--port 5555]
+                                 [--winning-score 10] [--layout default]
+                                 [--snapshot-every 1]
+       python tank_net.py client [--host 127.0.0.1] [--port 5555]
+                                 [--bot KIND] [--headless]
+       python tank_net.py bots [--matches 10] [--bot chase]
+"""
+import argparse
+import asyncio
+import socket
+import struct
+import sys
+import time
+
+import pygame
+
+import text_cache
+from tank_core import (BOTS, DOWN, FIRE, HEIGHT, MISSILE_FIRE, OBSTACLE_LAYOUTS, PLAYER_BITS,
+                       PROJECTILE_SIZES, TICK_RATE, UP, WIDTH, TankGame, player_input)
+from tank_render import (BLACK, BLUE, GRAY, PROJECTILE_COLORS, RED, TEXT_SIZE, TITLE_SIZE, WHITE,
+                         YELLOW, HudText)
+
+# Frame header: payload length, message type
+FRAME = struct.Struct("<HB")
+JOIN, WELCOME, INPUT, SNAPSHOT, END = range(1, 6)
+
+# WELCOME payload: player number, winning_score, max_missiles,
+# player/bullet/missile/obstacle speed, layout name
+WELCOME_INFO = struct.Struct("<B6i16s")
+
+HELD = UP | DOWN
+PRESSED = FIRE | MISSILE_FIRE
+STATS_EVERY = 5.0  # seconds between server load reports
+
+
+def frame(kind, payload=b""):
+    return FRAME.pack(len(payload), kind) + payload
+
+
+def write_varint(out, n):
+    while n >= 0x80:
+        out.append(n & 0x7F | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def read_varint(data, pos):
+    n = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        n |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return n, pos
+        shift += 7
+
+
+def encode_delta(base, values):
+    """Encode ``values`` against ``base`` as (skip, run, zigzag diffs...) runs."""
+    out = bytearray()
+    write_varint(out, len(values))
+    n, m = len(values), len(base)
+    i = 0
+    while i < n:
+        start = i
+        while i < n and i < m and values[i] == base[i]:
+            i += 1
+        write_varint(out, i - start)
+        start = i
+        while i < n and not (i < m and values[i] == base[i]):
+            i += 1
+        write_varint(out, i - start)
+        for j in range(start, i):
+            diff = values[j] - (base[j] if j < m else 0)
+            write_varint(out, diff * 2 if diff >= 0 else -diff * 2 - 1)
+    return bytes(out)
+
+
+def decode_delta(base, data):
+    """Inverse of encode_delta: the new values, given the same ``base``."""
+    n, pos = read_varint(data, 0)
+    values = list(base[:n]) + [0] * (n - len(base))
+    i = 0
+    while i < n:
+        skip, pos = read_varint(data, pos)
+        i += skip
+        run, pos = read_varint(data, pos)
+        for _ in range(run):
+            zigzag, pos = read_varint(data, pos)
+            values[i] += zigzag >> 1 if not zigzag & 1 else -(zigzag + 1 >> 1)
+            i += 1
+    return values
+
+
+def snapshot(game):
+    """The state clients need to draw ``game``, as a flat list of ints."""
+    values = [game.tick, game.player1_score, game.player2_score, game.player1_missiles,
+              game.player2_missiles, game.player1.y, game.player2.y]
+    values += [obstacle.y for obstacle in game.obstacles]
+    values.append(len(game.projectiles))
+    for _, x, y, owner, kind in game.projectiles.live():
+        values += [x, y, owner << 1 | kind]
+    return values
+
+
+def apply_snapshot(game, values):
+    """Set a client-side TankGame to a snapshot."""
+    (game.tick, game.player1_score, game.player2_score, game.player1_missiles,
+     game.player2_missiles, game.player1.y, game.player2.y) = values[:7]
+    pos = 7
+    for obstacle in game.obstacles:
+        obstacle.y = values[pos]
+        pos += 1
+    count = values[pos]
+    pos += 1
+    projectiles = game.projectiles
+    projectiles.clear()
+    for _ in range(count):
+        x, y, flags = values[pos:pos + 3]
+        projectiles.spawn(x, y, 0, flags >> 1, flags & 1)
+        pos += 3
+
+
+class Match:
+    """One server-side game and the connections of its two players."""
+
+    def __init__(self, number, rules):
+        self.number = number
+        self.rules = rules
+        self.game = TankGame(**rules)
+        self.writers = {}
+        self.held = [0, 0, 0]
+        self.pressed = [0, 0, 0]
+        self.last = []
+        self.over = False
+
+    def welcome(self, player):
+        game = self.game
+        return frame(WELCOME, WELCOME_INFO.pack(
+            player, game.winning_score, game.max_missiles, game.player_speed,
+            game.projectile_speeds[0], game.projectile_speeds[1], game.obstacle_speed,
+            game.layout.encode()))
+
+    def receive(self, player, bits):
+        """Held keys replace the previous input; presses wait for the next tick."""
+        self.held[player] = bits & HELD
+        self.pressed[player] |= bits & PRESSED
+
+    def step(self, send_snapshot):
+        """Advance one tick; return the number of bytes sent."""
+        inputs = 0
+        for player in (1, 2):
+            inputs |= player_input(player, self.held[player] | self.pressed[player])
+            self.pressed[player] = 0
+        game = self.game
+        game.step(inputs)
+
+        winner = game.winner()
+        if not send_snapshot and winner is None:
+            return 0
+        values = snapshot(game)
+        message = frame(SNAPSHOT, encode_delta(self.last, values))
+        self.last = values
+        if winner is not None:
+            message += frame(END, bytes((winner,)))
+            self.over = True
+        for writer in self.writers.values():
+            writer.write(message)
+        return len(message) * len(self.writers)
+
+    def forfeit(self, player):
+        """End the match because ``player`` left; the other one wins."""
+        if self.over:
+            return
+        self.over = True
+        for other, writer in self.writers.items():
+            if other != player:
+                writer.write(frame(END, bytes((other,))))
+
+
+class TankServer:
+    """Pairs joining clients into matches and ticks all of them."""
+
+    def __init__(self, rules, snapshot_every=1, verbose=True):
+        self.rules = rules
+        self.snapshot_every = snapshot_every
+        self.verbose = verbose
+        self.matches = []
+        self.waiting = None
+        self.started = 0
+        self.bytes_sent = 0
+        self.tick_seconds = 0.0
+        self.ticks = 0
+
+    async def handle(self, reader, writer):
+        writer.get_extra_info("socket").setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        match = player = None
+        try:
+            length, kind = FRAME.unpack(await reader.readexactly(FRAME.size))
+            await reader.readexactly(length)
+            if kind != JOIN:
+                return
+            if self.waiting is None:
+                self.started += 1
+                self.waiting = Match(self.started, self.rules)
+            match = self.waiting
+            player = len(match.writers) + 1
+            match.writers[player] = writer
+            writer.write(match.welcome(player))
+            if player == 2:
+                self.waiting = None
+                self.matches.append(match)
+
+            while not match.over:
+                length, kind = FRAME.unpack(await reader.readexactly(FRAME.size))
+                payload = await reader.readexactly(length)
+                if kind == INPUT and payload:
+                    match.receive(player, payload[0])
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            if match is self.waiting and match is not None:
+                # Left before an opponent joined; the next client starts afresh
+                self.waiting = None
+            elif match is not None:
+                match.forfeit(player)
+            writer.close()
+
+    async def tick_loop(self):
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        next_report = next_tick + STATS_EVERY
+        tick = 0
+        while True:
+            began = time.perf_counter()
+            send_snapshot = tick % self.snapshot_every == 0
+            for match in self.matches:
+                self.bytes_sent += match.step(send_snapshot)
+            self.matches = [match for match in self.matches if not match.over]
+            self.tick_seconds += time.perf_counter() - began
+            self.ticks += 1
+            tick += 1
+
+            if self.verbose and loop.time() >= next_report:
+                self.report()
+                next_report += STATS_EVERY
+            next_tick += 1 / TICK_RATE
+            await asyncio.sleep(max(0.0, next_tick - loop.time()))
+
+    def report(self):
+        ticks = max(self.ticks, 1)
+        print(f"{len(self.matches)} match(es) running, {self.started} started, "
+              f"{self.bytes_sent / STATS_EVERY / 1024:.1f} KiB/s out, "
+              f"{self.tick_seconds / ticks * 1000:.3f} ms per tick", flush=True)
+        self.bytes_sent = 0
+        self.tick_seconds = 0.0
+        self.ticks = 0
+
+    async def serve(self, host, port):
+        server = await asyncio.start_server(self.handle, host, port)
+        print(f"serving tank matches on {host}:{port}", flush=True)
+        async with server:
+            await self.tick_loop()
+
+
+class SnapshotClient:
+    """Client-side protocol: turns received bytes into a TankGame to draw."""
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.player = None
+        self.game = None
+        self.values = []
+        self.winner = None
+        self.snapshot_bytes = 0
+
+    def feed(self, data):
+        """Handle every complete frame in ``data``; return True on a new snapshot."""
+        self.buffer += data
+        updated = False
+        while len(self.buffer) >= FRAME.size:
+            length, kind = FRAME.unpack_from(self.buffer)
+            if len(self.buffer) < FRAME.size + length:
+                break
+            payload = bytes(self.buffer[FRAME.size:FRAME.size + length])
+            del self.buffer[:FRAME.size + length]
+            if kind == WELCOME:
+                (self.player, winning_score, max_missiles, player_speed, bullet_speed,
+                 missile_speed, obstacle_speed, layout) = WELCOME_INFO.unpack(payload)
+                self.game = TankGame(winning_score, max_missiles, player_speed, bullet_speed,
+                                     missile_speed, obstacle_speed, layout.rstrip(b"\0").decode())
+            elif kind == SNAPSHOT:
+                self.values = decode_delta(self.values, payload)
+                apply_snapshot(self.game, self.values)
+                self.snapshot_bytes += FRAME.size + length
+                updated = True
+            elif kind == END:
+                self.winner = payload[0]
+        return updated
+
+    def input_message(self, bits):
+        return frame(INPUT, bytes((bits,)))
+
+
+async def bot_client(host, port, bot_kind, seed):
+    """A headless bot player over asyncio streams; returns (winner, ticks, bytes)."""
+    reader, writer = await asyncio.open_connection(host, port)
+    client = SnapshotClient()
+    writer.write(frame(JOIN))
+    bot = sent = None
+    try:
+        while client.winner is None:
+            data = await reader.read(65536)
+            if not data:
+                break
+            if not client.feed(data):
+                continue
+            if bot is None:
+                bot = BOTS[bot_kind](client.player, seed)
+            bits = bot(client.game) >> (PLAYER_BITS * (client.player - 1))
+            if bits != sent or bits & PRESSED:
+                writer.write(client.input_message(bits))
+                sent = bits
+    finally:
+        writer.close()
+    return client.winner or 0, client.game.tick if client.game else 0, client.snapshot_bytes
+
+
+async def run_bots(host, port, matches, bot_kind):
+    began = time.perf_counter()
+    results = await asyncio.gather(*(bot_client(host, port, bot_kind, f"{i}")
+                                     for i in range(matches * 2)))
+    elapsed = time.perf_counter() - began
+    ticks = sum(ticks for _, ticks, _ in results) / len(results)
+    received = sum(size for _, _, size in results)
+    print(f"{matches} match(es) in {elapsed:.1f}s, avg {ticks:.0f} ticks, "
+          f"{received / max(ticks * len(results), 1):.1f} snapshot bytes per tick per client")
+
+
+def keyboard_bits(keys, pressed):
+    """This client's input bits; either player's keys work, the server knows the side."""
+    bits = 0
+    if keys[pygame.K_w] or keys[pygame.K_UP]:
+        bits |= UP
+    if keys[pygame.K_s] or keys[pygame.K_DOWN]:
+        bits |= DOWN
+    if pygame.K_f in pressed or pygame.K_SLASH in pressed:
+        bits |= FIRE
+    if pygame.K_r in pressed or pygame.K_m in pressed:
+        bits |= MISSILE_FIRE
+    return bits
+
+
+def draw(screen, hud, client):
+    game = client.game
+    screen.fill(BLACK)
+    pygame.draw.rect(screen, RED, game.player1)
+    pygame.draw.rect(screen, BLUE, game.player2)
+    for _, x, y, owner, kind in game.projectiles.live():
+        pygame.draw.rect(screen, PROJECTILE_COLORS[kind], (x, y, *PROJECTILE_SIZES[kind]))
+    for obstacle in game.obstacles:
+        pygame.draw.rect(screen, GRAY, obstacle)
+
+    score_hud, missile_hud1, missile_hud2 = hud
+    score_text = score_hud.render(f"{game.player1_score} - {game.player2_score}")
+    screen.blit(score_text, (WIDTH // 2 - score_text.get_width() // 2, 20))
+    screen.blit(missile_hud1.render(f"Missiles: {game.player1_missiles}"), (20, 20))
+    missile_text = missile_hud2.render(f"Missiles: {game.player2_missiles}")
+    screen.blit(missile_text, (WIDTH - missile_text.get_width() - 20, 20))
+    if client.winner is not None:
+        text = text_cache.render(f"Player {client.winner} Wins!", TITLE_SIZE, YELLOW)
+        screen.blit(text, (WIDTH // 2 - text.get_width() // 2, HEIGHT // 3))
+    pygame.display.flip()
+
+
+def run_client(host, port, bot_kind=None, headless=False):
+    """Play one networked match in a window (or headless with a bot)."""
+    sock = socket.create_connection((host, port))
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.sendall(frame(JOIN))
+    sock.setblocking(False)
+    client = SnapshotClient()
+
+    pygame.init()
+    screen = hud = None
+    if not headless:
+        screen = pygame.display.set_mode((WIDTH, HEIGHT))
+        pygame.display.set_caption("2-Player Shooting Game (network)")
+        # HUD text, rendered again only when its value changes
+        hud = (HudText(text_cache.font(TITLE_SIZE), WHITE),
+               HudText(text_cache.font(TEXT_SIZE), RED),
+               HudText(text_cache.font(TEXT_SIZE), BLUE))
+    clock = pygame.time.Clock()
+    bot = sent = None
+    connected = running = True
+
+    while running:
+        pressed = []
+        if not headless:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
+                if event.type == pygame.KEYDOWN:
+                    pressed.append(event.key)
+
+        while connected:
+            try:
+                data = sock.recv(65536)
+            except BlockingIOError:
+                break
+            if not data:
+                connected = False
+                break
+            client.feed(data)
+        if client.game is None:
+            if not connected:
+                break
+            clock.tick(TICK_RATE)
+            continue
+
+        if connected and client.winner is None:
+            if bot_kind:
+                if bot is None:
+                    bot = BOTS[bot_kind](client.player)
+                bits = bot(client.game) >> (PLAYER_BITS * (client.player - 1))
+            else:
+                bits = keyboard_bits(pygame.key.get_pressed(), pressed)
+            if bits != sent or bits & PRESSED:
+                sock.sendall(client.input_message(bits))
+                sent = bits
+        elif headless:
+            running = False
+
+        if screen is not None:
+            draw(screen, hud, client)
+        clock.tick(TICK_RATE)
+
+    sock.close()
+    pygame.quit()
+    return client.winner
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Networked 2-player tank matches.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    server = commands.add_parser("server", help="host matches")
+    client = commands.add_parser("client", help="join a match")
+    bots = commands.add_parser("bots", help="fill a server with bot matches, to load test it")
+    for command in (server, client, bots):
+        command.add_argument("--host", default="127.0.0.1")
+        command.add_argument("--port", type=int, default=5555)
+    server.add_argument("--winning-score", type=int, default=10)
+    server.add_argument("--layout", choices=sorted(OBSTACLE_LAYOUTS), default="default")
+    server.add_argument("--snapshot-every", type=int, default=1,
+                        help="send a snapshot every N ticks")
+    client.add_argument("--bot", choices=sorted(BOTS), help="let a bot play instead of the keyboard")
+    client.add_argument("--headless", action="store_true", help="no window (needs --bot)")
+    bots.add_argument("--matches", type=int, default=10)
+    bots.add_argument("--bot", choices=sorted(BOTS), default="chase")
+    args = parser.parse_args(argv)
+
+    if args.command == "server":
+        rules = dict(winning_score=args.winning_score, layout=args.layout)
+        try:
+            asyncio.run(TankServer(rules, args.snapshot_every).serve(args.host, args.port))
+        except KeyboardInterrupt:
+            pass
+    elif args.command == "client":
+        if args.headless and not args.bot:
+            parser.error("--headless needs --bot")
+        winner = run_client(args.host, args.port, args.bot, args.headless)
+        print(f"Player {winner} wins" if winner else "match abandoned")
+    else:
+        asyncio.run(run_bots(args.host, args.port, args.matches, args.bot))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
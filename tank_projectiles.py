@@ -0,0 +1,111 @@
+"""Projectile pool for the tank game.
+
+Bullets and missiles live in parallel, preallocated columns (x, y, dx,
+owner, kind, alive) instead of one dict per projectile.  Live projectiles
+are kept packed in slots ``0 .. count - 1``: a removed projectile's slot is
+filled by swapping in the last live one, and the slots past ``count`` form
+the free space that new projectiles reuse.  Capacity doubles when it runs
+out.
+
+Projectiles hit during a frame are only marked dead, so a projectile can't
+be removed twice; ``sweep`` then swap-removes them all.  Moving every
+projectile and culling the ones that left the screen is one vectorized pass
+when NumPy is installed, and a plain loop over ``array`` columns otherwise.
+"""
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; array columns are the fallback
+    np = None
+
+BULLET, MISSILE = 0, 1
+
+COLUMNS = ('x', 'y', 'dx', 'owner', 'kind', 'alive')
+
+
+class ProjectilePool:
+    """Struct-of-arrays storage for every projectile in flight."""
+
+    def __init__(self, capacity=256):
+        self.count = 0
+        self.capacity = 0
+        for name in COLUMNS:
+            setattr(self, name, np.zeros(0, dtype=np.int32) if np is not None else array('i'))
+        self.grow(capacity)
+
+    def __len__(self):
+        return self.count
+
+    def grow(self, capacity):
+        """Enlarge every column to ``capacity`` slots."""
+        extra = capacity - self.capacity
+        for name in COLUMNS:
+            column = getattr(self, name)
+            if np is not None:
+                setattr(self, name, np.concatenate((column, np.zeros(extra, dtype=np.int32))))
+            else:
+                column.extend(array('i', [0]) * extra)
+        self.capacity = capacity
+
+    def clear(self):
+        self.count = 0
+
+    def spawn(self, x, y, dx, owner, kind):
+        """Add a projectile in the first free slot and return its index."""
+        if self.count == self.capacity:
+            self.grow(self.capacity * 2)
+        i = self.count
+        self.x[i] = x
+        self.y[i] = y
+        self.dx[i] = dx
+        self.owner[i] = owner
+        self.kind[i] = kind
+        self.alive[i] = 1
+        self.count += 1
+        return i
+
+    def kill(self, i):
+        """Mark projectile ``i`` dead; it is removed by the next sweep."""
+        self.alive[i] = 0
+
+    def step(self, width):
+        """Move every projectile by its dx and remove those that left [0, width]."""
+        n = self.count
+        if np is not None:
+            x = self.x[:n]
+            x += self.dx[:n]
+            self.alive[:n] &= (x >= 0) & (x <= width)
+        else:
+            x, dx, alive = self.x, self.dx, self.alive
+            for i in range(n):
+                x[i] += dx[i]
+                if x[i] < 0 or x[i] > width:
+                    alive[i] = 0
+        self.sweep()
+
+    def sweep(self):
+        """Swap-remove every projectile marked dead."""
+        n = self.count
+        if np is not None:
+            dead = np.flatnonzero(self.alive[:n] == 0).tolist()
+        else:
+            alive = self.alive
+            dead = [i for i in range(n) if not alive[i]]
+        # From the highest index down, so the live projectile swapped into a
+        # freed slot is never one that is waiting to be removed itself
+        columns = [getattr(self, name) for name in COLUMNS]
+        for i in reversed(dead):
+            n -= 1
+            if i != n:
+                for column in columns:
+                    column[i] = column[n]
+        self.count = n
+
+    def live(self):
+        """(index, x, y, owner, kind) of every live projectile, as plain ints."""
+        n = self.count
+        if np is not None:
+            return zip(range(n), self.x[:n].tolist(), self.y[:n].tolist(),
+                       self.owner[:n].tolist(), self.kind[:n].tolist())
+        return zip(range(n), self.x[:n], self.y[:n], self.owner[:n], self.kind[:n])
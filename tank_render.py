@@ -0,0 +1,92 @@
+"""Frame presentation and HUD text caching for the tank game.
+
+FullRedraw clears the whole screen and flips it every frame.  DirtyRects
+keeps the screen between frames instead: it clears only the rects drawn
+in the previous frame and passes just those plus this frame's rects to
+``pygame.display.update``.  Both take the list of rects a frame drew
+(``pygame.draw.rect`` and ``Surface.blit`` return them), so the game's
+drawing code is the same in either mode.
+
+HudText keeps a rendered text surface and only renders again when the
+text changes.  The colours and text sizes are shared by every tank game
+window, local or networked.
+"""
+import pygame
+
+# Colors
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+RED = (255, 0, 0)
+BLUE = (0, 0, 255)
+YELLOW = (255, 255, 0)
+GRAY = (128, 128, 128)
+GREEN = (0, 255, 0)
+
+# Per projectile kind (BULLET, MISSILE)
+PROJECTILE_COLORS = [YELLOW, GREEN]
+
+TITLE_SIZE, TEXT_SIZE = 74, 36
+
+
+class FullRedraw:
+    """Clear the whole screen and flip it every frame."""
+
+    def __init__(self, screen, background):
+        self.screen = screen
+        self.background = background
+
+    def begin(self):
+        self.screen.fill(self.background)
+
+    def end(self, drawn):
+        pygame.display.flip()
+
+    def invalidate(self):
+        pass
+
+
+class DirtyRects:
+    """Redraw and update only the regions objects covered last frame or this one."""
+
+    def __init__(self, screen, background):
+        self.screen = screen
+        self.background = background
+        self.previous = []
+        self.full = True
+
+    def begin(self):
+        """Erase what the previous frame drew (everything after invalidate)."""
+        if self.full:
+            self.screen.fill(self.background)
+        else:
+            for rect in self.previous:
+                self.screen.fill(self.background, rect)
+
+    def end(self, drawn):
+        """Push the erased and newly drawn regions to the display."""
+        if self.full:
+            pygame.display.flip()
+            self.full = False
+        else:
+            pygame.display.update(self.previous + drawn)
+        self.previous = drawn
+
+    def invalidate(self):
+        """Redraw the whole screen next frame, e.g. after a menu covered it."""
+        self.full = True
+
+
+class HudText:
+    """A line of HUD text rendered once per distinct value."""
+
+    def __init__(self, font, color):
+        self.font = font
+        self.color = color
+        self.text = None
+        self.surface = None
+
+    def render(self, text):
+        if text != self.text:
+            self.text = text
+            self.surface = self.font.render(text, True, self.color)
+        return self.surface
@@ -0,0 +1,203 @@
+"""Record tank matches as input streams and replay them to the same end state.
+
+The game is deterministic given its rules, starting positions and the
+input bits of every tick, so a recording is just those: a header (rules,
+RNG seed, starting positions) followed by one byte per simulation tick
+holding both players' UP/DOWN/FIRE/MISSILE_FIRE bits.  The recorder writes
+through a small file buffer, so memory stays flat however long the match.
+
+Closing a recording appends the end state (tick count, scores, missiles
+and a CRC of positions and projectiles).  Replaying re-runs the ticks
+headless, as fast as the CPU allows, and checks that the end state
+matches.  A recording cut short by a crash has no end state; it still
+replays, unverified.
+
+Usage: python tank_replay.py RECORDING [RECORDING ...]
+"""
+import argparse
+import struct
+import sys
+import time
+import zlib
+
+from tank_core import OBSTACLE_LAYOUTS, TankGame
+
+MAGIC = b"TNKR"
+VERSION = 1
+END_MAGIC = b"TEND"
+
+# magic, version, seed, winning_score, max_missiles, player/bullet/missile/obstacle
+# speed, layout name, player 1 and 2 y, number of obstacles
+HEADER = struct.Struct("<4sBQ6i16s2iH")
+OBSTACLE_STATE = struct.Struct("<ib")  # y, direction
+# magic, ticks, player 1 and 2 score, player 1 and 2 missiles, state CRC
+END = struct.Struct("<4sI4iI")
+
+SEED_LIMIT = 2 ** 64  # seeds are stored unsigned
+BUFFER_SIZE = 64 * 1024
+READ_CHUNK = 64 * 1024
+
+
+class ReplayError(Exception):
+    pass
+
+
+def state_crc(game):
+    """CRC of everything that moves: players, obstacles and projectiles."""
+    values = [game.player1.y, game.player2.y]
+    for obstacle, direction in zip(game.obstacles, game.obstacle_directions):
+        values += [obstacle.y, direction]
+    projectiles = game.projectiles
+    for i, x, y, owner, kind in sorted(projectiles.live(), key=lambda p: p[1:]):
+        values += [x, y, int(projectiles.dx[i]), owner, kind]
+    return zlib.crc32(struct.pack(f"<{len(values)}i", *values))
+
+
+def seed_arg(text):
+    """argparse type for a seed that fits a recording's header."""
+    seed = int(text)
+    if not 0 <= seed < SEED_LIMIT:
+        raise argparse.ArgumentTypeError(f"seed must be between 0 and 2**64 - 1, not {seed}")
+    return seed
+
+
+def end_state(game):
+    return (game.tick, game.player1_score, game.player2_score,
+            game.player1_missiles, game.player2_missiles, state_crc(game))
+
+
+class Recorder:
+    """Stream a match's per-tick inputs to ``path``.
+
+    Create it right before the first tick (it records the game's current
+    positions as the starting point), call ``record(inputs)`` with every
+    tick's inputs, and ``close(game)`` at the end.
+    """
+
+    def __init__(self, path, game, seed=0):
+        if not 0 <= seed < SEED_LIMIT:
+            raise ValueError(f"seed {seed} can't be recorded: it must be between 0 and 2**64 - 1")
+        self.file = open(path, "wb", buffering=BUFFER_SIZE)
+        self.file.write(HEADER.pack(
+            MAGIC, VERSION, seed, game.winning_score, game.max_missiles, game.player_speed,
+            game.projectile_speeds[0], game.projectile_speeds[1], game.obstacle_speed,
+            game.layout.encode(), game.player1.y, game.player2.y, len(game.obstacles)))
+        for obstacle, direction in zip(game.obstacles, game.obstacle_directions):
+            self.file.write(OBSTACLE_STATE.pack(obstacle.y, direction))
+        self.start_tick = game.tick
+
+    def record(self, inputs):
+        self.file.write(bytes((inputs,)))
+
+    def close(self, game=None):
+        """Finish the file, with ``game``'s end state for replays to verify."""
+        if self.file.closed:
+            return
+        if game is not None:
+            self.file.write(END.pack(END_MAGIC, game.tick - self.start_tick, *end_state(game)[1:]))
+        self.file.close()
+
+
+class Recording:
+    """A recorded match: its rules, seed, starting positions and end state."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            header = f.read(HEADER.size)
+            if len(header) < HEADER.size:
+                raise ReplayError(f"{path}: truncated header")
+            (magic, version, self.seed, winning_score, max_missiles, player_speed, bullet_speed,
+             missile_speed, obstacle_speed, layout, self.player1_y, self.player2_y,
+             count) = HEADER.unpack(header)
+            if magic != MAGIC or version != VERSION:
+                raise ReplayError(f"{path}: not a version {VERSION} tank recording")
+            self.rules = dict(winning_score=winning_score, max_missiles=max_missiles,
+                              player_speed=player_speed, bullet_speed=bullet_speed,
+                              missile_speed=missile_speed, obstacle_speed=obstacle_speed,
+                              layout=layout.rstrip(b"\0").decode())
+            if self.rules["layout"] not in OBSTACLE_LAYOUTS:
+                raise ReplayError(f"{path}: unknown obstacle layout {self.rules['layout']!r}")
+            self.obstacles = [OBSTACLE_STATE.unpack(f.read(OBSTACLE_STATE.size))
+                              for _ in range(count)]
+            self.data_start = f.tell()
+
+            f.seek(0, 2)
+            size = f.tell()
+            self.end = None
+            if size - self.data_start >= END.size:
+                f.seek(size - END.size)
+                end = END.unpack(f.read(END.size))
+                if end[0] == END_MAGIC:
+                    self.end = end[1:]
+                    size -= END.size
+            self.ticks = size - self.data_start
+
+    def new_game(self):
+        """A TankGame with the recording's rules and starting positions."""
+        game = TankGame(**self.rules)
+        game.player1.y, game.player2.y = self.player1_y, self.player2_y
+        for i, (y, direction) in enumerate(self.obstacles):
+            game.obstacles[i].y = y
+            game.obstacle_directions[i] = direction
+        return game
+
+    def inputs(self):
+        """Every tick's input bits, read from disk in chunks."""
+        with open(self.path, "rb") as f:
+            f.seek(self.data_start)
+            remaining = self.ticks
+            while remaining:
+                chunk = f.read(min(READ_CHUNK, remaining))
+                if not chunk:
+                    raise ReplayError(f"{self.path}: truncated input stream")
+                remaining -= len(chunk)
+                yield from chunk
+
+    def replay(self):
+        """Re-run the match headless; return (game, verified).
+
+        ``verified`` is None when the recording has no end state to check.
+        Raises ReplayError when the end state differs.
+        """
+        game = self.new_game()
+        step = game.step
+        for inputs in self.inputs():
+            step(inputs)
+        if self.end is None:
+            return game, None
+        self.verify(game)
+        return game, True
+
+    def verify(self, game):
+        """Raise ReplayError unless ``game`` ended where the recording did."""
+        if end_state(game) != self.end:
+            raise ReplayError(f"{self.path}: replay diverged: ended at {end_state(game)}, "
+                              f"recorded {self.end}")
+
+
+def main(argv=None):
+    paths = sys.argv[1:] if argv is None else argv
+    if not paths:
+        print(__doc__.strip().splitlines()[-1])
+        return 2
+    status = 0
+    for path in paths:
+        try:
+            recording = Recording(path)
+            began = time.perf_counter()
+            game, verified = recording.replay()
+        except (OSError, ReplayError) as exc:
+            print(exc)
+            status = 1
+            continue
+        elapsed = time.perf_counter() - began
+        speed = game.tick / max(elapsed, 1e-9)
+        check = "end state verified" if verified else "no end state recorded, not verified"
+        print(f"{path}: {game.tick} ticks, {game.player1_score} - {game.player2_score}, "
+              f"seed {recording.seed}, {check} ({speed:,.0f} ticks/s)")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,295 @@
+"""Step many tank matches at once, and spread them across processes.
+
+MatchBatch holds a whole shard of matches (all with the same rules) as
+NumPy columns: player and obstacle positions, scores and missiles are
+(matches, 2) or (matches, obstacles) arrays, and the projectiles of every
+match share one set of columns tagged with their match index.  One
+``step`` advances every match a tick with array operations: firing,
+movement, the projectile/obstacle and projectile/player overlap tests and
+scoring, so the per-tick Python overhead is paid once per shard instead
+of once per match.  It follows TankGame.step exactly; finished matches
+stop, or start over when ``restart`` is set, like a server refilling a
+slot.
+
+``chase_inputs`` is a vectorized version of the chase bot, so the whole
+loop stays in NumPy.  ``run_shards`` gives each worker process shards of
+``--shard-size`` matches and reports match-ticks per second.
+
+Usage: python tank_shards.py [--matches 1000] [--shard-size 250]
+                             [--ticks 3600] [--workers N] [--seed N]
+                             [--compare]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from tank_core import (BOTS, DOWN, FIRE, HEIGHT, MISSILE_FIRE, OBSTACLE_HEIGHT, OBSTACLE_LAYOUTS,
+                       OBSTACLE_WIDTH, PLAYER_BITS, PLAYER_HEIGHT, PLAYER_WIDTH, PROJECTILE_SIZES,
+                       TICK_RATE, UP, WIDTH, TankGame)
+from tank_projectiles import BULLET, MISSILE
+
+try:
+    import numpy as np
+except ImportError:  # only the --compare baseline runs without NumPy
+    np = None
+
+PROJECTILE_COLUMNS = ('x', 'y', 'dx', 'owner', 'kind', 'match')
+PLAYER_X = (50, WIDTH - 50 - PLAYER_WIDTH)
+
+
+class MatchBatch:
+    """A shard of matches with the same rules, stepped together."""
+
+    def __init__(self, count, winning_score=10, layout='default', restart=False, **rules):
+        if np is None:
+            raise RuntimeError("MatchBatch requires NumPy to be installed")
+        # One TankGame supplies the rules' defaults and the starting state
+        self.template = TankGame(winning_score=winning_score, layout=layout, **rules)
+        self.count = count
+        self.restart = restart
+        template = self.template
+        self.winning_score = template.winning_score
+        self.player_speed = template.player_speed
+        self.speeds = np.array(template.projectile_speeds, dtype=np.int32)
+        self.obstacle_x = np.array([o.x for o in template.obstacles], dtype=np.int32)
+
+        self.player_y = np.zeros((count, 2), dtype=np.int32)
+        self.scores = np.zeros((count, 2), dtype=np.int32)
+        self.missiles = np.zeros((count, 2), dtype=np.int32)
+        self.obstacle_y = np.zeros((count, len(template.obstacles)), dtype=np.int32)
+        self.obstacle_dir = np.zeros_like(self.obstacle_y)
+        self.tick = np.zeros(count, dtype=np.int32)
+        self.winner = np.zeros(count, dtype=np.int8)
+        self.finished = 0
+        self.wins = [0, 0]
+
+        self.projectile_count = 0
+        for name in PROJECTILE_COLUMNS:
+            setattr(self, name, np.zeros(1024, dtype=np.int32))
+        self.reset(np.arange(count))
+
+    def reset(self, matches):
+        """Put ``matches`` (an index array) back to the start of a match."""
+        template = self.template
+        self.player_y[matches] = (template.player1.y, template.player2.y)
+        self.scores[matches] = 0
+        self.missiles[matches] = template.max_missiles
+        self.obstacle_y[matches] = [o.y for o in template.obstacles]
+        self.obstacle_dir[matches] = template.obstacle_directions
+        self.tick[matches] = 0
+        self.winner[matches] = 0
+        n = self.projectile_count
+        self._keep(~np.isin(self.match[:n], matches))
+
+    def _keep(self, mask):
+        """Drop every projectile whose entry in ``mask`` is False."""
+        n = self.projectile_count
+        kept = int(mask.sum())
+        if kept != n:
+            for name in PROJECTILE_COLUMNS:
+                column = getattr(self, name)
+                column[:kept] = column[:n][mask]
+        self.projectile_count = kept
+
+    def _spawn(self, matches, owner, kind):
+        """Fire one ``kind`` projectile from player ``owner`` of each of ``matches``."""
+        k = len(matches)
+        if not k:
+            return
+        n = self.projectile_count
+        if n + k > len(self.x):
+            size = max(len(self.x) * 2, n + k)
+            for name in PROJECTILE_COLUMNS:
+                column = np.zeros(size, dtype=np.int32)
+                column[:n] = getattr(self, name)[:n]
+                setattr(self, name, column)
+        width, height = PROJECTILE_SIZES[kind]
+        direction = 1 if owner == 1 else -1
+        x = PLAYER_X[0] + PLAYER_WIDTH if owner == 1 else PLAYER_X[1] - width
+        rows = slice(n, n + k)
+        self.x[rows] = x
+        self.y[rows] = self.player_y[matches, owner - 1] + PLAYER_HEIGHT // 2 - height // 2
+        self.dx[rows] = direction * self.speeds[kind]
+        self.owner[rows] = owner
+        self.kind[rows] = kind
+        self.match[rows] = matches
+        self.projectile_count = n + k
+
+    def step(self, inputs):
+        """Advance every running match one tick; ``inputs`` holds each match's input bits."""
+        running = self.winner == 0
+        inputs = np.where(running, inputs, 0)
+
+        for owner in (1, 2):
+            bits = inputs >> (PLAYER_BITS * (owner - 1))
+            self._spawn(np.flatnonzero(bits & FIRE), owner, BULLET)
+            missile = np.flatnonzero((bits & MISSILE_FIRE != 0) & (self.missiles[:, owner - 1] > 0))
+            self._spawn(missile, owner, MISSILE)
+            self.missiles[missile, owner - 1] -= 1
+
+        # Up is applied before down, each checked against the latest position
+        y = self.player_y
+        bits = np.stack((inputs, inputs >> PLAYER_BITS), axis=1)
+        y -= self.player_speed * ((bits & UP != 0) & (y > 0))
+        y += self.player_speed * ((bits & DOWN != 0) & (y + PLAYER_HEIGHT < HEIGHT))
+
+        # Move projectiles and drop those that left the screen; a finished
+        # match's projectiles stay where they were when it ended
+        n = self.projectile_count
+        self.x[:n] += self.dx[:n] * running[self.match[:n]]
+        x = self.x[:n]
+        self._keep((x >= 0) & (x <= WIDTH))
+
+        # Overlap tests against the opponent and every obstacle of the projectile's match
+        n = self.projectile_count
+        x, py, owner, kind, match = (getattr(self, name)[:n] for name in
+                                     ('x', 'y', 'owner', 'kind', 'match'))
+        sizes = np.array(PROJECTILE_SIZES, dtype=np.int32)
+        w, h = sizes[kind, 0], sizes[kind, 1]
+
+        target_x = np.where(owner == 1, PLAYER_X[1], PLAYER_X[0])
+        target_y = self.player_y[match, 2 - owner]
+        hit_player = ((x < target_x + PLAYER_WIDTH) & (target_x < x + w) &
+                      (py < target_y + PLAYER_HEIGHT) & (target_y < py + h))
+
+        obstacle_y = self.obstacle_y[match]
+        hit_obstacle = ((x[:, None] < self.obstacle_x + OBSTACLE_WIDTH) &
+                        (self.obstacle_x < (x + w)[:, None]) &
+                        (py[:, None] < obstacle_y + OBSTACLE_HEIGHT) &
+                        (obstacle_y < (py + h)[:, None])).any(axis=1)
+
+        # Obstacles block bullets before they reach a player; missiles fly through
+        live = running[match]
+        blocked = live & (kind == BULLET) & hit_obstacle
+        scored = live & ~blocked & hit_player
+        points = np.where(kind == BULLET, 1, self.winning_score // 3)
+        np.add.at(self.scores, (match[scored], owner[scored] - 1), points[scored])
+        self._keep(~(blocked | scored))
+
+        # Move obstacles of running matches
+        self.obstacle_y += self.obstacle_dir * self.template.obstacle_speed * running[:, None]
+        oy = self.obstacle_y
+        self.obstacle_dir[running[:, None] & ((oy <= 0) | (oy + OBSTACLE_HEIGHT >= HEIGHT))] *= -1
+
+        self.tick += running
+        winner = np.where(self.scores[:, 0] >= self.winning_score, 1,
+                          np.where(self.scores[:, 1] >= self.winning_score, 2, 0))
+        done = np.flatnonzero(running & (winner > 0))
+        if len(done):
+            self.winner[done] = winner[done]
+            self.finished += len(done)
+            self.wins[0] += int((winner[done] == 1).sum())
+            self.wins[1] += int((winner[done] == 2).sum())
+            if self.restart:
+                self.reset(done)
+        return int(running.sum())
+
+
+def chase_inputs(batch, rng, reaction=6):
+    """Vectorized ChaseBot: both players' input bits for every match of ``batch``."""
+    inputs = np.zeros(batch.count, dtype=np.int32)
+    speed = batch.player_speed
+    for owner in (1, 2):
+        offset = batch.player_y[:, 2 - owner] - batch.player_y[:, owner - 1]
+        bits = np.where(offset < -speed, UP, np.where(offset > speed, DOWN, 0))
+        # Fires on roughly one tick in ``reaction``, like the bot's decision ticks
+        decide = rng.random(batch.count) < 2 / (reaction + 2)
+        aligned = np.abs(offset) < PLAYER_HEIGHT // 2
+        bits |= np.where(decide & aligned, FIRE, 0)
+        lucky = rng.random(batch.count) < 0.1
+        bits |= np.where(decide & (np.abs(offset) < PLAYER_HEIGHT // 8) & lucky, MISSILE_FIRE, 0)
+        inputs |= bits << (PLAYER_BITS * (owner - 1))
+    return inputs
+
+
+def _run_shard(size, ticks, seed, rules):
+    """Play ``size`` matches for ``ticks`` ticks, refilling finished ones."""
+    batch = MatchBatch(size, restart=True, **rules)
+    rng = np.random.default_rng(seed)
+    match_ticks = 0
+    for _ in range(ticks):
+        match_ticks += batch.step(chase_inputs(batch, rng))
+    return match_ticks, batch.finished, batch.wins
+
+
+def _shards(matches, shard_size):
+    return [min(shard_size, matches - begin) for begin in range(0, matches, shard_size)]
+
+
+def run_shards(matches, shard_size=250, ticks=TICK_RATE * 60, workers=None, seed=0, rules=None):
+    """Run ``matches`` concurrent matches in shards across a process pool.
+
+    Returns (match_ticks, finished matches, [player 1 wins, player 2 wins]).
+    """
+    workers = workers or os.cpu_count() or 1
+    rules = rules or {}
+    totals = [0, 0, [0, 0]]
+    with ProcessPoolExecutor(workers) as pool:
+        futures = [pool.submit(_run_shard, size, ticks, [seed, index], rules)
+                   for index, size in enumerate(_shards(matches, shard_size))]
+        for future in futures:
+            match_ticks, finished, wins = future.result()
+            totals[0] += match_ticks
+            totals[1] += finished
+            totals[2] = [a + b for a, b in zip(totals[2], wins)]
+    return totals
+
+
+def scalar_match_ticks(matches, ticks, rules=None):
+    """Baseline: step ``matches`` TankGame objects with ChaseBots; return match-ticks."""
+    rules = rules or {}
+    games = [TankGame(**rules) for _ in range(matches)]
+    bots = [(BOTS['chase'](1, i), BOTS['chase'](2, -i)) for i in range(matches)]
+    for _ in range(ticks):
+        for i, game in enumerate(games):
+            game.step(bots[i][0](game) | bots[i][1](game))
+            if game.winner() is not None:
+                games[i] = TankGame(**rules)
+    return matches * ticks
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Step many tank matches per process.")
+    parser.add_argument("--matches", type=int, default=1000, help="concurrent matches")
+    parser.add_argument("--shard-size", type=int, default=250, help="matches per batch")
+    parser.add_argument("--ticks", type=int, default=TICK_RATE * 60, help="ticks to run")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--winning-score", type=int, default=10)
+    parser.add_argument("--layout", choices=sorted(OBSTACLE_LAYOUTS), default="default")
+    parser.add_argument("--compare", action="store_true",
+                        help="also time one process stepping TankGame objects one by one")
+    args = parser.parse_args(argv)
+    if np is None:
+        parser.error("batched stepping requires NumPy")
+
+    seed = args.seed if args.seed is not None else random.randrange(2 ** 32)
+    rules = dict(winning_score=args.winning_score, layout=args.layout)
+    shards = _shards(args.matches, args.shard_size)
+    print(f"{args.matches} matches in {len(shards)} shard(s) on {args.workers} worker(s), "
+          f"{args.ticks} ticks, seed {seed}")
+
+    began = time.perf_counter()
+    match_ticks, finished, wins = run_shards(args.matches, args.shard_size, args.ticks,
+                                             args.workers, seed, rules)
+    elapsed = time.perf_counter() - began
+    print(f"batched: {match_ticks:,} match-ticks in {elapsed:.2f}s = "
+          f"{match_ticks / elapsed:,.0f} match-ticks/s; {finished} matches finished "
+          f"(P1 {wins[0]}, P2 {wins[1]})")
+
+    if args.compare:
+        ticks = max(1, args.ticks // 10)
+        matches = min(args.matches, 100)
+        began = time.perf_counter()
+        match_ticks = scalar_match_ticks(matches, ticks, rules)
+        elapsed = time.perf_counter() - began
+        print(f"one by one: {match_ticks:,} match-ticks in {elapsed:.2f}s = "
+              f"{match_ticks / elapsed:,.0f} match-ticks/s (1 process)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+"""Shared fonts and rendered-text surfaces for the pygame games.
+
+Loading a font and rendering text are both slow compared with blitting a
+ready surface, yet the games' HUDs and menus draw the same few strings
+every frame.  FontRegistry loads each (name, size) font once; TextCache
+keeps the surfaces of recently rendered strings, keyed by font, size,
+text, colour and antialiasing, and evicts the least recently used one
+beyond its capacity.
+
+Font names: None is pygame's default font, a path to a .ttf/.otf file is
+loaded from disk, anything else is looked up with ``pygame.font.SysFont``.
+
+Most code uses the module-level ``fonts`` and ``cache`` through
+``font(size, name)`` and ``render(text, size, color, name)``.
+"""
+from collections import OrderedDict
+
+import pygame
+
+CACHE_SIZE = 256  # rendered strings kept
+
+
+class FontRegistry:
+    """Each (name, size) font, loaded once."""
+
+    def __init__(self):
+        self.fonts = {}
+
+    def get(self, size, name=None):
+        key = (name, size)
+        font = self.fonts.get(key)
+        if font is None:
+            if not pygame.font.get_init():
+                pygame.font.init()
+            if name is None or name.lower().endswith(('.ttf', '.otf')):
+                font = pygame.font.Font(name, size)
+            else:
+                font = pygame.font.SysFont(name, size)
+            self.fonts[key] = font
+        return font
+
+    def preload(self, *specs):
+        """Load fonts ahead of the first frame; each spec is a size or (size, name)."""
+        for spec in specs:
+            size, name = spec if isinstance(spec, tuple) else (spec, None)
+            self.get(size, name)
+
+
+class TextCache:
+    """LRU cache of rendered text surfaces."""
+
+    def __init__(self, fonts=None, capacity=CACHE_SIZE):
+        self.fonts = fonts or FontRegistry()
+        self.capacity = capacity
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.surfaces)
+
+    def render(self, text, size, color, name=None, antialias=True):
+        """The surface of ``text``, rendered only if it isn't cached.
+
+        The surface is shared: blit it, don't draw on it.
+        """
+        key = (name, size, text, tuple(color), antialias)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+        self.misses += 1
+        surface = self.fonts.get(size, name).render(text, antialias, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.capacity:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self.surfaces.clear()
+
+
+fonts = FontRegistry()
+cache = TextCache(fonts)
+
+
+def font(size, name=None):
+    """The shared registry's font."""
+    return fonts.get(size, name)
+
+
+def render(text, size, color, name=None):
+    """Render through the shared cache."""
+    return cache.render(text, size, color, name)